@@ -9,32 +9,44 @@ Usage:
     python compile_cours.py mon_cours.md
     python compile_cours.py mon_cours.md -o ma_presentation.html
     python compile_cours.py mon_cours.md --theme glacier
+    python compile_cours.py cours/ -o dist/ --jobs 4 --details
+    cat mon_cours.md | python compile_cours.py - > ma_presentation.html
 """
 
 import sys
 import argparse
+from functools import partial
 from pathlib import Path
 
-from lib import parse_presentation, HTMLGenerator, THEMES, DEFAULT_THEME, lint_presentation
+from lib import parse_presentation, HTMLGenerator, THEMES, DEFAULT_THEME, lint_presentation, render_details
+from lib.batch import BatchItem, expand_inputs, output_path, read_source, write_output, check_batch, run_batch, is_stdio
+from lib.log import get_logger, add_logging_arguments, setup_logging
+
+
+log = get_logger('compile')
 
 
 def compile_course(
     md_file: Path,
     output_file: Path | None = None,
-    theme: str | None = None
+    theme: str | None = None,
+    details_file: Path | None = None
 ) -> Path:
-    """Compile un fichier Markdown en présentation HTML"""
+    """
+    Compile un fichier Markdown ('-' : entrée standard) en présentation HTML ('-' : sortie standard).
+    Avec details_file, le document des détails est produit à partir du même contenu lu.
+    """
     
-    print(f"📖 Lecture de {md_file}...")
-    md_content = md_file.read_text(encoding='utf-8')
+    log.info("📖 Lecture de %s...", 'l\'entrée standard' if is_stdio(md_file) else md_file)
+    md_content = read_source(md_file)
     
-    print("🔍 Analyse du contenu...")
+    log.info("🔍 Analyse du contenu...")
     presentation = parse_presentation(md_content)
     
-    print(f"📊 {presentation.total_slides} slides détectées")
+    log.info("📊 %d slides détectées", presentation.total_slides)
 
     for warning in lint_presentation(presentation):
-        print(f"  ⚠️  {warning}")
+        log.warning("  ⚠️  %s", warning, extra={'course': md_file.stem, 'event': 'lint'})
     
     # Statistiques par type
     stats = {
@@ -42,27 +54,45 @@ def compile_course(
         'details_seuls': sum(1 for s in presentation.slides if s.max_view == 1),
         'sans_annexes': sum(1 for s in presentation.slides if s.max_view == 0),
     }
-    print(f"   ├─ {stats['avec_questions']} avec détails + questions")
-    print(f"   ├─ {stats['details_seuls']} avec détails seuls")
-    print(f"   └─ {stats['sans_annexes']} sans annexes")
+    log.info("   ├─ %d avec détails + questions", stats['avec_questions'])
+    log.info("   ├─ %d avec détails seuls", stats['details_seuls'])
+    log.info("   └─ %d sans annexes", stats['sans_annexes'])
     
     # Thème : argument CLI > métadonnées > défaut
     final_theme = theme or presentation.metadata.get('theme') or DEFAULT_THEME
-    print(f"🎨 Thème : {final_theme}")
+    log.info("🎨 Thème : %s", final_theme)
 
-    generator = HTMLGenerator(base_path=md_file.parent, theme=final_theme)
+    base_path = Path.cwd() if is_stdio(md_file) else md_file.parent
+    generator = HTMLGenerator(base_path=base_path, theme=final_theme)
     html = generator.generate(presentation, is_draft=False)
 
     
     if output_file is None:
-        output_file = md_file.with_suffix('.html')
+        output_file = md_file if is_stdio(md_file) else md_file.with_suffix('.html')
     
-    output_file.write_text(html, encoding='utf-8')
-    print(f"✅ Présentation générée : {output_file}")
+    write_output(output_file, html)
+    log.info("✅ Présentation générée : %s", output_file)
+
+    if details_file is not None:
+        details = render_details(md_content)
+        if details is None:
+            log.info("⚠️  Aucune section avec détails trouvée !")
+        else:
+            write_output(details_file, details)
+            log.info("✅ Document des détails généré : %s", details_file)
     
     return output_file
 
 
+def compile_item(item: BatchItem, output: Path | None, theme: str | None, details: bool, batch: bool) -> Path:
+    """Compile un fichier du lot (fonction de module : exécutée dans les processus de --jobs)"""
+    output_file = output_path(item, output, '.html', batch)
+    details_file = None
+    if details:
+        details_file = output_file.with_name(output_file.stem + '_details.html')
+    return compile_course(item.source, output_file, theme, details_file)
+
+
 def main():
     theme_list = ', '.join(THEMES.keys())
     
@@ -87,25 +117,49 @@ Exemples:
   python compile_cours.py mon_cours.md
   python compile_cours.py mon_cours.md -o presentation.html
   python compile_cours.py mon_cours.md --theme glacier
+  python compile_cours.py mon_cours.md --details      # + mon_cours_details.html
+  python compile_cours.py cours/ 'autres/*.md' -o dist/ --jobs 4
+  python compile_cours.py - < mon_cours.md > presentation.html
         '''
     )
-    parser.add_argument('input', type=Path, help='Fichier Markdown d\'entrée')
-    parser.add_argument('-o', '--output', type=Path, help='Fichier HTML de sortie')
+    parser.add_argument('inputs', nargs='+', metavar='input',
+                        help='Fichiers Markdown, motifs glob, dossiers (parcourus récursivement) ou - (entrée standard)')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Fichier HTML de sortie, dossier pour plusieurs fichiers, ou - (sortie standard)')
     parser.add_argument('--theme', type=str, choices=THEMES.keys(), help='Thème de couleurs')
+    parser.add_argument('--details', action='store_true',
+                        help='Produire aussi le document des détails (<nom>_details.html) depuis la même lecture')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Fichiers compilés en parallèle (défaut: 1)')
+    add_logging_arguments(parser)
     args = parser.parse_args()
 
-    if not args.input.exists():
-        print(f"❌ Erreur : fichier {args.input} introuvable")
-        sys.exit(1)
+    # Présentation sur la sortie standard : le journal passe sur la sortie d'erreur
+    to_stdout = is_stdio(args.output) or (args.output is None and '-' in args.inputs)
+    stream = sys.stderr if to_stdout else None
+    setup_logging(args.log_format, args.quiet, args.verbose, stream)
 
     try:
-        output = compile_course(args.input, args.output, args.theme)
-        print(f"\n🎉 Succès ! Ouvrez {output} dans votre navigateur")
-    except Exception as e:
-        print(f"❌ Erreur lors de la compilation : {e}")
-        import traceback
-        traceback.print_exc()
+        items = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        log.error("❌ Erreur : %s", e)
+        sys.exit(1)
+    error = check_batch(items, args.output)
+    if error is None and args.details and to_stdout:
+        error = "--details écrit un second fichier : indiquez -o avec un fichier ou un dossier"
+    if error:
+        log.error("❌ Erreur : %s", error)
+        sys.exit(1)
+
+    batch = len(items) > 1
+    task = partial(compile_item, output=args.output, theme=args.theme, details=args.details, batch=batch)
+    failures = run_batch(task, items, args.jobs, (args.log_format, args.quiet, args.verbose))
+    if failures:
+        log.error("❌ %d fichier(s) en erreur sur %d", failures, len(items))
         sys.exit(1)
+    if batch:
+        log.info("\n🎉 Succès ! %d présentations compilées", len(items))
+    elif not to_stdout:
+        log.info("\n🎉 Succès ! Ouvrez %s dans votre navigateur", output_path(items[0], args.output, '.html', batch))
 
 
 if __name__ == '__main__':
@@ -7,6 +7,12 @@ Usage:
     python deploy.py --host monserveur   # Spécifie l'hôte
     python deploy.py --dry-run           # Simule sans transférer
     python deploy.py --config deploy.toml # Utilise un fichier de config
+    python deploy.py --method sftp       # Sans rsync : n'envoie que les fichiers modifiés
+    python deploy.py --method local      # Vers un dossier local (test du diff)
+    python deploy.py --method sftp --streams 4   # 4 flux parallèles
+    python deploy.py --method scp --tar  # Une archive tar sur un seul pipe ssh
+    python deploy.py --releases          # Nouvelle release, bascule atomique de current
+    python deploy.py --rollback          # Revient à la release précédente
 
 Configuration (deploy.toml):
     [server]
@@ -19,13 +25,39 @@ Configuration (deploy.toml):
     source = "./cours"
     output = "./dist"
     title = "Formations Médicales"
+    
+    [transfer]              # Optionnel (sftp, scp, local)
+    streams = 4
+    tar = false
+    
+    [release]               # Optionnel : releases/<id>/ + lien current (racine web)
+    enabled = true
+    keep = 5
 """
 
+import os
 import sys
+import shlex
+import shutil
+import tarfile
 import argparse
+import tempfile
+import threading
 import tomllib
 import subprocess
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.config import CACHE_DIR, OUTPUT_DIGESTS
+from lib.digests import DigestCache
+from lib.manifest import (
+    MANIFEST_FILE, ManifestDiff, build_manifest, dump_manifest, parse_manifest,
+    diff_manifests, parent_dirs, emptied_dirs, balance_by_size,
+)
+from lib.releases import (
+    RELEASES_DIR, CURRENT_LINK, DEFAULT_KEEP, release_id, is_release, releases_to_prune, rollback_target,
+)
 
 
 # Répertoire du script (pour trouver build.py)
@@ -46,7 +78,16 @@ DEFAULT_CONFIG = {
         'source': './cours',
         'output': './dist',
         'title': 'Formations Médicales',
-    }
+    },
+    'transfer': {
+        'streams': 1,        # Flux parallèles (sftp, scp, local)
+        'tar': False,        # Une archive tar en flux sur un seul pipe ssh
+        'multiplex': True,   # Connexion SSH partagée (ControlMaster)
+    },
+    'release': {
+        'enabled': False,    # releases/<id>/ et lien current au lieu d'écrire dans remote_path
+        'keep': DEFAULT_KEEP,
+    },
 }
 
 
@@ -63,6 +104,8 @@ def load_config(config_file: Path) -> dict:
     config = DEFAULT_CONFIG.copy()
     config['server'] = DEFAULT_CONFIG['server'].copy()
     config['build'] = DEFAULT_CONFIG['build'].copy()
+    config['transfer'] = DEFAULT_CONFIG['transfer'].copy()
+    config['release'] = DEFAULT_CONFIG['release'].copy()
     
     # Config relative au répertoire de travail
     if not config_file.is_absolute():
@@ -73,7 +116,7 @@ def load_config(config_file: Path) -> dict:
         with open(config_file, 'rb') as f:
             file_config = tomllib.load(f)
         
-        for section in ('server', 'build'):
+        for section in ('server', 'build', 'transfer', 'release'):
             if section in file_config:
                 config[section] = {**config[section], **file_config[section]}
     else:
@@ -102,8 +145,8 @@ def run_command(cmd: list, dry_run: bool = False, description: str = '') -> bool
         return False
 
 
-def build_courses(config: dict, clean: bool = True) -> bool:
-    """Lance le build des cours"""
+def build_courses(config: dict, clean: bool = False) -> bool:
+    """Lance le build des cours (reproductible : seuls les fichiers dont le contenu change sont modifiés)"""
     print("🔨 Build des cours...")
     
     build_script = SCRIPT_DIR / 'build.py'
@@ -120,6 +163,7 @@ def build_courses(config: dict, clean: bool = True) -> bool:
         '-s', str(source_path),
         '-o', str(output_path),
         '--title', config['build']['title'],
+        '--reproducible',
     ]
     
     if clean:
@@ -128,92 +172,595 @@ def build_courses(config: dict, clean: bool = True) -> bool:
     result = subprocess.run(cmd)
     return result.returncode == 0
 
-def deploy_rsync(config: dict, dry_run: bool = False) -> bool:
-    """Déploie via rsync (recommandé)"""
-    server = config['server']
-    build = config['build']
-    
-    if not server['host'] or not server['user']:
-        print("❌ Configuration serveur incomplète (host, user requis)")
-        return False
-    
-    source = resolve_build_path(build['output'])
-    if not source.exists():
-        print(f"❌ Dossier source inexistant: {source}")
-        return False
-    
-    dest = f"{server['user']}@{server['host']}:{server['remote_path']}"
-    
-    rsync_opts = [
+
+# Taille max des lots de fichiers passés sur une ligne de commande (scp, rm)
+COMMAND_BATCH = 200
+
+
+def chunks(items: List, size: int = COMMAND_BATCH):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def sftp_quote(path) -> str:
+    """Chemin entre guillemets pour un batch sftp"""
+    return '"' + str(path).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def rsync_command(server: dict, source: Path, dest: str, ssh_options: List[str] = ()) -> list:
+    """Commande rsync vers dest (user@host:chemin)"""
+    ssh = ' '.join(['ssh', '-p', str(server['port']), *ssh_options])
+    return [
+        'rsync',
         '-avz',
         '--delete',
         '--progress',
         '--chmod=D755,F644',  # Dossiers: rwxr-xr-x, Fichiers: rw-r--r--
-        '-e', f"ssh -p {server['port']}",
+        f'--exclude=/{CACHE_DIR}',
+        '-e', ssh,
+        f"{source}/", dest,
     ]
+
+
+def write_tar(stream, source: Path, files: List[str]):
+    """Écrit une archive tar des fichiers dans un flux (pipe ssh ou extraction locale)"""
+    with tarfile.open(fileobj=stream, mode='w|') as tar:
+        for rel in files:
+            tar.add(source / rel, arcname=rel, recursive=False)
+
+
+class DeltaTarget:
+    """
+    Cible d'un déploiement par différence.
+    Chaque cible fournit les opérations élémentaires (dossiers, envoi d'un lot, archive tar,
+    suppressions, manifeste) ; l'ordre, le parallélisme et le mode tar sont communs.
+    """
+    
+    def __init__(self, streams: int = 1, tar: bool = False):
+        self.streams = max(1, streams)
+        self.tar = tar
+    
+    def apply(self, source: Path, diff: ManifestDiff, emptied: List[str], manifest_file: Path,
+              dry_run: bool = False, replaced: List[str] = ()) -> bool:
+        # Release amorcée par liens physiques : les fichiers remplacés sont d'abord déliés,
+        # sinon les réécrire modifierait aussi la release précédente
+        if replaced and not self.remove([*replaced, *diff.remove], emptied, dry_run):
+            return False
+        if diff.upload and self.tar:
+            # L'extraction crée elle-même les dossiers
+            if not self.upload_tar(source, diff.upload, dry_run):
+                return False
+        elif diff.upload:
+            if not self.make_dirs(parent_dirs(diff.upload), dry_run):
+                return False
+            if not self.upload_all(source, diff.upload, dry_run):
+                return False
+        if not replaced and (diff.remove or emptied) and not self.remove(diff.remove, emptied, dry_run):
+            return False
+        # Manifeste en dernier : un envoi interrompu sera repris au prochain déploiement
+        return self.put_manifest(manifest_file, dry_run)
+    
+    def upload_all(self, source: Path, files: List[str], dry_run: bool) -> bool:
+        """Envoie les fichiers en `streams` lots parallèles de tailles voisines"""
+        sizes = {rel: (source / rel).stat().st_size for rel in files}
+        batches = balance_by_size(files, sizes, self.streams)
+        if len(batches) == 1:
+            return self.upload(source, batches[0], dry_run)
+        print(f"  🔀 {len(batches)} flux parallèles")
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            results = list(pool.map(lambda batch: self.upload(source, batch, dry_run), batches))
+        return all(results)
+    
+    def upload_tar(self, source: Path, files: List[str], dry_run: bool) -> bool:
+        """Envoie tous les fichiers dans une seule archive tar en flux"""
+        if dry_run:
+            print(f"    [DRY-RUN] archive tar de {len(files)} fichier(s) vers {self.describe()}")
+            return True
+        print(f"  📦 Archive tar ({len(files)} fichiers)...")
+        stream, finish = self.open_tar_sink()
+        written = True
+        try:
+            write_tar(stream, source, files)
+        except OSError as e:
+            print(f"    ❌ Erreur: {e}")
+            written = False
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+        return finish() and written
+
+
+class DirectoryTarget(DeltaTarget):
+    """Cible locale (dossier) : mêmes opérations qu'un serveur, pour tester le déploiement sans sshd"""
+    
+    def __init__(self, path: Path, streams: int = 1, tar: bool = False):
+        super().__init__(streams, tar)
+        self.root = path
+        self.path = path
+    
+    def describe(self) -> str:
+        return str(self.path)
+    
+    def use_release(self, name: str):
+        self.path = self.root / RELEASES_DIR / name
+    
+    def list_releases(self) -> Tuple[List[str], Optional[str]]:
+        releases_dir = self.root / RELEASES_DIR
+        names = sorted(
+            p.name for p in releases_dir.iterdir() if p.is_dir() and is_release(p.name)
+        ) if releases_dir.is_dir() else []
+        link = self.root / CURRENT_LINK
+        current = Path(os.readlink(link)).name if link.is_symlink() else None
+        return names, current
+    
+    def seed_release(self, previous: Optional[str], name: str, dry_run: bool) -> bool:
+        """Nouvelle release : liens physiques vers la précédente (comme `cp -al`)"""
+        releases_dir = self.root / RELEASES_DIR
+        if dry_run:
+            print(f"    [DRY-RUN] {'cp -al ' + previous if previous else 'mkdir'} -> {RELEASES_DIR}/{name}")
+            return True
+        if previous:
+            shutil.copytree(releases_dir / previous, releases_dir / name, symlinks=True, copy_function=os.link)
+        else:
+            (releases_dir / name).mkdir(parents=True)
+        return True
     
-    cmd = ['rsync'] + rsync_opts + [f"{source}/", dest]
+    def activate(self, name: str, dry_run: bool) -> bool:
+        """Bascule atomique : lien temporaire renommé par-dessus current"""
+        if dry_run:
+            print(f"    [DRY-RUN] {CURRENT_LINK} -> {RELEASES_DIR}/{name}")
+            return True
+        tmp = self.root / f'.{CURRENT_LINK}.tmp'
+        tmp.unlink(missing_ok=True)
+        os.symlink(f'{RELEASES_DIR}/{name}', tmp)
+        os.replace(tmp, self.root / CURRENT_LINK)
+        return True
     
-    print(f"📤 Déploiement vers {dest}")
+    def prune(self, names: List[str], dry_run: bool) -> bool:
+        for name in names:
+            if dry_run:
+                print(f"    [DRY-RUN] suppression {RELEASES_DIR}/{name}")
+            else:
+                shutil.rmtree(self.root / RELEASES_DIR / name)
+        return True
     
-    if dry_run:
-        cmd.insert(1, '--dry-run')
-        print(f"  [DRY-RUN] {' '.join(str(c) for c in cmd)}")
+    def read_manifest(self) -> Dict[str, Dict]:
+        manifest = self.path / MANIFEST_FILE
+        return parse_manifest(manifest.read_text(encoding='utf-8')) if manifest.exists() else {}
     
-    try:
-        result = subprocess.run(cmd)
-        return result.returncode == 0
-    except FileNotFoundError:
-        print("❌ rsync non trouvé. Installer rsync ou utiliser --method=scp")
-        return False
+    def make_dirs(self, dirs: List[str], dry_run: bool) -> bool:
+        if not dry_run:
+            for d in [self.path] + [self.path / d for d in dirs]:
+                d.mkdir(parents=True, exist_ok=True)
+        return True
+    
+    def upload(self, source: Path, files: List[str], dry_run: bool) -> bool:
+        for rel in files:
+            if dry_run:
+                print(f"    [DRY-RUN] copie {rel}")
+            else:
+                shutil.copy2(source / rel, self.path / rel)
+        return True
+    
+    def open_tar_sink(self):
+        """Pipe dont l'autre extrémité est extraite dans le dossier (comme `ssh … tar -xf -`)"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        read_fd, write_fd = os.pipe()
+        errors = []
+        
+        def extract():
+            try:
+                with os.fdopen(read_fd, 'rb') as stream, tarfile.open(fileobj=stream, mode='r|') as tar:
+                    tar.extractall(self.path, filter='data')
+            except (OSError, tarfile.TarError) as e:
+                errors.append(e)
+        
+        thread = threading.Thread(target=extract)
+        thread.start()
+        
+        def finish() -> bool:
+            thread.join()
+            if errors:
+                print(f"    ❌ Erreur: {errors[0]}")
+            return not errors
+        
+        return os.fdopen(write_fd, 'wb'), finish
+    
+    def remove(self, files: List[str], emptied: List[str], dry_run: bool) -> bool:
+        for rel in files:
+            if dry_run:
+                print(f"    [DRY-RUN] suppression {rel}")
+            else:
+                (self.path / rel).unlink(missing_ok=True)
+        if not dry_run:
+            for rel in emptied:
+                try:
+                    (self.path / rel).rmdir()
+                except OSError:
+                    pass  # Dossier non vide (fichiers hors manifeste)
+        return True
+    
+    def put_manifest(self, manifest_file: Path, dry_run: bool) -> bool:
+        if not dry_run:
+            shutil.copy2(manifest_file, self.path / MANIFEST_FILE)
+        return True
 
-def deploy_scp(config: dict, dry_run: bool = False) -> bool:
-    """Déploie via scp (fallback)"""
-    server = config['server']
-    build = config['build']
+
+class SshConnection:
+    """
+    Connexion SSH maîtresse (ControlMaster) partagée par toutes les commandes ssh, scp et sftp
+    d'un déploiement : une seule authentification, pas de nouvelle poignée de main par commande
+    """
+    
+    def __init__(self, server: dict, multiplex: bool = True):
+        self.dest = f"{server['user']}@{server['host']}"
+        self.port = str(server['port'])
+        self.multiplex = multiplex
+        self._control_dir = None
+    
+    def __enter__(self):
+        if self.multiplex:
+            self._control_dir = tempfile.mkdtemp(prefix='pyprez-ssh-')
+        return self
+    
+    def __exit__(self, *exc):
+        if self._control_dir:
+            subprocess.run(['ssh', '-p', self.port, *self.options, '-O', 'exit', self.dest], capture_output=True)
+            shutil.rmtree(self._control_dir, ignore_errors=True)
+            self._control_dir = None
+    
+    @property
+    def options(self) -> List[str]:
+        if not self._control_dir:
+            return []
+        return [
+            '-o', 'ControlMaster=auto',
+            '-o', f'ControlPath={self._control_dir}/%C',
+            '-o', 'ControlPersist=60',
+        ]
+    
+    def ssh(self, command: str) -> list:
+        return ['ssh', '-p', self.port, *self.options, self.dest, command]
+    
+    def scp(self, files: List, remote: str) -> list:
+        return ['scp', '-P', self.port, *self.options, *[str(f) for f in files], f"{self.dest}:{remote}"]
+    
+    def sftp(self, batch_file: str) -> list:
+        return ['sftp', '-P', self.port, *self.options, '-b', batch_file, self.dest]
+
+
+class SshTarget(DeltaTarget):
+    """Serveur SSH : mode tar commun (archive extraite par `tar -xf -` côté serveur)"""
     
-    if not server['host'] or not server['user']:
-        print("❌ Configuration serveur incomplète (host, user requis)")
-        return False
+    def __init__(self, conn: SshConnection, remote_path: str, streams: int = 1, tar: bool = False):
+        super().__init__(streams, tar)
+        self.conn = conn
+        self.root = remote_path
+        self.remote_path = remote_path
     
-    source = resolve_build_path(build['output'])
+    def describe(self) -> str:
+        return f"{self.conn.dest}:{self.remote_path}"
+    
+    # Releases : commandes shell (cp -al, ln, mv -T), y compris en sftp
+    
+    def use_release(self, name: str):
+        self.remote_path = f'{self.root}/{RELEASES_DIR}/{name}'
+    
+    def release_path(self, name: str = '') -> str:
+        return shlex.quote(f'{self.root}/{RELEASES_DIR}/{name}' if name else f'{self.root}/{RELEASES_DIR}')
+    
+    def list_releases(self) -> Tuple[List[str], Optional[str]]:
+        link = shlex.quote(f'{self.root}/{CURRENT_LINK}')
+        # Première ligne : cible de current (vide s'il n'existe pas), puis les releases
+        result = subprocess.run(
+            self.conn.ssh(f"readlink {link} || echo; ls -1 {self.release_path()} 2>/dev/null; true"),
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise ConnectionError(result.stderr.strip())
+        lines = result.stdout.splitlines() or ['']
+        current = Path(lines[0]).name if lines[0].strip() else None
+        return sorted(name for name in lines[1:] if is_release(name)), current
+    
+    def seed_release(self, previous: Optional[str], name: str, dry_run: bool) -> bool:
+        if previous:
+            command = f"cp -al {self.release_path(previous)} {self.release_path(name)}"
+        else:
+            command = f"mkdir -p {self.release_path(name)}"
+        return run_command(self.conn.ssh(command), dry_run, f"Préparation de la release {name}...")
+    
+    def activate(self, name: str, dry_run: bool) -> bool:
+        tmp = shlex.quote(f'{self.root}/.{CURRENT_LINK}.tmp')
+        link = shlex.quote(f'{self.root}/{CURRENT_LINK}')
+        target = shlex.quote(f'{RELEASES_DIR}/{name}')
+        return run_command(self.conn.ssh(f"ln -sfn {target} {tmp} && mv -Tf {tmp} {link}"), dry_run,
+                           f"Bascule de {CURRENT_LINK}...")
+    
+    def prune(self, names: List[str], dry_run: bool) -> bool:
+        targets = ' '.join(self.release_path(name) for name in names)
+        return run_command(self.conn.ssh(f"rm -rf -- {targets}"), dry_run, f"Suppression de {len(names)} release(s)...")
+    
+    def open_tar_sink(self):
+        remote = shlex.quote(self.remote_path)
+        proc = subprocess.Popen(
+            self.conn.ssh(f"mkdir -p {remote} && tar -C {remote} -xf -"),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        
+        def finish() -> bool:
+            stderr = proc.stderr.read()
+            proc.wait()
+            if proc.returncode != 0:
+                print(f"    ❌ Erreur: {stderr.decode(errors='replace')}")
+            return proc.returncode == 0
+        
+        return proc.stdin, finish
+
+
+class SftpTarget(SshTarget):
+    """Serveur SFTP : manifeste lu avec -get, batchs limités au diff"""
+    
+    def run_batch(self, commands: List[str]) -> subprocess.CompletedProcess:
+        with tempfile.NamedTemporaryFile('w', suffix='.sftp', delete=False, encoding='utf-8') as f:
+            f.write('\n'.join(commands) + '\n')
+        try:
+            return subprocess.run(self.conn.sftp(f.name), capture_output=True, text=True)
+        finally:
+            Path(f.name).unlink()
+    
+    def execute(self, commands: List[str], dry_run: bool) -> bool:
+        if dry_run:
+            print("  [DRY-RUN] Commandes SFTP:")
+            for cmd in commands[:10]:
+                print(f"    {cmd}")
+            if len(commands) > 10:
+                print(f"    ... et {len(commands) - 10} autres commandes")
+            return True
+        result = self.run_batch(commands)
+        if result.returncode != 0:
+            print(f"    ❌ Erreur: {result.stderr}")
+            return False
+        return True
+    
+    def remote(self, rel: str = '') -> str:
+        return sftp_quote(f'{self.remote_path}/{rel}' if rel else self.remote_path)
+    
+    def read_manifest(self) -> Dict[str, Dict]:
+        with tempfile.TemporaryDirectory() as tmp:
+            local = Path(tmp) / MANIFEST_FILE
+            # "-get" : un manifeste absent n'est pas une erreur, une connexion impossible si
+            result = self.run_batch([f"-get {self.remote(MANIFEST_FILE)} {sftp_quote(local)}"])
+            if result.returncode != 0:
+                raise ConnectionError(result.stderr.strip())
+            return parse_manifest(local.read_text(encoding='utf-8')) if local.exists() else {}
+    
+    def make_dirs(self, dirs: List[str], dry_run: bool) -> bool:
+        return self.execute([f"-mkdir {self.remote()}"] + [f"-mkdir {self.remote(d)}" for d in dirs], dry_run)
+    
+    def upload(self, source: Path, files: List[str], dry_run: bool) -> bool:
+        return self.execute([f"put {sftp_quote(source / rel)} {self.remote(rel)}" for rel in files], dry_run)
+    
+    def remove(self, files: List[str], emptied: List[str], dry_run: bool) -> bool:
+        commands = [f"-rm {self.remote(rel)}" for rel in files]
+        commands += [f"-rmdir {self.remote(d)}" for d in emptied]
+        return self.execute(commands, dry_run)
+    
+    def put_manifest(self, manifest_file: Path, dry_run: bool) -> bool:
+        return self.execute([f"put {sftp_quote(manifest_file)} {self.remote(MANIFEST_FILE)}"], dry_run)
+
+
+class ScpTarget(SshTarget):
+    """Serveur SSH sans rsync : manifeste lu par ssh, envoi par scp des seuls fichiers modifiés"""
+    
+    def read_manifest(self) -> Dict[str, Dict]:
+        remote_manifest = shlex.quote(f'{self.remote_path}/{MANIFEST_FILE}')
+        result = subprocess.run(self.conn.ssh(f"cat {remote_manifest}"), capture_output=True, text=True)
+        if result.returncode == 255:  # Erreur ssh (et non fichier absent)
+            raise ConnectionError(result.stderr.strip())
+        return parse_manifest(result.stdout) if result.returncode == 0 else {}
+    
+    def make_dirs(self, dirs: List[str], dry_run: bool) -> bool:
+        targets = [self.remote_path] + [f'{self.remote_path}/{d}' for d in dirs]
+        return run_command(self.conn.ssh('mkdir -p ' + ' '.join(shlex.quote(d) for d in targets)), dry_run,
+                           "Création des dossiers distants...")
+    
+    def upload(self, source: Path, files: List[str], dry_run: bool) -> bool:
+        # Un scp par dossier de destination
+        by_dir: Dict[str, List[Path]] = {}
+        for rel in files:
+            by_dir.setdefault(Path(rel).parent.as_posix(), []).append(source / rel)
+        for parent, paths in sorted(by_dir.items()):
+            remote_dir = self.remote_path if parent == '.' else f'{self.remote_path}/{parent}'
+            for batch in chunks(paths):
+                if not run_command(self.conn.scp(batch, f'{remote_dir}/'), dry_run, f"Envoi {parent}/ ({len(batch)})"):
+                    return False
+        return True
+    
+    def remove(self, files: List[str], emptied: List[str], dry_run: bool) -> bool:
+        for batch in chunks(files):
+            targets = ' '.join(shlex.quote(f'{self.remote_path}/{rel}') for rel in batch)
+            if not run_command(self.conn.ssh(f"rm -f -- {targets}"), dry_run, f"Suppression ({len(batch)})"):
+                return False
+        if emptied:
+            targets = ' '.join(shlex.quote(f'{self.remote_path}/{d}') for d in emptied)
+            run_command(self.conn.ssh(f"rmdir -- {targets} 2>/dev/null || true"), dry_run)
+        return True
+    
+    def put_manifest(self, manifest_file: Path, dry_run: bool) -> bool:
+        return run_command(self.conn.scp([manifest_file], f'{self.remote_path}/{MANIFEST_FILE}'), dry_run,
+                           "Mise à jour du manifeste distant...")
+
+
+class RsyncTarget(ScpTarget):
+    """Release synchronisée par rsync (fichiers temporaires renommés : liens physiques préservés)"""
+    
+    def __init__(self, conn: SshConnection, server: dict):
+        super().__init__(conn, server['remote_path'])
+        self.server = server
+    
+    def apply(self, source: Path, diff: ManifestDiff, emptied: List[str], manifest_file: Path,
+              dry_run: bool = False, replaced: List[str] = ()) -> bool:
+        # --delete retire aussi le manifeste hérité : le nouveau n'écrase pas celui de la release précédente
+        cmd = rsync_command(self.server, source, f"{self.conn.dest}:{self.remote_path}/", self.conn.options)
+        if dry_run:
+            cmd.insert(1, '--dry-run')
+            print(f"  [DRY-RUN] {' '.join(str(c) for c in cmd)}")
+        if subprocess.run(cmd).returncode != 0:
+            return False
+        return self.put_manifest(manifest_file, dry_run)
+
+
+def local_manifest(config: dict) -> Optional[Tuple[Path, Dict[str, Dict], Path]]:
+    """Manifeste du build local : (dossier de sortie, manifeste, fichier à envoyer)"""
+    source = resolve_build_path(config['build']['output'])
     if not source.exists():
         print(f"❌ Dossier source inexistant: {source}")
+        return None
+    
+    cache_file = source / CACHE_DIR / OUTPUT_DIGESTS
+    digests = DigestCache.load(cache_file)
+    local = build_manifest(source, digests)
+    digests.save(cache_file)
+    manifest_file = source / CACHE_DIR / 'deploy-manifest.json'
+    manifest_file.write_text(dump_manifest(local), encoding='utf-8')
+    return source, local, manifest_file
+
+
+def remote_manifest(target) -> Optional[Dict[str, Dict]]:
+    """Manifeste de la cible ({} si absent, None si illisible)"""
+    try:
+        remote = target.read_manifest()
+    except FileNotFoundError as e:
+        print(f"❌ {e.filename} non trouvé")
+        return None
+    except ConnectionError as e:
+        print(f"❌ Lecture du manifeste distant impossible : {e}")
+        return None
+    if not remote:
+        print("  ℹ️  Pas de manifeste distant : envoi complet")
+    return remote
+
+
+def deploy_delta(config: dict, target, dry_run: bool = False) -> bool:
+    """Compare le manifeste local au manifeste de la cible et n'envoie que les différences"""
+    prepared = local_manifest(config)
+    if not prepared:
         return False
+    source, local, manifest_file = prepared
     
-    dest = f"{server['user']}@{server['host']}:{server['remote_path']}"
+    print(f"📤 Déploiement vers {target.describe()}")
+    remote = remote_manifest(target)
+    if remote is None:
+        return False
     
-    print(f"📤 Déploiement vers {dest}")
+    diff = diff_manifests(local, remote)
+    print(f"  🔍 {diff}")
+    if diff.is_empty and remote:
+        print("  ✅ Déjà à jour")
+        return True
     
-    ssh_cmd = [
-        'ssh', '-p', str(server['port']),
-        f"{server['user']}@{server['host']}",
-        f"mkdir -p {server['remote_path']}"
-    ]
+    try:
+        return target.apply(source, diff, emptied_dirs(local, remote), manifest_file, dry_run)
+    except FileNotFoundError as e:
+        print(f"❌ {e.filename} non trouvé")
+        return False
+
+
+def list_releases(target) -> Optional[Tuple[List[str], Optional[str]]]:
+    try:
+        return target.list_releases()
+    except (OSError, ConnectionError) as e:
+        print(f"❌ Lecture des releases impossible : {e}")
+        return None
+
+
+def deploy_release(config: dict, target, dry_run: bool = False) -> bool:
+    """
+    Nouvelle release amorcée par liens physiques sur la release active, complétée par
+    le diff, puis activée par bascule atomique de current ; seules les `keep` dernières sont gardées
+    """
+    prepared = local_manifest(config)
+    if not prepared:
+        return False
+    source, local, manifest_file = prepared
     
-    if not run_command(ssh_cmd, dry_run, "Création du dossier distant..."):
+    print(f"📤 Déploiement (releases) vers {target.describe()}")
+    listed = list_releases(target)
+    if listed is None:
         return False
+    releases, current = listed
     
-    scp_cmd = [
-        'scp', '-r', '-P', str(server['port']),
-        f"{source}/.",
-        dest
-    ]
+    remote = {}
+    if current:
+        target.use_release(current)
+        remote = remote_manifest(target)
+        if remote is None:
+            return False
+    else:
+        print("  ℹ️  Aucune release active : envoi complet")
     
-    if dry_run:
-        print(f"  [DRY-RUN] {' '.join(str(c) for c in scp_cmd)}")
+    diff = diff_manifests(local, remote)
+    print(f"  🔍 {diff}")
+    if diff.is_empty and remote:
+        print(f"  ✅ Déjà à jour (release {current})")
         return True
     
+    name = release_id(dump_manifest(local))
+    print(f"  🏷️  Release {name}" + (f" (base : {current})" if current else ""))
+    replaced = [rel for rel in diff.upload if rel in remote] + ([MANIFEST_FILE] if current else [])
     try:
-        result = subprocess.run(scp_cmd)
-        return result.returncode == 0
-    except FileNotFoundError:
-        print("❌ scp non trouvé")
+        if not target.seed_release(current, name, dry_run):
+            return False
+        target.use_release(name)
+        if not target.apply(source, diff, emptied_dirs(local, remote), manifest_file, dry_run, replaced):
+            print(f"  ⚠️  Release {name} incomplète, {CURRENT_LINK} inchangé")
+            return False
+        if not target.activate(name, dry_run):
+            return False
+        print(f"  🔗 {CURRENT_LINK} -> {RELEASES_DIR}/{name}")
+        stale = releases_to_prune(releases + [name], config['release']['keep'], name)
+        if stale:
+            print(f"  🧹 {len(stale)} ancienne(s) release(s) supprimée(s)")
+            return target.prune(stale, dry_run)
+        return True
+    except OSError as e:
+        print(f"❌ {e}")
+        return False
+
+
+def rollback(target, requested: str = '', dry_run: bool = False) -> bool:
+    """Réactive une release existante (la précédente par défaut) sans rien envoyer"""
+    listed = list_releases(target)
+    if listed is None:
         return False
+    releases, current = listed
+    try:
+        name = rollback_target(releases, current, requested)
+    except ValueError as e:
+        print(f"❌ {e}")
+        print(f"   Releases : {', '.join(releases) or 'aucune'} (active : {current or 'aucune'})")
+        return False
+    print(f"⏪ Retour à la release {name} (active : {current or 'aucune'})")
+    try:
+        return target.activate(name, dry_run)
+    except OSError as e:
+        print(f"❌ {e}")
+        return False
+
+
+def deploy_to(config: dict, target, dry_run: bool = False, rollback_to: Optional[str] = None) -> bool:
+    """Déploiement par différence, par release, ou retour arrière"""
+    if rollback_to is not None:
+        return rollback(target, rollback_to, dry_run)
+    if config['release']['enabled']:
+        return deploy_release(config, target, dry_run)
+    return deploy_delta(config, target, dry_run)
 
 
-def deploy_sftp(config: dict, dry_run: bool = False) -> bool:
-    """Déploie via sftp avec un batch file"""
+def deploy_rsync(config: dict, dry_run: bool = False, rollback_to: Optional[str] = None) -> bool:
+    """Déploie via rsync (recommandé)"""
     server = config['server']
     build = config['build']
     
@@ -221,49 +768,64 @@ def deploy_sftp(config: dict, dry_run: bool = False) -> bool:
         print("❌ Configuration serveur incomplète (host, user requis)")
         return False
     
+    if config['release']['enabled'] or rollback_to is not None:
+        with SshConnection(server, multiplex=config['transfer']['multiplex']) as conn:
+            return deploy_to(config, RsyncTarget(conn, server), dry_run, rollback_to)
+    
     source = resolve_build_path(build['output'])
     if not source.exists():
         print(f"❌ Dossier source inexistant: {source}")
         return False
     
-    print(f"📤 Déploiement SFTP vers {server['host']}:{server['remote_path']}")
-    
-    batch_commands = [f"-mkdir {server['remote_path']}"]
+    dest = f"{server['user']}@{server['host']}:{server['remote_path']}"
+    cmd = rsync_command(server, source, dest)
     
-    for item in source.rglob('*'):
-        rel_path = item.relative_to(source)
-        remote_target = f"{server['remote_path']}/{rel_path}"
-        
-        if item.is_dir():
-            batch_commands.append(f"-mkdir {remote_target}")
-        else:
-            batch_commands.append(f"put {item} {remote_target}")
+    print(f"📤 Déploiement vers {dest}")
     
     if dry_run:
-        print("  [DRY-RUN] Commandes SFTP:")
-        for cmd in batch_commands[:10]:
-            print(f"    {cmd}")
-        if len(batch_commands) > 10:
-            print(f"    ... et {len(batch_commands) - 10} autres commandes")
-        return True
-    
-    batch_file = Path('/tmp/sftp_batch.txt')
-    batch_file.write_text('\n'.join(batch_commands))
-    
-    sftp_cmd = [
-        'sftp', '-P', str(server['port']),
-        '-b', str(batch_file),
-        f"{server['user']}@{server['host']}"
-    ]
+        cmd.insert(1, '--dry-run')
+        print(f"  [DRY-RUN] {' '.join(str(c) for c in cmd)}")
     
     try:
-        result = subprocess.run(sftp_cmd)
-        batch_file.unlink()
+        result = subprocess.run(cmd)
         return result.returncode == 0
     except FileNotFoundError:
-        print("❌ sftp non trouvé")
+        print("❌ rsync non trouvé. Installer rsync ou utiliser --method=scp")
         return False
 
+def check_server(server: dict) -> bool:
+    if not server['host'] or not server['user']:
+        print("❌ Configuration serveur incomplète (host, user requis)")
+        return False
+    return True
+
+
+def deploy_scp(config: dict, dry_run: bool = False, rollback_to: Optional[str] = None) -> bool:
+    """Déploie via scp (fallback) : seuls les fichiers modifiés sont envoyés"""
+    server, transfer = config['server'], config['transfer']
+    if not check_server(server):
+        return False
+    with SshConnection(server, multiplex=transfer['multiplex']) as conn:
+        target = ScpTarget(conn, server['remote_path'], transfer['streams'], transfer['tar'])
+        return deploy_to(config, target, dry_run, rollback_to)
+
+
+def deploy_sftp(config: dict, dry_run: bool = False, rollback_to: Optional[str] = None) -> bool:
+    """Déploie via sftp avec des batchs limités aux fichiers modifiés"""
+    server, transfer = config['server'], config['transfer']
+    if not check_server(server):
+        return False
+    with SshConnection(server, multiplex=transfer['multiplex']) as conn:
+        target = SftpTarget(conn, server['remote_path'], transfer['streams'], transfer['tar'])
+        return deploy_to(config, target, dry_run, rollback_to)
+
+
+def deploy_local(config: dict, dry_run: bool = False, rollback_to: Optional[str] = None) -> bool:
+    """Déploie vers un dossier local (remote_path), avec le même diff (et les mêmes releases) que sftp/scp"""
+    transfer = config['transfer']
+    target = DirectoryTarget(resolve_build_path(config['server']['remote_path']), transfer['streams'], transfer['tar'])
+    return deploy_to(config, target, dry_run, rollback_to)
+
 
 def create_default_config(config_file: Path):
     """Crée un fichier de configuration par défaut dans le répertoire courant"""
@@ -298,6 +860,18 @@ Méthodes de déploiement:
   rsync   Synchronisation incrémentale (recommandé, plus rapide)
   scp     Copie simple via SSH
   sftp    Transfert SFTP
+  local   Copie vers un dossier local (remote_path), pour tester le diff
+          (y compris --streams et --tar, sans serveur SSH)
+
+scp, sftp et local comparent le manifeste du build à celui de la cible
+(.deploy-manifest.json) et n'envoient que les fichiers modifiés.
+
+Releases (--releases, toutes méthodes, accès shell requis) :
+  remote_path/releases/<id>/  une release par déploiement, amorcée par
+                              liens physiques (cp -al) sur la release active
+  remote_path/current         lien vers la release active, basculé
+                              atomiquement : la racine web doit pointer ici
+  Les --keep dernières releases sont gardées pour --rollback.
 
 Exemples:
   python deploy.py                          # Build + déploiement
@@ -305,6 +879,9 @@ Exemples:
   python deploy.py --skip-build             # Déploie sans rebuild
   python deploy.py --host srv --user me     # Override config
   python deploy.py --init                   # Crée deploy.toml dans le dossier courant
+  python deploy.py --releases --keep 3      # Release atomique, 3 releases gardées
+  python deploy.py --rollback               # Revient à la release précédente
+  python deploy.py --rollback 20261019-120113-ab12cd34
         '''
     )
     
@@ -320,14 +897,28 @@ Exemples:
                         help='Port SSH (override config)')
     parser.add_argument('--remote-path', type=str,
                         help='Chemin distant (override config)')
-    parser.add_argument('--method', choices=['rsync', 'scp', 'sftp'], default='rsync',
+    parser.add_argument('--method', choices=['rsync', 'scp', 'sftp', 'local'], default='rsync',
                         help='Méthode de transfert (défaut: rsync)')
+    parser.add_argument('--streams', type=int,
+                        help='Flux de transfert parallèles, équilibrés par taille (sftp, scp, local)')
+    parser.add_argument('--tar', action='store_true',
+                        help='Envoyer une archive tar en flux sur un seul pipe ssh (nombreux petits fichiers)')
+    parser.add_argument('--no-multiplex', action='store_true',
+                        help='Ne pas partager la connexion SSH (ControlMaster)')
+    parser.add_argument('--releases', action='store_true',
+                        help='Déployer dans une nouvelle release puis basculer le lien current')
+    parser.add_argument('--keep', type=int,
+                        help=f'Releases conservées (défaut: {DEFAULT_KEEP})')
+    parser.add_argument('--rollback', nargs='?', const='', metavar='RELEASE',
+                        help='Réactiver une release (la précédente par défaut), sans build ni envoi')
     parser.add_argument('--skip-build', action='store_true',
                         help='Ne pas rebuild avant déploiement')
     parser.add_argument('--dry-run', action='store_true',
                         help='Simulation sans transfert réel')
+    parser.add_argument('--clean', action='store_true',
+                        help='Nettoyer le dossier de sortie avant le build (tous les fichiers seront renvoyés)')
     parser.add_argument('--no-clean', action='store_true',
-                        help='Ne pas nettoyer avant le build')
+                        help=argparse.SUPPRESS)  # Comportement par défaut, gardé pour compatibilité
     
     args = parser.parse_args()
     
@@ -348,24 +939,45 @@ Exemples:
         config['server']['port'] = args.port
     if args.remote_path:
         config['server']['remote_path'] = args.remote_path
-    
-    if not config['server']['host'] or not config['server']['user']:
+    if args.streams:
+        config['transfer']['streams'] = args.streams
+    if args.tar:
+        config['transfer']['tar'] = True
+    if args.no_multiplex:
+        config['transfer']['multiplex'] = False
+    if args.releases:
+        config['release']['enabled'] = True
+    if args.keep:
+        config['release']['keep'] = args.keep
+    
+    if args.method != 'local' and (not config['server']['host'] or not config['server']['user']):
         print("❌ Configuration serveur manquante")
         print(f"   Créer deploy.toml avec: python {SCRIPT_DIR}/deploy.py --init")
         print("   Ou spécifier --host et --user")
         return 1
     
-    print(f"🚀 Déploiement vers {config['server']['user']}@{config['server']['host']}")
-    print(f"   Remote: {config['server']['remote_path']}")
+    if args.method == 'local':
+        print(f"🚀 Déploiement vers le dossier local {config['server']['remote_path']}")
+    else:
+        print(f"🚀 Déploiement vers {config['server']['user']}@{config['server']['host']}")
+        print(f"   Remote: {config['server']['remote_path']}")
     print(f"   Source: {resolve_build_path(config['build']['source'])}")
     print(f"   Output: {resolve_build_path(config['build']['output'])}")
     print(f"   Méthode: {args.method}")
+    if args.rollback is not None:
+        print(f"   Retour arrière: {args.rollback or 'release précédente'}")
+    elif config['release']['enabled']:
+        print(f"   Releases: {config['release']['keep']} conservées")
+    if args.method != 'rsync':
+        transfer = config['transfer']
+        mode = 'archive tar' if transfer['tar'] else f"{transfer['streams']} flux"
+        print(f"   Transfert: {mode}")
     if args.dry_run:
         print("   ⚠️  Mode simulation (dry-run)")
     print()
     
-    if not args.skip_build:
-        if not build_courses(config, clean=not args.no_clean):
+    if not args.skip_build and args.rollback is None:
+        if not build_courses(config, clean=args.clean):
             print("❌ Échec du build")
             return 1
         print()
@@ -374,9 +986,10 @@ Exemples:
         'rsync': deploy_rsync,
         'scp': deploy_scp,
         'sftp': deploy_sftp,
+        'local': deploy_local,
     }
     
-    success = deploy_methods[args.method](config, dry_run=args.dry_run)
+    success = deploy_methods[args.method](config, dry_run=args.dry_run, rollback_to=args.rollback)
     
     if success:
         print()
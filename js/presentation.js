@@ -1,6 +1,7 @@
 /**
  * Navigation pour Présentation avec slides annexes
- * Supporte: data-no-annexes="true" et data-max-view="1"
+ * Utilise la carte de navigation générée au build (options.nav) ;
+ * à défaut, déduit les groupes de data-no-annexes="true" et data-max-view="1"
  */
 
 const PresentationNav = (function() {
@@ -11,13 +12,84 @@ const PresentationNav = (function() {
     let totalSlides = 0;
     let slideGroups = [];
 
+    // Virtualisation : seuls le groupe courant et ses voisins sont rendus
+    const VIRTUALIZE_THRESHOLD = 40;
+    const VIRTUAL_RADIUS = 1;
+    let virtualized = false;
+    let nearGroups = new Set();
+
+    // Rendu : une mise à jour du DOM par frame, références d'éléments en cache
+    let grid = null;
+    let renderPending = false;
+    let hashPending = false;
+    let scrollTimer = null;
+    let shownFixed = null;
+    const fixedCache = new WeakMap();
+
+    // Préchargement des images des prochains groupes pendant les temps morts
+    const DEFAULT_PRELOAD = 2;
+    let preloadAhead = DEFAULT_PRELOAD;
+    let navImages = {};
+    let preloadPending = false;
+    const preloaded = new Set();
+
+    // Recherche dans la présentation (index construit au build, ouverte avec /)
+    const MAX_SEARCH_RESULTS = 12;
+    const VIEW_LABELS = ['', 'Détails', 'Questions'];
+    let searchIndex = null;
+    let searchOverlay = null;
+    let searchInput = null;
+    let searchResults = null;
+    let searchHits = [];
+    let searchSelected = 0;
+
+    // Instrumentation (opt-in) : spans performance.measure, exposés par getMetrics()
+    const MAX_METRICS = 500;
+    const METRIC_PREFIX = 'pyprez:';
+    let metricsEnabled = false;
+    let metricsEndpoint = null;
+    let metricSpans = [];
+    let metricsSent = 0;
+    let navStart = null;
+    let materialized = 0;
+
     // Touch
     let touchStartX = 0, touchStartY = 0, touchEndX = 0, touchEndY = 0;
     let touchStartScrollTop = 0;
     const minSwipeDistance = 50;
 
     /**
-     * Construit les groupes de slides
+     * Crée un groupe dont les éléments (ids s<i>, s<i>-d, s<i>-q) sont résolus à la demande
+     */
+    function makeGroup(index, maxView) {
+        let els = null;
+        function resolve() {
+            if (!els) {
+                els = {
+                    main: document.getElementById(`s${index}`),
+                    detail: maxView >= 1 ? document.getElementById(`s${index}-d`) : null,
+                    question: maxView >= 2 ? document.getElementById(`s${index}-q`) : null,
+                };
+            }
+            return els;
+        }
+        return {
+            maxView: maxView,
+            get main() { return resolve().main; },
+            get detail() { return resolve().detail; },
+            get question() { return resolve().question; },
+        };
+    }
+
+    /**
+     * Groupes depuis la carte de navigation du build : ni parcours ni mutation du DOM
+     */
+    function groupsFromNavMap(nav) {
+        slideGroups = nav.maxViews.map((maxView, i) => makeGroup(i, maxView));
+    }
+
+    /**
+     * Construit les groupes de slides en parcourant le DOM (HTML sans carte de navigation)
      */
     function buildSlideGroups() {
         slideGroups = [];
@@ -72,6 +144,39 @@ const PresentationNav = (function() {
         
     }
 
+    function groupElements(group) {
+        return [group.main, group.detail, group.question].filter(Boolean);
+    }
+
+    /**
+     * Marque comme proches (rendues) les slides du groupe courant et de ses voisins.
+     * Les autres restent en content-visibility: hidden, hors des arbres de layout et de paint.
+     */
+    function updateVirtualWindow() {
+        if (!virtualized) return;
+        const next = new Set();
+        const from = Math.max(0, currentSlide - VIRTUAL_RADIUS);
+        const to = Math.min(slideGroups.length - 1, currentSlide + VIRTUAL_RADIUS);
+        for (let i = from; i <= to; i++) next.add(i);
+
+        const start = metricsEnabled ? performance.now() : 0;
+        let added = 0;
+        nearGroups.forEach(i => {
+            if (!next.has(i)) groupElements(slideGroups[i]).forEach(el => el.classList.remove('slide-near'));
+        });
+        next.forEach(i => {
+            if (!nearGroups.has(i)) {
+                groupElements(slideGroups[i]).forEach(el => el.classList.add('slide-near'));
+                added++;
+            }
+        });
+        nearGroups = next;
+        if (added && metricsEnabled) {
+            materialized += added;
+            recordSpan('materialize', start, performance.now(), { groups: added });
+        }
+    }
+
     function getMaxView(idx) {
         return (idx >= 0 && idx < slideGroups.length) ? slideGroups[idx].maxView : 0;
     }
@@ -86,42 +191,195 @@ const PresentationNav = (function() {
     }
 
     function updatePosition() {
-        const grid = document.getElementById('slidesGrid');
         const maxView = getMaxView(currentSlide);
         
         if (currentView > maxView) {
             currentView = maxView;
         }
         
+        if (metricsEnabled && navStart === null) navStart = performance.now();
+        scheduleRender();
+    }
+
+    /**
+     * Regroupe les navigations successives (répétition de touche) en une seule mise à jour par frame
+     */
+    function scheduleRender() {
+        if (renderPending) return;
+        renderPending = true;
+        requestAnimationFrame(render);
+    }
+
+    function render() {
+        renderPending = false;
+        if (!grid) grid = document.getElementById('slidesGrid');
+        
+        updateVirtualWindow();
         grid.style.transform = `translate(${-currentView * 100}vw, ${-currentSlide * 100}vh)`;
         
         updateFixedElements();
         
-        setTimeout(() => {
+        if (hashPending) {
+            hashPending = false;
+            history.replaceState(null, null, `#slide-${currentSlide}`);
+        }
+        
+        clearTimeout(scrollTimer);
+        scrollTimer = setTimeout(() => {
             const el = getActiveElement();
             if (el) el.scrollTop = 0;
         }, 100);
+        
+        schedulePreload();
+        
+        if (navStart !== null) {
+            // Frame suivante : les écritures de cette frame ont été peintes
+            const start = navStart;
+            const detail = { slide: currentSlide, view: currentView, materialized };
+            navStart = null;
+            materialized = 0;
+            requestAnimationFrame(() => recordSpan('navigate', start, performance.now(), detail));
+        }
     }
 
-    function updateFixedElements() {
-        // Masquer tous
-        document.querySelectorAll('.slide-detail, .slide-question').forEach(s => {
-            const p = s.querySelector('.position-indicator');
-            const n = s.querySelector('.nav-hint');
-            if (p) p.style.opacity = '0';
-            if (n) n.style.opacity = '0';
+    function recordSpan(name, start, end, detail) {
+        if (!metricsEnabled) return;
+        const span = { name, start, duration: end - start };
+        if (detail) span.detail = detail;
+        if (metricSpans.length >= MAX_METRICS) {
+            metricSpans.shift();
+            metricsSent = Math.max(0, metricsSent - 1);
+        }
+        metricSpans.push(span);
+        try {
+            performance.measure(METRIC_PREFIX + name, { start, end, detail });
+        } catch (e) {
+            // performance.measure(options) non supporté : la donnée reste dans getMetrics()
+        }
+    }
+
+    function timed(name, fn, detail) {
+        if (!metricsEnabled) return fn();
+        const start = performance.now();
+        const result = fn();
+        recordSpan(name, start, performance.now(), detail);
+        return result;
+    }
+
+    function percentile(sorted, p) {
+        return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+    }
+
+    function getMetrics() {
+        const durations = {};
+        metricSpans.forEach(span => (durations[span.name] = durations[span.name] || []).push(span.duration));
+        const summary = {};
+        Object.entries(durations).forEach(([name, values]) => {
+            values.sort((a, b) => a - b);
+            summary[name] = {
+                count: values.length,
+                p50: percentile(values, 0.5),
+                p95: percentile(values, 0.95),
+                max: values[values.length - 1],
+            };
         });
+        return { enabled: metricsEnabled, spans: metricSpans.slice(), summary };
+    }
+
+    // Envoi des spans non encore transmis quand la page est masquée ou quittée
+    function flushMetrics() {
+        if (!metricsEndpoint || metricsSent >= metricSpans.length || !navigator.sendBeacon) return;
+        const payload = JSON.stringify({
+            page: window.location.pathname,
+            userAgent: navigator.userAgent,
+            spans: metricSpans.slice(metricsSent),
+        });
+        if (navigator.sendBeacon(metricsEndpoint, payload)) metricsSent = metricSpans.length;
+    }
+
+    function handleVisibilityChange() {
+        if (document.visibilityState === 'hidden') flushMetrics();
+    }
+
+    function initMetrics(options) {
+        const params = new URLSearchParams(window.location.search);
+        metricsEnabled = Boolean(options) || params.has('metrics');
+        metricsEndpoint = (options && options.endpoint) || null;
+        if (metricsEnabled && metricsEndpoint) {
+            document.addEventListener('visibilitychange', handleVisibilityChange);
+            window.addEventListener('pagehide', flushMetrics);
+        }
+    }
+
+    function whenIdle(callback) {
+        if (typeof requestIdleCallback === 'function') {
+            requestIdleCallback(callback, { timeout: 2000 });
+        } else {
+            setTimeout(callback, 200);
+        }
+    }
+
+    function schedulePreload() {
+        if (preloadPending || preloadAhead < 1) return;
+        preloadPending = true;
+        whenIdle(preloadUpcoming);
+    }
+
+    /**
+     * Précharge les images des détails de la slide courante et des N groupes suivants
+     */
+    function preloadUpcoming() {
+        preloadPending = false;
+        const current = navImages[currentSlide];
+        if (current) current.detail.forEach(preloadImage);
+        const last = Math.min(slideGroups.length - 1, currentSlide + preloadAhead);
+        for (let i = currentSlide + 1; i <= last; i++) {
+            const group = navImages[i];
+            if (group) group.main.forEach(preloadImage);
+        }
+    }
+
+    function preloadImage(url) {
+        if (preloaded.has(url)) return;
+        preloaded.add(url);
+        const img = new Image();
+        img.decoding = 'async';
+        img.src = url;
+    }
+
+    /**
+     * Indicateur de position et aide de navigation d'une slide (requêtés une seule fois)
+     */
+    function getFixedElements(slide) {
+        let fixed = fixedCache.get(slide);
+        if (!fixed) {
+            fixed = {
+                indicator: slide.querySelector('.position-indicator'),
+                hint: slide.querySelector('.nav-hint'),
+            };
+            fixedCache.set(slide, fixed);
+        }
+        return fixed;
+    }
+
+    function updateFixedElements() {
+        // Les éléments fixes des annexes sont masqués par défaut (CSS) :
+        // seul l'élément précédemment affiché doit être masqué
+        const active = currentView > 0 ? getActiveElement() : null;
+        if (active === shownFixed) return;
         
-        // Afficher actif
-        if (currentView > 0) {
-            const active = getActiveElement();
-            if (active) {
-                const p = active.querySelector('.position-indicator');
-                const n = active.querySelector('.nav-hint');
-                if (p) p.style.opacity = '0.7';
-                if (n) n.style.opacity = '0.6';
-            }
+        if (shownFixed) {
+            const { indicator, hint } = getFixedElements(shownFixed);
+            if (indicator) indicator.style.opacity = '0';
+            if (hint) hint.style.opacity = '0';
         }
+        
+        if (active) {
+            const { indicator, hint } = getFixedElements(active);
+            if (indicator) indicator.style.opacity = '0.7';
+            if (hint) hint.style.opacity = '0.6';
+        }
+        shownFixed = active;
     }
 
     function handleKeyboard(e) {
@@ -186,6 +444,13 @@ const PresentationNav = (function() {
                 updateHash();
                 break;
 
+            case '/':
+                if (searchIndex) {
+                    e.preventDefault();
+                    openSearch();
+                }
+                break;
+
             case 'q':
             case 'Q':
             case 'Escape':
@@ -194,6 +459,106 @@ const PresentationNav = (function() {
         }
     }
 
+    function isSearchOpen() {
+        return searchOverlay !== null && !searchOverlay.hidden;
+    }
+
+    function openSearch() {
+        searchOverlay.hidden = false;
+        searchInput.select();
+        searchInput.focus();
+        updateSearch();
+    }
+
+    function closeSearch() {
+        searchOverlay.hidden = true;
+        searchInput.blur();
+    }
+
+    function updateSearch() {
+        searchHits = PyprezSearch.match(searchIndex, searchInput.value)
+            .slice(0, MAX_SEARCH_RESULTS)
+            .map(([doc]) => searchIndex.docs[doc]);
+        searchSelected = 0;
+
+        const fragment = document.createDocumentFragment();
+        searchHits.forEach(([slide, view, title], i) => {
+            const item = document.createElement('li');
+            item.className = 'deck-search-hit';
+            item.dataset.hit = i;
+            const label = document.createElement('span');
+            label.className = 'deck-search-title';
+            label.textContent = title;
+            const where = document.createElement('span');
+            where.className = 'deck-search-where';
+            where.textContent = [`${slide + 1}/${totalSlides}`, VIEW_LABELS[view]].filter(Boolean).join(' · ');
+            item.append(label, where);
+            fragment.appendChild(item);
+        });
+        searchResults.replaceChildren(fragment);
+        highlightSearchHit();
+    }
+
+    function highlightSearchHit() {
+        Array.from(searchResults.children).forEach((item, i) => {
+            item.classList.toggle('selected', i === searchSelected);
+        });
+    }
+
+    function goToSearchHit(i) {
+        const hit = searchHits[i];
+        if (!hit) return;
+        closeSearch();
+        goTo(hit[0], hit[1]);
+    }
+
+    // Les touches saisies dans la recherche ne pilotent pas la navigation
+    function handleSearchKeydown(e) {
+        e.stopPropagation();
+        switch (e.key) {
+            case 'Escape':
+                e.preventDefault();
+                closeSearch();
+                break;
+            case 'ArrowDown':
+                e.preventDefault();
+                searchSelected = Math.min(searchSelected + 1, searchHits.length - 1);
+                highlightSearchHit();
+                break;
+            case 'ArrowUp':
+                e.preventDefault();
+                searchSelected = Math.max(searchSelected - 1, 0);
+                highlightSearchHit();
+                break;
+            case 'Enter':
+                e.preventDefault();
+                goToSearchHit(searchSelected);
+                break;
+        }
+    }
+
+    function initSearch(options) {
+        searchOverlay = document.getElementById('deckSearch');
+        searchInput = document.getElementById('deckSearchInput');
+        searchResults = document.getElementById('deckSearchResults');
+        if (!options || typeof PyprezSearch === 'undefined' || !searchOverlay || !searchInput || !searchResults) {
+            searchOverlay = null;
+            return;
+        }
+
+        searchIndex = options;
+        PyprezSearch.setStopwords(options.stopwords);
+        searchInput.addEventListener('input', updateSearch);
+        searchInput.addEventListener('keydown', handleSearchKeydown);
+        searchResults.addEventListener('click', e => {
+            const item = e.target.closest('[data-hit]');
+            if (item) goToSearchHit(Number(item.dataset.hit));
+        });
+        searchOverlay.addEventListener('click', e => {
+            if (e.target === searchOverlay) closeSearch();
+        });
+    }
+
     
     function handleTouchStart(e) {
         touchStartX = e.changedTouches[0].screenX;
@@ -210,6 +575,7 @@ const PresentationNav = (function() {
     }
 
     function handleSwipe() {
+        if (isSearchOpen()) return;
         const dX = touchEndX - touchStartX;
         const dY = touchEndY - touchStartY;
         const maxView = getMaxView(currentSlide);
@@ -257,18 +623,42 @@ const PresentationNav = (function() {
         cursorTimer = setTimeout(hideCursor, 2000);
     }
 
-    function init(total) {
+    /**
+     * @param {number} total - nombre de slides
+     * @param {Object} [options]
+     * @param {{maxViews: number[], images: Object}} [options.nav] - carte de navigation générée au build
+     * @param {number} [options.preload] - nombre de groupes suivants dont les images sont préchargées
+     * @param {boolean} [options.virtualize] - forcer/désactiver la virtualisation
+     *        (par défaut : active au-delà de VIRTUALIZE_THRESHOLD slides)
+     */
+    function init(total, options = {}) {
         if (!total || total < 1) {
             console.error('❌ totalSlides invalide');
             return;
         }
 
+        initMetrics(options.metrics);
+        const initStart = metricsEnabled ? performance.now() : 0;
+
         totalSlides = total;
-        buildSlideGroups();
+        navImages = (options.nav && options.nav.images) || {};
+        preloadAhead = options.preload ?? DEFAULT_PRELOAD;
+        if (options.nav) {
+            timed('buildSlideGroups', () => groupsFromNavMap(options.nav), { source: 'nav' });
+        } else {
+            timed('buildSlideGroups', buildSlideGroups, { source: 'dom' });
+        }
+
+        virtualized = options.virtualize ?? (slideGroups.length > VIRTUALIZE_THRESHOLD);
+        nearGroups = new Set();
+        grid = document.getElementById('slidesGrid');
+        grid.classList.toggle('virtualized', virtualized);
+        shownFixed = null;
+        initSearch(options.search);
 
         document.addEventListener('keydown', handleKeyboard);
-        document.addEventListener('touchstart', handleTouchStart, false);
-        document.addEventListener('touchend', handleTouchEnd, false);
+        document.addEventListener('touchstart', handleTouchStart, { passive: true });
+        document.addEventListener('touchend', handleTouchEnd, { passive: true });
         document.addEventListener('mousemove', showCursor);
         cursorTimer = setTimeout(hideCursor, 2000);
 
@@ -276,7 +666,7 @@ const PresentationNav = (function() {
         currentView = 0;
         updatePosition();
         initFromHash();
-
+        recordSpan('init', initStart, performance.now(), { slides: total, virtualized });
     }
 
     function initFromHash() {
@@ -294,12 +684,16 @@ const PresentationNav = (function() {
         document.removeEventListener('touchstart', handleTouchStart);
         document.removeEventListener('touchend', handleTouchEnd);
         document.removeEventListener('mousemove', showCursor);
+        document.removeEventListener('visibilitychange', handleVisibilityChange);
+        window.removeEventListener('pagehide', flushMetrics);
+        flushMetrics();
         clearTimeout(cursorTimer);
+        clearTimeout(scrollTimer);
     }
 
     function updateHash() {
-        const slideNum = currentSlide;
-        history.replaceState(null, null, `#slide-${slideNum}`);
+        hashPending = true;
+        scheduleRender();
     }
 
     function goTo(slideIndex, view = 0) {
@@ -314,7 +708,7 @@ const PresentationNav = (function() {
         return { slide: currentSlide, view: currentView, total: totalSlides };
     }
 
-    return { init, destroy, goTo, getCurrentPosition };
+    return { init, destroy, goTo, getCurrentPosition, getMetrics };
 })();
 
 if (typeof module !== 'undefined' && module.exports) {
@@ -0,0 +1,199 @@
+/**
+ * Recherche plein texte dans les cours, sans serveur
+ * Interroge les index par collection générés au build (search/<collection>.json),
+ * chargés à la première interaction avec le champ de recherche.
+ * Le repli des accents reproduit lib/search.py : « œdème » et « OEDEME » donnent « oedeme ».
+ * match() est aussi utilisé par la recherche dans une présentation (index embarqué).
+ */
+
+const PyprezSearch = (function() {
+    'use strict';
+
+    const MAX_RESULTS = 20;
+    const MAX_EXPANSIONS = 64;   // Termes retenus pour un préfixe (dernier mot en cours de frappe)
+    const MIN_TOKEN_LENGTH = 2;
+
+    let root = '';
+    let shardIds = [];
+    let stopwords = new Set();
+    let shards = [];
+    let loading = null;
+    let input, status, results;
+    let renderPending = false;
+
+    function fold(text) {
+        return text
+            .replace(/[œŒ]/g, 'oe')
+            .replace(/[æÆ]/g, 'ae')
+            .replace(/ß/g, 'ss')
+            .normalize('NFD')
+            .replace(/\p{Mn}/gu, '')
+            .toLowerCase();
+    }
+
+    // Le dernier mot est traité comme un préfixe tant qu'il n'est pas suivi d'un espace
+    function queryTokens(query) {
+        const words = fold(query).match(/[a-z0-9]+/g) || [];
+        const open = words.length && !/\s$/.test(query);
+        const tokens = [];
+        words.forEach((word, i) => {
+            const prefix = open && i === words.length - 1;
+            if (word.length < MIN_TOKEN_LENGTH) return;
+            if (stopwords.has(word) && !prefix) return;
+            tokens.push({ text: word, prefix });
+        });
+        return tokens;
+    }
+
+    function loadShard(id) {
+        return fetch(`${root}search/${encodeURIComponent(id)}.json`)
+            .then(response => response.ok ? response.json() : null)
+            .then(shard => {
+                if (shard) shards.push(shard);
+            })
+            .catch(() => {});
+    }
+
+    function load() {
+        if (!loading) {
+            status.textContent = 'Chargement de l\'index…';
+            loading = Promise.all(shardIds.map(loadShard)).then(() => {
+                status.textContent = shards.length ? '' : 'Recherche indisponible';
+            });
+        }
+        return loading;
+    }
+
+    // Postings d'un terme (ou de tous les termes commençant par un préfixe) : doc -> poids max
+    function lookup(shard, token) {
+        const matches = new Map();
+        const add = postings => {
+            for (let i = 0; i < postings.length; i += 2) {
+                if ((matches.get(postings[i]) || 0) < postings[i + 1]) {
+                    matches.set(postings[i], postings[i + 1]);
+                }
+            }
+        };
+
+        if (!token.prefix) {
+            if (shard.terms[token.text]) add(shard.terms[token.text]);
+            return matches;
+        }
+
+        if (!shard.keys) shard.keys = Object.keys(shard.terms).sort();
+        const keys = shard.keys;
+        let lo = 0, hi = keys.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (keys[mid] < token.text) lo = mid + 1;
+            else hi = mid;
+        }
+        for (let i = lo, n = 0; i < keys.length && n < MAX_EXPANSIONS && keys[i].startsWith(token.text); i++, n++) {
+            add(shard.terms[keys[i]]);
+        }
+        return matches;
+    }
+
+    // Documents contenant tous les mots de la requête : [[doc, score]], score = somme des poids
+    function match(index, query) {
+        const tokens = queryTokens(query);
+        if (!tokens.length) return [];
+
+        let scores = lookup(index, tokens[0]);
+        for (let t = 1; t < tokens.length && scores.size; t++) {
+            const matches = lookup(index, tokens[t]);
+            const next = new Map();
+            for (const [doc, score] of scores) {
+                const weight = matches.get(doc);
+                if (weight) next.set(doc, score + weight);
+            }
+            scores = next;
+        }
+        return [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+    }
+
+    function search(query) {
+        const hits = [];
+        const seen = new Set();
+        for (const shard of shards) {
+            for (const [doc, score] of match(shard, query)) {
+                const [course, slide, title] = shard.docs[doc];
+                const [url, courseTitle] = shard.courses[course];
+                const key = `${url}#${slide}`;
+                if (seen.has(key)) continue;   // Cours présent dans plusieurs collections
+                seen.add(key);
+                hits.push({ url, slide, title, courseTitle, score });
+            }
+        }
+
+        hits.sort((a, b) => b.score - a.score || a.slide - b.slide);
+        return hits;
+    }
+
+    function renderResults() {
+        renderPending = false;
+        const query = input.value;
+        const hits = search(query);
+        const fragment = document.createDocumentFragment();
+
+        hits.slice(0, MAX_RESULTS).forEach(hit => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = `${root}${hit.url}#slide-${hit.slide}`;
+            const title = document.createElement('span');
+            title.className = 'search-hit-title';
+            title.textContent = hit.title;
+            const course = document.createElement('span');
+            course.className = 'search-hit-course';
+            course.textContent = hit.courseTitle;
+            link.append(title, course);
+            item.appendChild(link);
+            fragment.appendChild(item);
+        });
+
+        results.replaceChildren(fragment);
+        if (!query.trim()) {
+            status.textContent = '';
+        } else if (!hits.length) {
+            status.textContent = 'Aucun résultat';
+        } else {
+            status.textContent = hits.length > MAX_RESULTS
+                ? `${MAX_RESULTS} premiers résultats sur ${hits.length}`
+                : `${hits.length} résultat${hits.length > 1 ? 's' : ''}`;
+        }
+    }
+
+    function scheduleRender() {
+        if (renderPending) return;
+        renderPending = true;
+        load().then(() => requestAnimationFrame(renderResults));
+    }
+
+    function handleKeydown(e) {
+        if (e.key === 'Escape') {
+            input.value = '';
+            scheduleRender();
+        }
+    }
+
+    function setStopwords(words) {
+        stopwords = new Set(words || []);
+    }
+
+    function init(options = {}) {
+        root = options.root || '';
+        shardIds = options.shards || [];
+        setStopwords(options.stopwords);
+
+        input = document.getElementById('searchInput');
+        status = document.getElementById('searchStatus');
+        results = document.getElementById('searchResults');
+        if (!input || !status || !results) return;
+
+        input.addEventListener('focus', load, { once: true });
+        input.addEventListener('input', scheduleRender);
+        input.addEventListener('keydown', handleKeydown);
+    }
+
+    return { init, search, match, setStopwords };
+})();
@@ -0,0 +1,121 @@
+/**
+ * Service worker : consultation hors-ligne des cours
+ * Le build préfixe ce fichier par PRECACHE_VERSION (empreinte du manifeste) :
+ * le navigateur ne réinstalle le worker que lorsqu'une sortie a changé.
+ *
+ * - Cache "shell" : accueil, catalogue, pages de collections, fonts, QR codes
+ * - Un cache par collection (cours, images, recherche, questions), rempli à la première visite de sa page
+ * - Réponses depuis le cache d'abord ; mise à jour en arrière-plan à chaque nouvelle version,
+ *   en ne téléchargeant que les entrées dont l'empreinte a changé
+ */
+
+const MANIFEST_URL = 'precache-manifest.json';
+const SHELL_CACHE = 'pyprez-shell';
+const META_CACHE = 'pyprez-meta';
+const COLLECTION_PREFIX = 'pyprez-collection-';
+const APPLIED_MANIFEST = '__applied-manifest__';
+const EMPTY_MANIFEST = { version: '', entries: {}, shell: [], collections: {} };
+
+function scoped(path) {
+    return new URL(path, self.registration.scope).href;
+}
+
+async function fetchManifest() {
+    const response = await fetch(scoped(MANIFEST_URL), { cache: 'no-store' });
+    if (!response.ok) throw new Error(`Manifeste indisponible (${response.status})`);
+    return response.json();
+}
+
+async function appliedManifest() {
+    const meta = await caches.open(META_CACHE);
+    const response = await meta.match(scoped(APPLIED_MANIFEST));
+    return response ? response.json() : EMPTY_MANIFEST;
+}
+
+async function storeManifest(manifest) {
+    const meta = await caches.open(META_CACHE);
+    await meta.put(scoped(APPLIED_MANIFEST), new Response(JSON.stringify(manifest), {
+        headers: { 'Content-Type': 'application/json' },
+    }));
+}
+
+/**
+ * Aligne un cache sur une liste d'entrées : supprime les entrées retirées,
+ * ne télécharge que celles dont l'empreinte diffère de la version précédente.
+ * Une entrée injoignable n'interrompt pas l'installation : elle est retentée à la synchronisation suivante.
+ */
+async function syncCache(cacheName, paths, manifest, previous) {
+    const cache = await caches.open(cacheName);
+    const wanted = new Set(paths.map(scoped));
+
+    for (const request of await cache.keys()) {
+        if (!wanted.has(request.url)) await cache.delete(request);
+    }
+
+    await Promise.all(paths.map(async path => {
+        const url = scoped(path);
+        if (previous.entries[path] === manifest.entries[path] && await cache.match(url)) return;
+        try {
+            const response = await fetch(url, { cache: 'no-cache' });
+            if (response.ok) await cache.put(url, response);
+        } catch (error) {
+            // Hors-ligne ou erreur réseau : servie par le réseau en attendant
+        }
+    }));
+}
+
+async function installCollection(id) {
+    const manifest = await appliedManifest();
+    const paths = manifest.collections[id];
+    if (!paths) return;
+    await syncCache(COLLECTION_PREFIX + id, paths, manifest, manifest);
+}
+
+function collectionForPage(url) {
+    const match = url.match(/\/collections\/([^/?#]+)\.html(?:[?#].*)?$/);
+    return match ? decodeURIComponent(match[1]) : null;
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const manifest = await fetchManifest();
+        const previous = await appliedManifest();
+        await syncCache(SHELL_CACHE, manifest.shell, manifest, previous);
+
+        // Mettre à jour les collections déjà installées sur cet appareil
+        for (const name of await caches.keys()) {
+            if (!name.startsWith(COLLECTION_PREFIX)) continue;
+            const paths = manifest.collections[name.slice(COLLECTION_PREFIX.length)];
+            if (paths) await syncCache(name, paths, manifest, previous);
+        }
+
+        await storeManifest(manifest);
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const manifest = await appliedManifest();
+        for (const name of await caches.keys()) {
+            if (name.startsWith(COLLECTION_PREFIX) && !manifest.collections[name.slice(COLLECTION_PREFIX.length)]) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET' || !request.url.startsWith(self.registration.scope)) return;
+
+    event.respondWith((async () => {
+        const cached = await caches.match(request, { ignoreSearch: true });
+        return cached || fetch(request);
+    })());
+
+    // Visite d'une page de collection : installer ses cours pour la consultation hors-ligne
+    const collection = collectionForPage(request.url);
+    if (collection) event.waitUntil(installCollection(collection));
+});
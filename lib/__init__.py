@@ -6,6 +6,10 @@ from .config import THEMES, DEFAULT_THEME, CSS_FONTS, ASSETS
 from .models import Slide, Presentation
 from .parser import parse_presentation, parse_details_only, lint_presentation, parse_ref_attrs
 from .generator import HTMLGenerator, PageGenerator, format_markdown, format_table_html
+from .images import ImageRegistry, PublishedImage, resolve_image_url, image_attrs, read_image_size
+from .details import render_details
+from .sink import OutputSink, DirectorySink, MemorySink, ZipSink
+from .site import build_site, BuildResult, CourseResult
 __all__ = [
     'Slide',
     'Presentation',
@@ -18,6 +22,19 @@ __all__ = [
     'PageGenerator',
     'format_markdown',
     'format_table_html',
+    'ImageRegistry',
+    'PublishedImage',
+    'resolve_image_url',
+    'image_attrs',
+    'read_image_size',
+    'render_details',
+    'OutputSink',
+    'DirectorySink',
+    'MemorySink',
+    'ZipSink',
+    'build_site',
+    'BuildResult',
+    'CourseResult',
     'ASSETS',
     'THEMES',
     'DEFAULT_THEME',
@@ -0,0 +1,169 @@
+"""
+Traitement par lots des scripts compile_cours.py et extract_details.py : fichiers, motifs glob,
+dossiers et '-' (entrée ou sortie standard), en parallèle avec --jobs
+"""
+
+import sys
+import glob
+import logging
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .config import SOURCE_EXCLUDED_DIRS, SOURCE_EXCLUDED_FILES
+from .log import get_logger, setup_logging
+from .sync import write_if_changed
+
+
+log = get_logger('batch')
+
+# Entrée ou sortie standard
+STDIO = '-'
+
+
+def is_stdio(path: Optional[Path]) -> bool:
+    return path is not None and str(path) == STDIO
+
+
+@dataclass
+class BatchItem:
+    """Un fichier du lot : source et nom de sortie relatif (sans extension) dans un dossier -o"""
+    source: Path
+    name: str
+
+    @property
+    def label(self) -> str:
+        return 'entrée standard' if is_stdio(self.source) else str(self.source)
+
+
+def _dir_sources(directory: Path) -> List[Path]:
+    """Cours Markdown d'un dossier et de ses sous-dossiers (hors images, css, README...)"""
+    return [
+        path for path in sorted(directory.rglob('*.md'))
+        if path.name not in SOURCE_EXCLUDED_FILES
+        and not SOURCE_EXCLUDED_DIRS.intersection(path.relative_to(directory).parts[:-1])
+    ]
+
+
+def expand_inputs(inputs: Sequence[str]) -> List[BatchItem]:
+    """
+    Fichiers désignés par les arguments : fichiers, motifs glob ('cours/**/*.md'), dossiers
+    (parcourus récursivement) et '-'. Un fichier cité plusieurs fois n'est traité qu'une fois.
+    """
+    items: List[BatchItem] = []
+    seen = set()
+
+    def add(path: Path, name: str):
+        key = path if is_stdio(path) else path.resolve()
+        if key not in seen:
+            seen.add(key)
+            items.append(BatchItem(path, name))
+
+    for arg in inputs:
+        path = Path(arg)
+        if arg == STDIO:
+            add(path, 'stdin')
+        elif path.is_dir():
+            for source in _dir_sources(path):
+                add(source, source.relative_to(path).with_suffix('').as_posix())
+        elif any(char in arg for char in '*?['):
+            matches = [Path(match) for match in sorted(glob.glob(arg, recursive=True))]
+            if not matches:
+                raise FileNotFoundError(f"aucun fichier ne correspond à {arg}")
+            for source in matches:
+                if source.is_file():
+                    add(source, source.stem)
+        else:
+            if not path.is_file():
+                raise FileNotFoundError(f"fichier {arg} introuvable")
+            add(path, path.stem)
+    return items
+
+
+def output_path(item: BatchItem, output: Optional[Path], suffix: str, batch: bool) -> Path:
+    """
+    Sortie d'un fichier du lot : à côté de la source par défaut (sortie standard pour '-'),
+    dans le dossier -o pour un lot ou si -o est un dossier, sinon le fichier -o lui-même
+    """
+    if output is None:
+        if is_stdio(item.source):
+            return Path(STDIO)
+        return item.source.with_name(item.source.stem + suffix)
+    if is_stdio(output):
+        return output
+    if batch or output.is_dir():
+        return output / (item.name + suffix)
+    return output
+
+
+def read_source(path: Path) -> str:
+    """Contenu Markdown d'un fichier ou de l'entrée standard"""
+    if is_stdio(path):
+        return sys.stdin.read()
+    return path.read_text(encoding='utf-8')
+
+
+def write_output(path: Path, text: str) -> bool:
+    """Écrit un document (sortie standard pour '-'), retourne vrai s'il a changé"""
+    if is_stdio(path):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return True
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return write_if_changed(path, text)
+
+
+def check_batch(items: List[BatchItem], output: Optional[Path]) -> Optional[str]:
+    """Message d'erreur si le lot et la sortie sont incompatibles, sinon None"""
+    if not items:
+        return "aucun fichier Markdown à traiter"
+    if len(items) > 1:
+        if is_stdio(output):
+            return "la sortie standard (-o -) n'accepte qu'un seul fichier"
+        if any(is_stdio(item.source) for item in items):
+            return "l'entrée standard (-) ne peut pas être combinée à d'autres fichiers"
+        if output is not None and output.is_file():
+            return f"-o {output} doit être un dossier pour traiter plusieurs fichiers"
+        if output is not None:
+            # Même nom de sortie (a/x.md et b/x.md) : un fichier écraserait l'autre
+            sources: Dict[str, List[str]] = {}
+            for item in items:
+                sources.setdefault(item.name, []).append(item.label)
+            clashes = [f"{name} ← {', '.join(labels)}" for name, labels in sources.items() if len(labels) > 1]
+            if clashes:
+                return (f"plusieurs fichiers auraient la même sortie dans {output} : " + ' ; '.join(clashes)
+                        + " (traitez-les séparément ou depuis leur dossier parent)")
+    return None
+
+
+def run_batch(task: Callable, items: List[BatchItem], jobs: int, log_options: tuple = ()) -> int:
+    """
+    Applique task(item) à chaque fichier, en parallèle sur jobs processus (chacun lit les
+    assets une seule fois), et retourne le nombre d'échecs. task doit être une fonction de
+    module (transmise aux processus) ; log_options : arguments de setup_logging des processus.
+    """
+    failures = 0
+
+    def report(item: BatchItem, error: Exception):
+        nonlocal failures
+        failures += 1
+        log.error("❌ Erreur sur %s : %s", item.label, error, extra={'path': item.label},
+                  exc_info=error if log.isEnabledFor(logging.DEBUG) else None)
+
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                task(item)
+            except Exception as e:
+                report(item, e)
+        return failures
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=setup_logging, initargs=log_options) as pool:
+        futures = [(item, pool.submit(task, item)) for item in items]
+        for item, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                report(item, e)
+    return failures
@@ -0,0 +1,70 @@
+"""
+Catalogue du site : collections, cours et compteurs précalculés
+"""
+
+from typing import Dict, List
+from datetime import datetime
+
+
+def count_courses(courses: List[Dict]) -> Dict[str, object]:
+    """Compte les cours et QROC d'une liste et retourne les compteurs avec leur libellé"""
+    qroc = sum(1 for c in courses if c.get('theme') == 'qroc')
+    regular = len(courses) - qroc
+    parts = []
+    if regular:
+        parts.append(f'{regular} cours')
+    if qroc:
+        parts.append(f'{qroc} QROC')
+    return {'cours': regular, 'qroc': qroc, 'label': ' · '.join(parts)}
+
+
+def build_catalog(
+    collections_config: Dict,
+    collections_data: Dict[str, List[Dict]],
+    site_title: str,
+    qr_codes: Dict[str, bool] | None = None,
+    generated_at: datetime | None = None,
+) -> Dict:
+    """
+    Construit le catalogue une seule fois : il alimente la page d'accueil,
+    les pages de collections et catalog.json.
+    Seules les collections définies dans le TOML et ayant des cours sont retenues.
+    """
+    qr_codes = qr_codes or {}
+    courses = {}
+    collections = []
+
+    for coll_id, config in collections_config.items():
+        coll_courses = collections_data.get(coll_id)
+        if not coll_courses:
+            continue
+        ordered = sorted(coll_courses, key=lambda c: c.get('date', ''), reverse=True)
+        for course in ordered:
+            courses.setdefault(course['url'], course)
+        collections.append({
+            'id': coll_id,
+            'title': config.get('title', coll_id),
+            'description': config.get('description', ''),
+            'icon': config.get('icon', '📚'),
+            'theme': config.get('theme'),
+            'url': f'collections/{coll_id}.html',
+            'has_qr': qr_codes.get(coll_id, False),
+            'counts': count_courses(coll_courses),
+            'courses': [c['url'] for c in ordered],
+        })
+
+    return {
+        'site_title': site_title,
+        'generated_at': (generated_at or datetime.now()).strftime('%d/%m/%Y à %H:%M'),
+        'collections': collections,
+        'courses': courses,
+    }
+
+
+def catalog_json(catalog: Dict) -> Dict:
+    """Version publiable du catalogue (sans champs internes au build)"""
+    return {
+        'site_title': catalog['site_title'],
+        'collections': catalog['collections'],
+        'courses': list(catalog['courses'].values()),
+    }
@@ -60,10 +60,22 @@ THEMES = {
 
 DEFAULT_THEME = 'ocean'
 
+# Cache de build dans le dossier de sortie (exclu du déploiement)
+CACHE_DIR = '.cache'
+OUTPUT_DIGESTS = 'outputs.json'
+GENERATED_FILES = 'generated.json'
+
+# Dossiers et fichiers Markdown des sources qui ne sont pas des cours
+SOURCE_EXCLUDED_DIRS = {'images', '__pycache__', '.git', 'fonts', 'css', 'js', 'lib'}
+SOURCE_EXCLUDED_FILES = ('README.md', 'FORMAT.md', 'PROMPT.md')
+
 # CSS et JS par défaut (chemins relatifs au script principal)
 ASSETS = {
     'css': 'css/style.css',
     'js': 'js/presentation.js',
+    'search_css': 'css/search.css',
+    'search_js': 'js/search.js',
+    'details_css': 'css/details.css',
 }
 
 
@@ -0,0 +1,46 @@
+"""
+Empreintes de contenu des fichiers, mises en cache selon (taille, mtime)
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def file_digest(path: Path) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DigestCache:
+    """Cache chemin -> [taille, mtime_ns, empreinte] : un fichier inchangé n'est pas relu"""
+
+    def __init__(self, entries: Optional[Dict[str, list]] = None):
+        self.entries: Dict[str, list] = entries if isinstance(entries, dict) else {}
+
+    @classmethod
+    def load(cls, cache_file: Path) -> 'DigestCache':
+        """Charge un cache enregistré (vide s'il est absent ou illisible)"""
+        try:
+            return cls(json.loads(cache_file.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, cache_file: Path):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(self.entries, sort_keys=True), encoding='utf-8')
+
+    def digest(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path)
+        cached = self.entries.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(path)
+        self.entries[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
@@ -3,14 +3,17 @@ Générateur HTML pour les présentations et pages statiques
 """
 
 import re
+import json
 import html as _html
 from pathlib import Path
-from typing import Optional, Dict, List
-from datetime import datetime
+from typing import Optional, Dict, List, Tuple
 
 from .models import Slide, Presentation
 from .config import CSS_FONTS, ASSETS, THEMES, DEFAULT_THEME
-from .parser import parse_ref_attrs
+from .parser import parse_ref_attrs, slide_image_refs, IMAGE_LINE_RE
+from .images import PublishedImage, image_attrs, resolve_image_url
+from .offline import service_worker_snippet
+from .search import STOPWORDS, deck_index
 
 
 def format_markdown(text: str) -> str:
@@ -48,19 +51,15 @@ def format_reference(attrs: dict) -> str:
     return f'<p class="reference">{". ".join(parts)}.</p>'
 
 
-def format_detail_line(line: str) -> str:
+def format_detail_line(line: str, images: Optional[Dict[str, PublishedImage]] = None) -> str:
     """Formate une ligne de détail en HTML"""
-    img_match = re.match(r'^!\[([^\]]*)\]\(([^)]+)\)$', line.strip())
+    img_match = IMAGE_LINE_RE.match(line.strip())
     if img_match:
         alt = _html.escape(img_match.group(1))
-        raw_url = img_match.group(2)
-        if not raw_url.startswith(('http://', 'https://', '/')):
-            url = f'../../images/{Path(raw_url).name}'
-        else:
-            url = raw_url
+        attrs = image_attrs(img_match.group(2), images, lazy=True)
         caption = f'<figcaption>{alt}</figcaption>' if alt else ''
         return f'''<figure class="detail-image">
-                            <img src="{_html.escape(url)}" alt="{alt}">
+                            <img {attrs} alt="{alt}">
                             {caption}
                         </figure>'''
 
@@ -75,14 +74,63 @@ def format_detail_line(line: str) -> str:
     return f'<p>{format_markdown(line)}</p>'
 
 
+# Contenu des fichiers statiques lus par le processus : {chemin: ((mtime_ns, taille), texte)}
+_asset_texts: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
+
+def read_asset(path: Path) -> str:
+    """Lit un fichier statique (CSS, JS) une seule fois par processus, puis seulement s'il a changé"""
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _asset_texts.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, path.read_text(encoding='utf-8'))
+        _asset_texts[path] = cached
+    return cached[1]
+
+
+# Caractères de JSON à échapper dans un <script> en ligne : '</script>' ou '<!--' dans un titre
+# fermeraient le script, U+2028 et U+2029 sont des fins de ligne pour les anciens moteurs JS
+_SCRIPT_JSON_ESCAPES = {
+    '<': '\\u003c',
+    '>': '\\u003e',
+    '&': '\\u0026',
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029',
+}
+
+
+def script_json(data) -> str:
+    """Sérialise data en JSON insérable tel quel dans un <script> en ligne"""
+    text = json.dumps(data)
+    for char, escaped in _SCRIPT_JSON_ESCAPES.items():
+        text = text.replace(char, escaped)
+    return text
+
+
 class BaseGenerator:
     """Classe de base pour la génération HTML"""
     
     FAVICON = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'><rect width='32' height='32' rx='6' fill='%230a4d68'/><path d='M14 8h4v16h-4zM8 14h16v4H8z' fill='%23ffffff'/></svg>"
     
-    def __init__(self, base_path: Optional[Path] = None, theme: Optional[str] = None):
+    def __init__(self, base_path: Optional[Path] = None, theme: Optional[str] = None, offline: bool = False):
         self.base_path = base_path or Path(__file__).parent.parent
         self.theme = theme if theme in THEMES else DEFAULT_THEME
+        self.offline = offline
+        self._asset_cache: Dict[str, str] = {}
+    
+    def _load_asset(self, key: str) -> str:
+        """Charge un asset statique (mis en cache), à défaut depuis le répertoire du script"""
+        if key not in self._asset_cache:
+            path = self.base_path / ASSETS[key]
+            if not path.exists():
+                path = Path(__file__).parent.parent / ASSETS[key]
+            self._asset_cache[key] = read_asset(path)
+        return self._asset_cache[key]
+    
+    def _offline_script(self, root: str) -> str:
+        """Enregistrement du service worker si le site est publié pour le hors-ligne"""
+        return service_worker_snippet(root) if self.offline else ''
     
     def _get_theme_colors(self, theme: Optional[str] = None) -> Dict[str, str]:
         """Retourne les couleurs du thème"""
@@ -134,7 +182,7 @@ a {{
         """Charge le CSS depuis le fichier ou retourne le CSS par défaut"""
         css_path = self.base_path / ASSETS['css']
         if css_path.exists():
-            css = css_path.read_text(encoding='utf-8')
+            css = read_asset(css_path)
         else:
             css = self._get_base_css()
         
@@ -151,13 +199,13 @@ a {{
         """Charge le JavaScript depuis le fichier"""
         js_path = self.base_path / ASSETS['js']
         if js_path.exists():
-            return js_path.read_text(encoding='utf-8')
+            return read_asset(js_path)
         
         # Fallback : chercher dans le répertoire du script
         script_dir = Path(__file__).parent.parent
         js_path = script_dir / ASSETS['js']
         if js_path.exists():
-            return js_path.read_text(encoding='utf-8')
+            return read_asset(js_path)
         
         return 'console.error("JS not found");'
 
@@ -165,6 +213,10 @@ a {{
 class HTMLGenerator(BaseGenerator):
     """Génère le HTML d'une présentation"""
     
+    def __init__(self, base_path: Optional[Path] = None, theme: Optional[str] = None, images: Optional[Dict[str, PublishedImage]] = None, offline: bool = False, metrics_endpoint: Optional[str] = None):
+        super().__init__(base_path, theme, offline)
+        self.images = images or {}
+        self.metrics_endpoint = metrics_endpoint
 
     def generate(self, presentation: Presentation, is_draft: bool) -> str:
         """Génère le HTML complet de la présentation avec CSS et JS inlinés"""
@@ -196,15 +248,60 @@ class HTMLGenerator(BaseGenerator):
         </div>
     </div>
 
+    <div class="deck-search" id="deckSearch" hidden>
+        <div class="deck-search-panel" role="search">
+            <input type="search" id="deckSearchInput" class="deck-search-input" placeholder="Rechercher une slide…" autocomplete="off" aria-label="Rechercher une slide">
+            <ol class="deck-search-results" id="deckSearchResults"></ol>
+        </div>
+    </div>
+
     <script>
+{self._load_asset('search_js')}
 {js}
     </script>
     <script>
-        PresentationNav.init({presentation.total_slides});
+        PresentationNav.init({presentation.total_slides}, {script_json(self._nav_options(presentation))});
     </script>
+    {self._offline_script('../../')}
 </body>
 </html>'''
     
+    def _nav_options(self, presentation: Presentation) -> Dict:
+        """Options passées à PresentationNav.init() depuis les métadonnées"""
+        options = {
+            # Carte de navigation : vue max de chaque groupe (ids s<i>, s<i>-d, s<i>-q)
+            'nav': {
+                'maxViews': [s.max_view for s in presentation.slides],
+                'images': self._nav_images(presentation),
+            },
+            # Index de recherche (touche /), construit ici plutôt qu'en parcourant le DOM
+            'search': {**deck_index(presentation), 'stopwords': sorted(STOPWORDS)},
+        }
+        virtualize = str(presentation.metadata.get('virtualize', 'auto')).lower()
+        if virtualize in ('true', 'false'):
+            options['virtualize'] = virtualize == 'true'
+        preload = str(presentation.metadata.get('preload', '')).strip()
+        if preload.isdigit():
+            options['preload'] = int(preload)
+        # Instrumentation : spans envoyés par sendBeacon (sinon activable avec ?metrics)
+        if self.metrics_endpoint:
+            options['metrics'] = {'endpoint': self.metrics_endpoint}
+        return options
+    
+    def _nav_images(self, presentation: Presentation) -> Dict[int, Dict[str, List[str]]]:
+        """URLs publiées des images de chaque groupe (vue principale / détails), pour le préchargement"""
+        nav_images = {}
+        for i, slide in enumerate(presentation.slides):
+            main, detail = slide_image_refs(slide)
+            if slide.max_view < 1:
+                detail = []
+            if main or detail:
+                nav_images[i] = {
+                    'main': [resolve_image_url(url, self.images) for url in main],
+                    'detail': [resolve_image_url(url, self.images) for url in detail],
+                }
+        return nav_images
+    
     def _generate_slides(self, presentation: Presentation) -> str:
         """Génère le HTML de toutes les slides"""
         html_parts = []
@@ -214,22 +311,28 @@ class HTMLGenerator(BaseGenerator):
         for i, slide in enumerate(presentation.slides):
             is_last = (i == len (presentation.slides) -1)
             if slide.slide_type == 'title':
-                html_parts.append(self._slide_title(slide))
+                html_parts.append(self._slide_title(slide, i))
             elif slide.slide_type == 'section':
-                html_parts.append(self._slide_section(slide, is_last))
+                html_parts.append(self._slide_section(slide, i, is_last))
             elif slide.slide_type == 'content':
-                html_parts.append(self._slide_content(slide, total, is_last))
+                html_parts.append(self._slide_content(slide, i, total, is_last))
             elif slide.slide_type == 'image':
-                html_parts.append(self._slide_image(slide, total, is_last))
+                html_parts.append(self._slide_image(slide, i, total, is_last))
         
         return '\n'.join(html_parts)
     
-    def _slide_title(self, slide: Slide) -> str:
+    def _placeholders(self, count: int) -> str:
+        """Cellules vides complétant la ligne de la grille (3 vues par groupe)"""
+        return ''.join('''
+
+            <div class="slide" style="visibility: hidden;"></div>''' for _ in range(count))
+    
+    def _slide_title(self, slide: Slide, index: int) -> str:
         """Génère une slide de titre"""
         subtitle = f'<p class="subtitle">{_html.escape(slide.subtitle)}</p>' if slide.subtitle else ''
         return f'''
             <!-- SLIDE TITRE -->
-            <div class="slide slide-main" data-no-annexes="true">
+            <div class="slide slide-main" id="s{index}" data-no-annexes="true">
                 <div class="position-indicator"></div>
                 <div class="content">
                     <h1>{_html.escape(slide.title)}</h1>
@@ -238,9 +341,9 @@ class HTMLGenerator(BaseGenerator):
                 <div class="nav-hint">
                     <span><span class="key-icon">↓</span> Commencer le cours</span>
                 </div>
-            </div>'''
+            </div>''' + self._placeholders(2)
     
-    def _slide_section(self, slide: Slide, is_last: bool = False) -> str:
+    def _slide_section(self, slide: Slide, index: int, is_last: bool = False) -> str:
         """Génère une slide de section"""
         subtitle = f'<p class="subtitle">{_html.escape(slide.subtitle)}</p>' if slide.subtitle else ''
         if is_last:
@@ -252,7 +355,7 @@ class HTMLGenerator(BaseGenerator):
         
         return f'''
             <!-- SLIDE SECTION -->
-            <div class="slide slide-section" data-no-annexes="true">
+            <div class="slide slide-section" id="s{index}" data-no-annexes="true">
                 <div class="content">
                     <h1>{_html.escape(slide.title)}</h1>
                     {subtitle}
@@ -260,9 +363,9 @@ class HTMLGenerator(BaseGenerator):
                 <div class="nav-hint">
                         {nav_hint}
                 </div>
-            </div>'''
+            </div>''' + self._placeholders(2)
     
-    def _slide_content(self, slide: Slide, total: int, is_last: bool = False) -> str:
+    def _slide_content(self, slide: Slide, index: int, total: int, is_last: bool = False) -> str:
         """Génère une slide de contenu avec ses annexes"""
         max_view = slide.max_view
         
@@ -328,7 +431,7 @@ class HTMLGenerator(BaseGenerator):
         
         html = f'''
             <!-- SLIDE {slide.number} : {_html.escape(slide.title)} -->
-            <div class="slide slide-main"{data_attrs}>
+            <div class="slide slide-main" id="s{index}"{data_attrs}>
                 <div class="position-indicator">{slide.number} / {total}</div>
                 <div class="content">
                     <h1>{_html.escape(slide.title)}</h1>
@@ -340,19 +443,17 @@ class HTMLGenerator(BaseGenerator):
             </div>'''
         
         if max_view >= 1:
-            html += self._slide_details(slide, total, has_questions=(max_view == 2))
+            html += self._slide_details(slide, index, total, has_questions=(max_view == 2))
         
         if max_view == 2:
-            html += self._slide_questions(slide, total)
-        elif max_view == 1:
-            html += '''
-
-            <div class="slide" style="visibility: hidden;"></div>'''
+            html += self._slide_questions(slide, index, total)
+        else:
+            html += self._placeholders(2 - max_view)
         
         return html
     
   
-    def _slide_details(self, slide: Slide, total: int, has_questions: bool) -> str:
+    def _slide_details(self, slide: Slide, index: int, total: int, has_questions: bool) -> str:
         """Génère la slide de détails avec références en bas"""
         from .parser import parse_details_with_references
         
@@ -380,7 +481,7 @@ class HTMLGenerator(BaseGenerator):
                     if not l.strip():
                         continue
                     line_with_refs = re.sub(r'\[\^(\w+)\]', replace_ref, l)
-                    lines_html.append(format_detail_line(line_with_refs))
+                    lines_html.append(format_detail_line(line_with_refs, self.images))
                 paragraphs_html.append(f'''                        <div class="perspective-block">
                             <div class="perspective-label">Perspective</div>
                             {''.join(lines_html)}
@@ -388,7 +489,7 @@ class HTMLGenerator(BaseGenerator):
             # Texte normal
             elif isinstance(item, str):
                 line_with_refs = re.sub(r'\[\^(\w+)\]', replace_ref, item)
-                paragraphs_html.append(f'                        {format_detail_line(line_with_refs)}')
+                paragraphs_html.append(f'                        {format_detail_line(line_with_refs, self.images)}')
       
         paragraphs = '\n'.join(paragraphs_html)
         
@@ -422,7 +523,7 @@ class HTMLGenerator(BaseGenerator):
         
         return f'''
 
-                <div class="slide slide-detail">
+                <div class="slide slide-detail" id="s{index}-d">
                     <div class="position-indicator">{slide.number} / {total}</div>
                     <div class="content">
                         <h2>Détails</h2>
@@ -437,7 +538,7 @@ class HTMLGenerator(BaseGenerator):
 
 
             
-    def _slide_questions(self, slide: Slide, total: int) -> str:
+    def _slide_questions(self, slide: Slide, index: int, total: int) -> str:
         """Génère la slide de questions"""
         items = '\n'.join(
             f'''                        <li class="question-item">
@@ -449,7 +550,7 @@ class HTMLGenerator(BaseGenerator):
         
         return f'''
 
-            <div class="slide slide-question">
+            <div class="slide slide-question" id="s{index}-q">
                 <div class="position-indicator">{slide.number} / {total}</div>
                 <div class="content">
                     <h2>Questions de révision</h2>
@@ -462,7 +563,7 @@ class HTMLGenerator(BaseGenerator):
                 </div>
             </div>'''
     
-    def _slide_image(self, slide: Slide, total: int, is_last: bool = False) -> str:
+    def _slide_image(self, slide: Slide, index: int, total: int, is_last: bool = False) -> str:
         """Génère une slide d'image"""
         max_view = slide.max_view
         
@@ -473,10 +574,9 @@ class HTMLGenerator(BaseGenerator):
         else:
             data_attrs = ''
 
-        # Résoudre l'URL de l'image
-        image_url = slide.image_url
-        if image_url and not image_url.startswith(('http://', 'https://', '/')):
-            image_url = f'../../images/{image_url}'
+        # Résoudre l'URL de l'image (nom haché publié et dimensions)
+        # Chargement différé : presentation.js précharge les images des slides suivantes
+        image_attrs_html = image_attrs(slide.image_url, self.images, lazy=True) if slide.image_url else 'src=""'
 
         caption = f'<p class="image-caption">{slide.image_caption}</p>' if slide.image_caption else ''
        
@@ -499,44 +599,48 @@ class HTMLGenerator(BaseGenerator):
 
         html = f'''
             <!-- SLIDE IMAGE {slide.number} -->
-            <div class="slide slide-main"{data_attrs}>
+            <div class="slide slide-main" id="s{index}"{data_attrs}>
                 <div class="position-indicator">{slide.number} / {total}</div>
-                <img src="{image_url}" class="slide-image" alt="">
+                <img {image_attrs_html} class="slide-image" alt="">
                 {caption}
                 <div class="nav-hint">{nav_hint}
                 </div>
             </div>'''
 
         if max_view >= 1:
-            html += self._slide_details(slide, total, has_questions=(max_view == 2))
+            html += self._slide_details(slide, index, total, has_questions=(max_view == 2))
         
         if max_view == 2:
-            html += self._slide_questions(slide, total)
-        elif max_view == 1:
-            html += '''
-
-            <div class="slide" style="visibility: hidden;"></div>'''
+            html += self._slide_questions(slide, index, total)
+        else:
+            html += self._placeholders(2 - max_view)
 
         return html
 
 
 class PageGenerator(BaseGenerator):
     """Génère les pages statiques (accueil, collections)"""
-    def __init__(self, base_path: Optional[Path] = None, theme: Optional[str] = None, preview: bool = False):
-        super().__init__(base_path, theme)
+    def __init__(self, base_path: Optional[Path] = None, theme: Optional[str] = None, preview: bool = False, offline: bool = False):
+        super().__init__(base_path, theme, offline)
         self.preview = preview
+        self._css_cache: Dict[str, str] = {}
     
     def _get_page_css(self, file: str) -> str:
-        """CSS spécifique aux pages statiques"""
-
+        """CSS spécifique aux pages statiques (calculé une seule fois par fichier)"""
+        if file not in self._css_cache:
+            self._css_cache[file] = self._build_page_css(file)
+        return self._css_cache[file]
+    
+    def _build_page_css(self, file: str) -> str:
         css_path = self.base_path / f'css/{file}.css'
         if css_path.exists():
-            css = css_path.read_text(encoding='utf-8')
+            css = read_asset(css_path)
         else:
             raise FileNotFoundError(f"css/{file}.css non trouvé")
         return f'''
         {self._get_base_css()}
         {css}
+        {self._load_asset('search_css')}
         .container {{
             max-width: 1200px;
             margin: 0 auto;
@@ -574,34 +678,45 @@ class PageGenerator(BaseGenerator):
         }}
         '''
     
-    def generate_home_page(self, collections_config: Dict, collections_data: Dict, site_title: str) -> str:
+    def _search_box(self, root: str, shards: List[str]) -> str:
+        """Champ de recherche et client interrogeant les index search/<collection>.json"""
+        options = {'root': root, 'shards': shards, 'stopwords': sorted(STOPWORDS)}
+        return f'''
+        <div class="search" role="search">
+            <input type="search" id="searchInput" class="search-input" placeholder="Rechercher dans les cours…" autocomplete="off" aria-label="Rechercher dans les cours">
+            <p class="search-status" id="searchStatus" aria-live="polite"></p>
+            <ol class="search-results" id="searchResults"></ol>
+        </div>
+        <script>
+{self._load_asset('search_js')}
+        </script>
+        <script>
+            PyprezSearch.init({script_json(options)});
+        </script>'''
+    
+    def generate_pages(self, catalog: Dict) -> Dict[str, str]:
+        """Génère en une passe la page d'accueil et toutes les pages de collections"""
+        pages = {'index.html': self.generate_home_page(catalog)}
+        for collection in catalog['collections']:
+            pages[collection['url']] = self.generate_collection_page(collection, catalog)
+        return pages
+    
+    def generate_home_page(self, catalog: Dict) -> str:
         """Génère la page d'accueil"""
+        site_title = catalog['site_title']
         
         cards_html = []
-        for coll_id, coll_info in collections_config.items():
-            if coll_id not in collections_data or not collections_data[coll_id]:
-                continue
-            
-            colors = self._get_theme_colors(coll_info.get('theme'))
-            coll_courses = collections_data[coll_id]
-            qroc_count = sum(1 for c in coll_courses if c.get('theme') == 'qroc')
-            regular_count = len(coll_courses) - qroc_count
-            count_parts = []
-            if regular_count:
-                count_parts.append(f'{regular_count} cours')
-            if qroc_count:
-                count_parts.append(f'{qroc_count} QROC')
-            count_label = ' · '.join(count_parts)
-
+        for collection in catalog['collections']:
+            colors = self._get_theme_colors(collection.get('theme'))
             cards_html.append(f'''
-            <a href="collections/{coll_id}.html" class="collection-card" style="--card-primary: {colors['primary']}; --card-secondary: {colors['secondary']};">
-                <div class="collection-icon">{coll_info.get('icon', '📚')}</div>
-                <h2 class="collection-title">{coll_info.get('title', coll_id)}</h2>
-                <p class="collection-description">{coll_info.get('description', '')}</p>
-                <div class="collection-count">{count_label}</div>
+            <a href="{collection['url']}" class="collection-card" style="--card-primary: {colors['primary']}; --card-secondary: {colors['secondary']};">
+                <div class="collection-icon">{collection['icon']}</div>
+                <h2 class="collection-title">{collection['title']}</h2>
+                <p class="collection-description">{collection['description']}</p>
+                <div class="collection-count">{collection['counts']['label']}</div>
             </a>''')
         
-        total_collections = len([c for c in collections_config if c in collections_data and collections_data[c]])
+        total_collections = len(catalog['collections'])
         
         return f'''<!DOCTYPE html>
 <html lang="fr">
@@ -621,13 +736,14 @@ class PageGenerator(BaseGenerator):
     </header>
     
     <main class="container">
+        {self._search_box('', [c['id'] for c in catalog['collections']])}
         <div class="collections-grid">
 {''.join(cards_html)}
         </div>
     </main>
     
     <footer>
-        <p>Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+        <p>Généré le {catalog['generated_at']}</p>
         <div class="footer-content">
                     <a href="https://creativecommons.org/licenses/by-sa/4.0/" target="_blank" class="license">
                 <span class="copyleft">©</span> CC BY-SA 4.0
@@ -636,26 +752,22 @@ class PageGenerator(BaseGenerator):
             <span class="contact">eric.tellier@<b>newick.</b>newick.fr</span>
         </div>
     </footer>
+    {self._offline_script('')}
 </body>
 </html>'''
     
-    def generate_collection_page(self, coll_id: str, coll_info: Dict, courses: List, site_title: str, has_qr: bool = False) -> str:
-        """Génère la page d'une collection"""
+    def generate_collection_page(self, collection: Dict, catalog: Dict) -> str:
+        """Génère la page d'une collection depuis son entrée du catalogue"""
         
-        theme = coll_info.get('theme', DEFAULT_THEME)
-        courses_sorted = sorted(courses, key=lambda c: c.get('date', ''), reverse=True)
-
-        qroc_count = sum(1 for c in courses if c.get('theme') == 'qroc')
-        regular_count = len(courses) - qroc_count
-        count_parts = []
-        if regular_count:
-            count_parts.append(f'{regular_count} cours')
-        if qroc_count:
-            count_parts.append(f'{qroc_count} QROC')
-        count_label = ' · '.join(count_parts)
+        coll_id = collection['id']
+        site_title = catalog['site_title']
+        theme = collection.get('theme') or DEFAULT_THEME
+        has_qr = collection.get('has_qr', False)
+        count_label = collection['counts']['label']
 
         cards_html = []
-        for course in courses_sorted:
+        for url in collection['courses']:
+            course = catalog['courses'][url]
             colors = self._get_theme_colors(course.get('theme'))
             status = course.get('status', 'published')
             
@@ -716,7 +828,7 @@ class PageGenerator(BaseGenerator):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{coll_info.get('title', coll_id)} - {site_title}</title>
+    <title>{collection['title']} - {site_title}</title>
     <link rel="icon" href="{self.FAVICON}">
     <style>
         {self._get_page_css("homepage")}
@@ -733,11 +845,12 @@ class PageGenerator(BaseGenerator):
         <a href="../index.html" class="back-link">← Retour aux collections</a>
         
         <header>
-            <div class="collection-icon">{coll_info.get('icon', '📚')}</div>
-            <h1>{coll_info.get('title', coll_id)}</h1>
-            <p class="description">{coll_info.get('description', '')}</p>
+            <div class="collection-icon">{collection['icon']}</div>
+            <h1>{collection['title']}</h1>
+            <p class="description">{collection['description']}</p>
             <p class="count">{count_label}</p>
         </header>
+        {self._search_box('../', [coll_id])}
         
         <div class="courses-list">
 {''.join(cards_html)}
@@ -745,7 +858,7 @@ class PageGenerator(BaseGenerator):
     </main>
     
     <footer>
-        <p>Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+        <p>Généré le {catalog['generated_at']}</p>
             <div class="footer-content">
                         <a href="https://creativecommons.org/licenses/by-sa/4.0/" target="_blank" class="license">
                 <span class="copyleft">©</span> CC BY-SA 4.0
@@ -755,6 +868,7 @@ class PageGenerator(BaseGenerator):
         </div>
             {f'<div class="footer-qr"><a href="../images/qr_collection_{coll_id}.png" target="_blank" title="QR code de partage"><img src="../images/qr_collection_{coll_id}.png" alt="QR Code" class="qr-code"></a></div>' if has_qr else ''}
     </footer>
+    {self._offline_script('../')}
 </body>
 </html>'''
 
@@ -0,0 +1,246 @@
+"""
+Publication des images référencées : résolution, déduplication par contenu, noms hachés
+"""
+
+import re
+import json
+import html as _html
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+from .parser import is_local_image
+from .digests import DigestCache
+
+
+HASH_LENGTH = 12
+IMAGES_URL_PREFIX = '../../images/'
+
+
+@dataclass
+class PublishedImage:
+    """Image publiée : nom haché et dimensions intrinsèques"""
+    name: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def _png_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    return None
+
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+            continue  # Marqueurs sans segment
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        # SOF0..SOF15 sauf DHT (C4), JPG (C8) et DAC (CC)
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if head[:4] != b'RIFF' or head[8:12] != b'WEBP':
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and len(head) >= 30:
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3fff, height & 0x3fff
+    if chunk == b'VP8L' and len(head) >= 25:
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+    if chunk == b'VP8X' and len(head) >= 30:
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+_SVG_TAG_RE = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE | re.DOTALL)
+_SVG_LENGTH_RE = re.compile(r'^\s*([\d.]+)\s*(px)?\s*$')
+
+
+def _svg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    tag_match = _SVG_TAG_RE.search(head)
+    if not tag_match:
+        return None
+    tag = tag_match.group(0).decode('utf-8', 'replace')
+    attrs = dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag))
+
+    width = _SVG_LENGTH_RE.match(attrs.get('width', ''))
+    height = _SVG_LENGTH_RE.match(attrs.get('height', ''))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+
+    view_box = attrs.get('viewBox', '').replace(',', ' ').split()
+    if len(view_box) == 4:
+        try:
+            return round(float(view_box[2])), round(float(view_box[3]))
+        except ValueError:
+            return None
+    return None
+
+
+def read_image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """Lit les dimensions (largeur, hauteur) depuis l'en-tête PNG, JPEG, WebP ou SVG"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(4096)
+            if head[:3] == b'\xff\xd8\xff':
+                size = _jpeg_size(f)
+            else:
+                size = _png_size(head) or _webp_size(head)
+                if size is None and path.suffix.lower() == '.svg':
+                    size = _svg_size(head)
+    except (OSError, struct.error, ValueError):
+        return None
+    if size and size[0] > 0 and size[1] > 0:
+        return size
+    return None
+
+
+def resolve_image_url(raw_url: str, images: Optional[Dict[str, PublishedImage]] = None, prefix: str = IMAGES_URL_PREFIX) -> str:
+    """Retourne l'URL publiée d'une image (nom haché si connu, nom simple sinon)"""
+    if not is_local_image(raw_url):
+        return raw_url
+    if images and raw_url in images:
+        return prefix + images[raw_url].name
+    return prefix + Path(raw_url).name
+
+
+def image_attrs(raw_url: str, images: Optional[Dict[str, PublishedImage]] = None, lazy: bool = False) -> str:
+    """Retourne les attributs src/width/height (et loading/decoding) d'une balise <img>"""
+    url = resolve_image_url(raw_url, images)
+    attrs = [f'src="{_html.escape(url)}"']
+    image = images.get(raw_url) if images else None
+    if image and image.width and image.height:
+        attrs.append(f'width="{image.width}" height="{image.height}"')
+    if lazy:
+        attrs.append('loading="lazy" decoding="async"')
+    return ' '.join(attrs)
+
+
+class ImageRegistry:
+    """Résout les images référencées par les cours et leur attribue un nom haché unique"""
+
+    def __init__(self, source_dir: Path, cache_file: Optional[Path] = None):
+        self.source_dir = source_dir
+        self.cache_file = cache_file
+        self.files: Dict[str, Path] = {}      # nom publié -> source
+        self.missing: List[str] = []
+        self._by_hash: Dict[str, PublishedImage] = {}   # empreinte -> image publiée
+        self._by_path: Dict[Path, Tuple[str, PublishedImage]] = {}  # source -> (empreinte, image publiée)
+        # Caches persistants : empreintes des sources et empreinte -> [largeur, hauteur]
+        cache = {}
+        if cache_file and cache_file.exists():
+            try:
+                cache = json.loads(cache_file.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                cache = {}
+        self._digests = DigestCache(cache.get('digests'))
+        self._sizes: Dict[str, list] = cache.get('sizes', {})
+
+    def find(self, ref: str, course_dir: Path) -> Optional[Path]:
+        """
+        Cherche l'image au plus près du cours, puis dans les images partagées.
+        Seuls les fichiers du dossier des sources sont publiés ('../../etc/x.png' est ignoré).
+        """
+        name = Path(ref).name
+        candidates = [
+            course_dir / ref,
+            course_dir / 'images' / name,
+            course_dir / name,
+            self.source_dir / 'images' / name,
+        ]
+        root = self.source_dir.resolve()
+        for candidate in candidates:
+            path = candidate.resolve()
+            if path.is_file() and path.is_relative_to(root):
+                return path
+        return None
+
+    def digest(self, path: Path) -> str:
+        """Empreinte du fichier, mise en cache selon (taille, mtime)"""
+        return self._digests.digest(path)
+
+    def dimensions(self, path: Path, digest: str) -> Optional[Tuple[int, int]]:
+        """Dimensions intrinsèques, mises en cache par empreinte de contenu"""
+        if digest not in self._sizes:
+            self._sizes[digest] = read_image_size(path)
+        size = self._sizes[digest]
+        return tuple(size) if size else None
+
+    def publish(self, path: Path) -> PublishedImage:
+        """
+        Enregistre une image source et retourne l'image publiée (dédupliquée par contenu).
+        La source est revérifiée (taille, mtime) à chaque appel : une image modifiée reçoit
+        un nouveau nom haché et l'ancien nom n'est plus publié.
+        """
+        digest = self.digest(path)
+        known = self._by_path.get(path)
+        if known is not None:
+            if known[0] == digest:
+                return known[1]
+            self._forget(path, *known)
+        image = self._by_hash.get(digest)
+        if image is None:
+            name = f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix.lower()}"
+            size = self.dimensions(path, digest)
+            image = PublishedImage(name, *(size or (None, None)))
+            self._by_hash[digest] = image
+            self.files[name] = path
+        self._by_path[path] = (digest, image)
+        return image
+
+    def _forget(self, path: Path, digest: str, image: PublishedImage):
+        """Retire l'ancienne version d'une source modifiée (sauf si une autre source a ce contenu)"""
+        del self._by_path[path]
+        same = [other for other, (other_digest, _) in self._by_path.items() if other_digest == digest]
+        if same:
+            self.files[image.name] = same[0]
+        else:
+            self._by_hash.pop(digest, None)
+            self.files.pop(image.name, None)
+
+    def add_static(self, name: str, path: Path):
+        """Publie une image sous un nom fixe (ex. QR codes des collections)"""
+        self.files[name] = path
+
+    def course_map(self, refs: List[str], course_dir: Path) -> Dict[str, PublishedImage]:
+        """Retourne {référence: image publiée} pour les images d'un cours"""
+        mapping = {}
+        for ref in refs:
+            path = self.find(ref, course_dir)
+            if path is None:
+                self.missing.append(f"{course_dir.name}/{ref}")
+                continue
+            mapping[ref] = self.publish(path)
+        return mapping
+
+    def save_cache(self):
+        """Enregistre le cache des empreintes"""
+        if self.cache_file is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache = {'digests': self._digests.entries, 'sizes': self._sizes}
+        self.cache_file.write_text(json.dumps(cache, sort_keys=True), encoding='utf-8')
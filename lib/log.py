@@ -0,0 +1,120 @@
+"""
+Journalisation des scripts : texte (lignes à emojis habituelles) ou JSON (un événement par ligne).
+Les fonctions réutilisables n'écrivent jamais directement : elles journalisent,
+le script appelant choisit le niveau et le format.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+ROOT_LOGGER = 'pyprez'
+LOG_FORMATS = ('text', 'json')
+
+# Attributs standard d'un LogRecord : les autres viennent de extra={...} et sont exportés en JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def record_fields(record: logging.LogRecord) -> Dict:
+    """Événement d'un enregistrement : horodatage, niveau, logger, message et champs extra"""
+    entry = {
+        'ts': round(record.created, 3),
+        'level': record.levelname.lower(),
+        'logger': record.name.removeprefix(f'{ROOT_LOGGER}.'),
+        'msg': record.getMessage().strip(),
+    }
+    entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+    return entry
+
+
+class TextFormatter(logging.Formatter):
+    """Message tel quel (indentation et emojis compris), suivi de la trace d'une exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = record.getMessage()
+        if record.exc_info:
+            text += '\n' + self.formatException(record.exc_info)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, logger, message et champs extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = record_fields(record)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _StreamHandler(logging.StreamHandler):
+    """Sortie standard ; si le lecteur disparaît (build.py | head), la suite du journal est ignorée"""
+
+    def handleError(self, record: logging.LogRecord):
+        if isinstance(sys.exc_info()[1], BrokenPipeError):
+            self.setStream(open(os.devnull, 'w', encoding='utf-8'))
+        else:
+            super().handleError(record)
+
+
+class _HideMeasures(logging.Filter):
+    """Mesures (extra={'measure': True}) : exportées en JSON, affichées en texte seulement en mode verbeux"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, 'measure', False)
+
+
+class _Collector(logging.Handler):
+    def __init__(self, level: int):
+        super().__init__(level)
+        self.events: List[Dict] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.events.append(record_fields(record))
+
+
+@contextmanager
+def collect_events(level: int = logging.WARNING) -> Iterator[List[Dict]]:
+    """Recueille les événements d'au moins `level` journalisés pendant le bloc (résultats de build_site)"""
+    root = logging.getLogger(ROOT_LOGGER)
+    collector = _Collector(level)
+    root.addHandler(collector)
+    try:
+        yield collector.events
+    finally:
+        root.removeHandler(collector)
+
+
+def add_logging_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='N\'afficher que les avertissements et les erreurs')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Afficher aussi le détail des étapes et les durées par cours')
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default='text',
+                        help='Format du journal : text (défaut) ou json (une ligne par événement)')
+
+
+def setup_logging(log_format: str = 'text', quiet: bool = False, verbose: bool = False, stream=None) -> logging.Logger:
+    """Configure la sortie du journal des scripts (stdout par défaut)"""
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers.clear()
+    handler = _StreamHandler(stream or sys.stdout)
+    if log_format == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter())
+        if not verbose:
+            handler.addFilter(_HideMeasures())
+    root.addHandler(handler)
+    root.setLevel(logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO)
+    root.propagate = False
+    return root
@@ -0,0 +1,110 @@
+"""
+Manifeste de déploiement : chemin, taille et empreinte de chaque fichier publié
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Set
+from dataclasses import dataclass, field
+
+from .config import CACHE_DIR
+from .digests import DigestCache
+
+
+MANIFEST_FILE = '.deploy-manifest.json'
+MANIFEST_VERSION = 1
+
+# Jamais déployés : cache de build et manifeste lui-même (envoyé en dernier)
+EXCLUDED = {CACHE_DIR, MANIFEST_FILE}
+
+
+def build_manifest(output_dir: Path, digests: DigestCache) -> Dict[str, Dict]:
+    """Retourne {chemin relatif: {'size', 'sha256'}} pour le dossier de sortie"""
+    files = {}
+    for path in sorted(output_dir.rglob('*')):
+        rel = path.relative_to(output_dir)
+        if rel.parts[0] in EXCLUDED or not path.is_file():
+            continue
+        files[rel.as_posix()] = {'size': path.stat().st_size, 'sha256': digests.digest(path)}
+    return files
+
+
+def dump_manifest(files: Dict[str, Dict]) -> str:
+    return json.dumps({'version': MANIFEST_VERSION, 'files': files}, sort_keys=True, indent=1)
+
+
+def parse_manifest(text: str) -> Dict[str, Dict]:
+    """Lit un manifeste ; un contenu absent ou illisible équivaut à une cible vide"""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+        return {}
+    files = data.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+@dataclass
+class ManifestDiff:
+    """Fichiers à envoyer et à supprimer pour aligner la cible sur le build local"""
+    upload: List[str] = field(default_factory=list)
+    remove: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    upload_bytes: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.upload and not self.remove
+
+    def __str__(self):
+        size = f"{self.upload_bytes / 1_000_000:.1f} Mo"
+        return (f"{len(self.upload)} à envoyer ({size}), "
+                f"{len(self.remove)} à supprimer, {self.unchanged} inchangé(s)")
+
+
+def diff_manifests(local: Dict[str, Dict], remote: Dict[str, Dict]) -> ManifestDiff:
+    """Compare le manifeste local à celui de la cible (taille et empreinte)"""
+    diff = ManifestDiff()
+    for path, entry in sorted(local.items()):
+        previous = remote.get(path)
+        if previous and previous.get('sha256') == entry['sha256'] and previous.get('size') == entry['size']:
+            diff.unchanged += 1
+        else:
+            diff.upload.append(path)
+            diff.upload_bytes += entry['size']
+    diff.remove = sorted(path for path in remote if path not in local)
+    return diff
+
+
+def parent_dirs(paths: List[str]) -> List[str]:
+    """Dossiers (et leurs parents) contenant ces fichiers, parents en premier"""
+    dirs: Set[str] = set()
+    for path in paths:
+        parent = Path(path).parent
+        while parent != Path('.'):
+            dirs.add(parent.as_posix())
+            parent = parent.parent
+    return sorted(dirs, key=lambda d: (d.count('/'), d))
+
+
+def emptied_dirs(local: Dict[str, Dict], remote: Dict[str, Dict]) -> List[str]:
+    """Dossiers distants qui ne contiennent plus aucun fichier, les plus profonds en premier"""
+    stale = set(parent_dirs(list(remote))) - set(parent_dirs(list(local)))
+    return sorted(stale, key=lambda d: (-d.count('/'), d))
+
+
+# Coût fixe d'un fichier (aller-retour réseau), exprimé en octets, pour l'équilibrage des lots
+FILE_OVERHEAD = 16 * 1024
+
+
+def balance_by_size(paths: List[str], sizes: Dict[str, int], streams: int) -> List[List[str]]:
+    """Répartit les fichiers en lots de poids voisins (plus gros fichiers d'abord, vers le lot le plus léger)"""
+    streams = max(1, min(streams, len(paths)))
+    batches: List[List[str]] = [[] for _ in range(streams)]
+    loads = [0] * streams
+    for path in sorted(paths, key=lambda p: (-sizes[p], p)):
+        lightest = loads.index(min(loads))
+        batches[lightest].append(path)
+        loads[lightest] += sizes[path] + FILE_OVERHEAD
+    return [sorted(batch) for batch in batches if batch]
@@ -49,6 +49,7 @@ class Presentation:
     """Représente une présentation complète"""
     metadata: Dict[str, str] = field(default_factory=dict)
     slides: List[Slide] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)  # Images locales référencées
     
     @property
     def title(self) -> str:
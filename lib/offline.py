@@ -0,0 +1,110 @@
+"""
+Manifeste de précache et service worker pour la consultation hors-ligne
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List
+
+from .questions import QUESTIONS_DIR
+from .search import SEARCH_DIR
+from .sink import OutputSink
+
+
+MANIFEST_FILE = 'precache-manifest.json'
+SERVICE_WORKER_FILE = 'sw.js'
+DIGEST_LENGTH = 16
+
+# Fichiers de sortie jamais mis en cache par le service worker
+EXCLUDED = {MANIFEST_FILE, SERVICE_WORKER_FILE}
+
+# Pages communes à tout le site, installées sur chaque appareil (cache "shell")
+SHELL_PAGES = ['index.html', 'catalog.json']
+SHELL_DIRS = ('fonts/',)
+QR_PREFIX = 'images/qr_collection_'
+
+
+def service_worker_snippet(root: str) -> str:
+    """Script d'enregistrement du service worker (root : chemin relatif vers la racine du site)"""
+    return f'''<script>
+        if ('serviceWorker' in navigator && location.protocol !== 'file:') {{
+            navigator.serviceWorker.register('{root}{SERVICE_WORKER_FILE}', {{ scope: '{root}' }}).catch(() => {{}});
+        }}
+    </script>'''
+
+
+def build_precache_manifest(
+    digests: Dict[str, str],
+    catalog: Dict,
+    course_images: Dict[str, List[str]],
+) -> Dict:
+    """
+    Recense les fichiers publiés ({chemin relatif: empreinte}) avec leur empreinte courte.
+    'shell' : accueil, catalogue, pages de collections, fonts, QR codes.
+    'collections' : cours, documents, images, index de recherche et banque de questions de chaque
+    collection (caches séparés côté client, installés à la visite de la collection).
+    Les autres fichiers (cours hors collection, sommaire de la banque) ne sont pas précachés.
+    """
+    entries = {
+        rel: digest[:DIGEST_LENGTH]
+        for rel, digest in sorted(digests.items())
+        if rel not in EXCLUDED and not rel.startswith('.')
+    }
+
+    collections = {}
+    for collection in catalog['collections']:
+        coll_id = collection['id']
+        paths = []
+        for url in collection['courses']:
+            course = catalog['courses'][url]
+            candidates = [course['url'], course['details_url']]
+            candidates += [f'images/{name}' for name in course_images.get(url, [])]
+            paths += [p for p in candidates if p in entries and p not in paths]
+        paths += [p for p in (f'{SEARCH_DIR}/{coll_id}.json', f'{QUESTIONS_DIR}/{coll_id}.json') if p in entries]
+        collections[coll_id] = paths
+
+    pages = SHELL_PAGES + [collection['url'] for collection in catalog['collections']]
+    shell = [
+        p for p in entries
+        if p in pages or p.startswith(SHELL_DIRS) or p.startswith(QR_PREFIX)
+    ]
+
+    return {
+        'version': _version(entries),
+        'entries': entries,
+        'shell': shell,
+        'collections': collections,
+    }
+
+
+def update_question_entries(manifest: Dict, digests: Dict[str, str]) -> Dict:
+    """
+    Manifeste après une mise à jour de la banque seule (--questions-only) : entrées questions/
+    remplacées par digests ({chemin relatif: empreinte}), banques supprimées retirées des listes
+    de collections, version recalculée (le service worker retélécharge les banques modifiées)
+    """
+    prefix = f'{QUESTIONS_DIR}/'
+    entries = {rel: digest for rel, digest in manifest['entries'].items() if not rel.startswith(prefix)}
+    entries.update((rel, digest[:DIGEST_LENGTH]) for rel, digest in digests.items() if rel.startswith(prefix))
+    entries = dict(sorted(entries.items()))
+
+    collections = {}
+    for coll_id, paths in manifest['collections'].items():
+        paths = [p for p in paths if not p.startswith(prefix)]
+        bank = f'{prefix}{coll_id}.json'
+        collections[coll_id] = paths + [bank] if bank in entries else paths
+
+    return {**manifest, 'version': _version(entries), 'entries': entries, 'collections': collections}
+
+
+def _version(entries: Dict[str, str]) -> str:
+    """Version du manifeste : empreinte de toutes ses entrées"""
+    return hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+
+
+def write_offline_files(sink: OutputSink, manifest: Dict, template: Path):
+    """Écrit le manifeste et le service worker (préfixé par la version du manifeste)"""
+    sink.write_text(MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=1))
+    worker = template.read_text(encoding='utf-8')
+    sink.write_text(SERVICE_WORKER_FILE, f"const PRECACHE_VERSION = '{manifest['version']}';\n{worker}")
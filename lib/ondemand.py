@@ -0,0 +1,357 @@
+"""
+Rendu à la demande depuis l'arborescence Markdown (serve.py) : chaque présentation ou document
+de détails est généré à la première requête et conservé dans un cache LRU indexé par empreinte
+de la source et thème ; les pages du catalogue ne sont régénérées que si les métadonnées changent.
+"""
+
+import json
+import hashlib
+from email.utils import parsedate_to_datetime
+import mimetypes
+import threading
+import time
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from .config import THEMES, ASSETS
+from .parser import parse_presentation
+from .generator import HTMLGenerator, PageGenerator
+from .images import ImageRegistry
+from .catalog import build_catalog, catalog_json
+from .details import render_details
+from .digests import file_digest
+from .log import get_logger
+from .search import SEARCH_DIR, course_documents, build_search_shards
+from .site import BASE_DIR, find_folders, is_course_file, parse_course, load_collections_config, generate_draft_page
+from .weight import split_budgets
+
+
+log = get_logger('serve')
+
+# Intervalle minimal entre deux examens de l'arborescence (pages du catalogue, index)
+SCAN_INTERVAL = 1.0
+
+# Images publiées sous un nom haché : contenu immuable
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class LRUCache:
+    """Cache borné (nombre d'entrées), l'entrée la moins récemment lue est évincée"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._pending: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], bytes]) -> bytes:
+        """Valeur en cache, sinon calculée une seule fois même si plusieurs requêtes l'attendent"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.setdefault(key, threading.Lock())
+        with pending:
+            with self._lock:
+                if key in self._entries:  # Calculée par une requête concurrente
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+            value = compute()  # Hors verrou global : les rendus de cours différents se font en parallèle
+            with self._lock:
+                self._entries[key] = value
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self._pending.pop(key, None)
+        return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'bytes': sum(len(value) for value in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+@dataclass
+class Resource:
+    """Réponse résolue : validateurs HTTP connus avant tout rendu, contenu produit par load()"""
+    content_type: str
+    etag: str
+    last_modified: float
+    load: Callable[[], bytes]
+    cache_control: str = 'no-cache'
+
+
+@dataclass
+class _Source:
+    """Cours examiné : empreinte du Markdown, métadonnées et termes indexables"""
+    md_file: Path
+    stat: Tuple[int, int]               # (taille, mtime_ns)
+    digest: str
+    metadata: Optional[Dict]            # None : cours obsolète
+    images: List[str] = field(default_factory=list)
+    documents: List[Dict] = field(default_factory=list)
+
+
+def not_modified(headers, etags: Tuple[str, ...], last_modified: float) -> bool:
+    """Requête conditionnelle satisfaite (304) ; If-None-Match prioritaire sur If-Modified-Since (RFC 9110)"""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or any(etag in tags for etag in etags)
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _etag(*parts) -> str:
+    return '"' + hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:20] + '"'
+
+
+class SiteRenderer:
+    """Résout les URL du site publié et les rend à la demande depuis source_dir"""
+
+    def __init__(self, source_dir: Path, site_title: str = "Formations Médicales", preview: bool = False,
+                 cache_size: int = 128):
+        self.source_dir = source_dir
+        self.site_title = site_title
+        self.preview = preview
+        self.cache = LRUCache(cache_size)
+        self.registry = ImageRegistry(source_dir)
+        self.renders = 0
+        self._sources: Dict[Path, _Source] = {}
+        self._lock = threading.RLock()
+        self._scanned_at = 0.0
+        self._catalog_key = ''
+        self._catalog: Dict = {}
+        self._pages: Dict[str, bytes] = {}
+        self._shards: Dict[str, bytes] = {}
+        self._shards_key = ''
+        self._last_modified = 0.0
+        self._page_gen = PageGenerator(base_path=BASE_DIR, preview=preview)
+        self._assets = self._assets_signature()
+        self._missing_reported = set()
+
+    # --- Sources -------------------------------------------------------------------
+
+    @staticmethod
+    def _assets_signature() -> str:
+        """Les présentations inlinent CSS et JS : leur modification change tous les ETag"""
+        stats = []
+        for rel in sorted(ASSETS.values()):
+            path = BASE_DIR / rel
+            if path.exists():
+                st = path.stat()
+                stats.append((rel, st.st_size, st.st_mtime_ns))
+        return _etag(stats)
+
+    def _source(self, md_file: Path) -> Optional[_Source]:
+        """Cours à jour : relu et analysé seulement si le fichier a changé"""
+        try:
+            st = md_file.stat()
+        except FileNotFoundError:
+            self._sources.pop(md_file, None)
+            return None
+        key = (st.st_size, st.st_mtime_ns)
+        source = self._sources.get(md_file)
+        if source and source.stat == key:
+            return source
+        digest = file_digest(md_file)
+        if source and source.digest == digest:
+            source.stat = key
+            return source
+        parsed = parse_course(md_file, md_file.parent.name)
+        if parsed is None:
+            source = _Source(md_file, key, digest, None)
+        else:
+            presentation, metadata = parsed
+            source = _Source(md_file, key, digest, metadata, list(presentation.images),
+                             course_documents(presentation))
+        self._sources[md_file] = source
+        return source
+
+    def _course_file(self, folder: str, slug: str) -> Optional[Path]:
+        """Source d'un cours, seulement si le build statique le publie (ni README.md, ni images/...)"""
+        md_file = self.source_dir / folder / f'{slug}.md'
+        return md_file if is_course_file(self.source_dir, md_file) else None
+
+    def _scan(self):
+        """Réexamine l'arborescence ; catalogue et pages régénérés seulement si les métadonnées changent"""
+        now = time.monotonic()
+        if now - self._scanned_at < SCAN_INTERVAL and self._catalog_key:
+            return
+        self._scanned_at = now
+
+        sources = []
+        seen = set()
+        for md_files in find_folders(self.source_dir).values():
+            for md_file in md_files:
+                seen.add(md_file)
+                source = self._source(md_file)
+                if source is not None and source.metadata is not None:
+                    sources.append(source)
+        for md_file in set(self._sources) - seen:
+            del self._sources[md_file]  # Cours supprimé
+        config_file = self.source_dir / 'collections.toml'
+        config_text = config_file.read_text(encoding='utf-8') if config_file.exists() else ''
+
+        mtimes = [s.stat[1] / 1e9 for s in sources]
+        if config_file.exists():
+            mtimes.append(config_file.stat().st_mtime)
+        self._last_modified = max(mtimes, default=0.0)
+
+        catalog_key = _etag(config_text, [s.metadata for s in sources], self.site_title, self._assets)
+        if catalog_key != self._catalog_key:
+            collections_config, _ = split_budgets(load_collections_config(self.source_dir))
+            collections_data: Dict[str, List[Dict]] = {}
+            for source in sources:
+                for coll_id in source.metadata.get('collections', []):
+                    collections_data.setdefault(coll_id, []).append(source.metadata)
+            qr_codes = {}
+            for coll_id in collections_config:
+                qr_image = self.source_dir / 'images' / f'qr_collection_{coll_id}.png'
+                qr_codes[coll_id] = qr_image.exists()
+                if qr_codes[coll_id]:
+                    self.registry.add_static(qr_image.name, qr_image)
+            self._catalog = build_catalog(collections_config, collections_data, self.site_title, qr_codes,
+                                          datetime.fromtimestamp(self._last_modified, tz=timezone.utc))
+            pages = self._page_gen.generate_pages(self._catalog)
+            pages['catalog.json'] = json.dumps(catalog_json(self._catalog), ensure_ascii=False, indent=1)
+            self._pages = {rel: text.encode('utf-8') for rel, text in pages.items()}
+            self._catalog_key = catalog_key
+            self.renders += 1
+            log.info("📋 Catalogue régénéré (%d cours)", len(sources), extra={'event': 'catalog', 'courses': len(sources)})
+
+        # L'index de recherche dépend du contenu des cours, pas seulement de leurs métadonnées
+        shards_key = _etag(catalog_key, [s.digest for s in sources])
+        if shards_key != self._shards_key:
+            documents = {s.metadata['url']: s.documents for s in sources}
+            shards = build_search_shards(self._catalog, documents, self.preview)
+            self._shards = {
+                coll_id: json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                for coll_id, shard in shards.items()
+            }
+            self._shards_key = shards_key
+
+    # --- Ressources ----------------------------------------------------------------
+
+    def resolve(self, path: str, theme: str = '') -> Optional[Resource]:
+        """Ressource d'une URL du site (chemin sans requête), None si elle n'existe pas"""
+        rel = path.lstrip('/')
+        if rel == '' or rel.endswith('/'):
+            rel += 'index.html'
+        parts = rel.split('/')
+        if '..' in parts or '' in parts:
+            return None
+
+        with self._lock:
+            if parts[0] == 'fonts' and len(parts) == 2:
+                return self._static(BASE_DIR / 'fonts' / parts[1])
+            if parts[0] == 'images' and len(parts) == 2:
+                return self._image(parts[1])
+            if len(parts) == 3 and parts[2] in ('index.html', 'details.html') and parts[0] != 'collections':
+                return self._course(parts[0], parts[1], parts[2], theme)
+
+            self._scan()
+            if rel in self._pages:
+                body = self._pages[rel]
+                return Resource('text/html; charset=utf-8' if rel.endswith('.html') else 'application/json',
+                                _etag(self._catalog_key, rel), self._last_modified, lambda: body)
+            if parts[0] == SEARCH_DIR and len(parts) == 2 and parts[1].endswith('.json'):
+                body = self._shards.get(parts[1][:-len('.json')])
+                if body is not None:
+                    return Resource('application/json', _etag(self._shards_key, rel), self._last_modified,
+                                    lambda: body)
+        return None
+
+    def _course(self, folder: str, slug: str, page: str, theme: str) -> Optional[Resource]:
+        md_file = self._course_file(folder, slug)
+        source = self._source(md_file) if md_file else None
+        if source is None or source.metadata is None:
+            return None
+        metadata = source.metadata
+        is_draft = metadata['status'] == 'draft'
+        if page == 'details.html' and is_draft and not self.preview:
+            return None
+        theme = theme if theme in THEMES else metadata['theme']
+        images = self.registry.course_map(source.images, md_file.parent)
+        self._report_missing()
+        names = sorted(image.name for image in images.values())
+        key = (page, source.digest, theme, tuple(names), self.preview, self._assets)
+
+        def load() -> bytes:
+            return self.cache.get(key, lambda: self._render(md_file, page, metadata, theme, images))
+
+        return Resource('text/html; charset=utf-8', _etag(*key), source.stat[1] / 1e9, load)
+
+    def _render(self, md_file: Path, page: str, metadata: Dict, theme: str, images: Dict) -> bytes:
+        started = time.perf_counter()
+        content = md_file.read_text(encoding='utf-8')
+        if page == 'details.html':
+            html = render_details(content, images, datetime.fromtimestamp(md_file.stat().st_mtime, tz=timezone.utc)) or ''
+        else:
+            presentation = parse_presentation(content)
+            if metadata['status'] == 'draft' and not self.preview:
+                html = generate_draft_page(presentation, theme)
+            else:
+                generator = HTMLGenerator(base_path=BASE_DIR, theme=theme, images=images)
+                html = generator.generate(presentation, is_draft=(metadata['status'] == 'draft'))
+        with self._lock:
+            self.renders += 1
+        course = f"{metadata['folder']}/{metadata['slug']}"
+        log.info("  🏗️  %s/%s (%.1f ms)", course, page, (time.perf_counter() - started) * 1000,
+                 extra={'event': 'render', 'course': course, 'page': page, 'theme': theme,
+                        'render_ms': round((time.perf_counter() - started) * 1000, 2)})
+        return html.encode('utf-8')
+
+    def _image(self, name: str) -> Optional[Resource]:
+        path = self.registry.files.get(name)
+        if path is None:
+            # Page en cache chez le client, serveur redémarré : publier les images de tous les cours
+            self._scan()
+            for source in list(self._sources.values()):
+                self.registry.course_map(source.images, source.md_file.parent)
+            self._report_missing()
+            path = self.registry.files.get(name)
+        # Source modifiée depuis la publication : son contenu a un autre nom, l'ancien n'existe plus
+        if path is None or not path.is_file() or self.registry.publish(path).name != name:
+            return None
+        return self._static(path, IMMUTABLE if not name.startswith('qr_collection_') else 'no-cache')
+
+    def _report_missing(self):
+        """Avertit une fois par image introuvable (la correspondance est refaite à chaque requête)"""
+        for missing in self.registry.missing:
+            if missing not in self._missing_reported:
+                self._missing_reported.add(missing)
+                log.warning("  ⚠️  Image introuvable : %s", missing, extra={'event': 'missing_image', 'image': missing})
+        self.registry.missing.clear()
+
+    @staticmethod
+    def _static(path: Path, cache_control: str = 'no-cache') -> Optional[Resource]:
+        if not path.is_file():
+            return None
+        st = path.stat()
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        return Resource(content_type, _etag(path.name, st.st_size, st.st_mtime_ns), st.st_mtime,
+                        path.read_bytes, cache_control)
+
+    def stats(self) -> Dict:
+        """Compteurs exposés par /__stats (tests de charge)"""
+        with self._lock:
+            sources = len(self._sources)
+            renders = self.renders
+        return {'sources': sources, 'renders': renders, 'cache': self.cache.stats()}
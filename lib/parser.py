@@ -7,6 +7,43 @@ from .config import MARKERS, MD_PREFIXES, SLIDE_TYPES
 import re
 
 
+IMAGE_LINE_RE = re.compile(r'^!\[([^\]]*)\]\(([^)]+)\)$')
+
+
+def is_local_image(url: str) -> bool:
+    """Vrai si l'URL désigne une image du dépôt (ni absolue, ni distante)"""
+    return bool(url) and not url.startswith(('http://', 'https://', '/', 'data:'))
+
+
+def slide_image_refs(slide: Slide) -> Tuple[List[str], List[str]]:
+    """Images d'une slide : (vue principale, vue détails), dans l'ordre d'apparition"""
+    main = [slide.image_url] if slide.slide_type == SLIDE_TYPES['image'] and slide.image_url else []
+    detail = []
+    for item in slide.details:
+        if isinstance(item, dict):
+            if item.get('type') != 'perspective':
+                continue
+            lines = item['content'].split('\n')
+        else:
+            lines = [item]
+        for line in lines:
+            img_match = IMAGE_LINE_RE.match(line.strip())
+            if img_match:
+                detail.append(img_match.group(2))
+    return main, detail
+
+
+def collect_image_refs(slides: List[Slide]) -> List[str]:
+    """Liste ordonnée et sans doublon des images locales référencées par les slides"""
+    refs = []
+    for slide in slides:
+        main, detail = slide_image_refs(slide)
+        for url in main + detail:
+            if is_local_image(url) and url not in refs:
+                refs.append(url)
+    return refs
+
+
 def parse_ref_attrs(attrs_str: str) -> Dict[str, str]:
     """Parse les attributs d'une référence [@ref key="val" ...] en dict"""
     attrs = {}
@@ -249,7 +286,7 @@ def parse_presentation(md_content: str) -> Presentation:
     if current_slide:
         slides.append(current_slide)
     
-    return Presentation(metadata=metadata, slides=slides)
+    return Presentation(metadata=metadata, slides=slides, images=collect_image_refs(slides))
 
 
 MAX_SLIDE_ITEMS = 6
@@ -366,7 +403,7 @@ def _parse_detail_line(line: str) -> Dict[str, str]:
     """Parse une ligne de détail et retourne son type et contenu"""
     
     # Image Markdown: ![légende](url)
-    img_match = re.match(r'^!\[([^\]]*)\]\(([^)]+)\)$', line)
+    img_match = IMAGE_LINE_RE.match(line)
     if img_match:
         return {
             'type': 'image',
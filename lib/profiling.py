@@ -0,0 +1,227 @@
+"""
+Profilage du build : durées par étape et par cours, exportées au format Chrome trace
+(chrome://tracing, https://ui.perfetto.dev), et mémoire allouée (tracemalloc)
+"""
+
+import re
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class BuildProfiler:
+    """
+    Enregistre des intervalles (nom, début, durée, thread, arguments).
+    Désactivé par défaut : span() ne coûte alors qu'un test.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict] = []
+        self._threads: Dict[int, int] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = 0
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter_ns()
+
+    def _tid(self) -> int:
+        """Identifiant court du thread courant (1 = principal, puis un par worker)"""
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._threads:
+                tid = len(self._threads) + 1
+                self._threads[ident] = tid
+                self._thread_names[tid] = threading.current_thread().name
+            return self._threads[ident]
+
+    @contextmanager
+    def _record(self, name: str, cat: str, args: Dict):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': (start - self._origin) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': 1,
+                'tid': self._tid(),
+            }
+            if args:
+                event['args'] = args
+            with self._lock:
+                self.events.append(event)
+
+    def span(self, name: str, cat: str = 'build', **args):
+        """Contexte mesurant une étape ; course=... rattache l'étape à un cours"""
+        if not self.enabled:
+            return nullcontext()
+        return self._record(name, cat, args)
+
+    def write_trace(self, path: Path):
+        """Écrit la trace (trace event format, événements complets 'X')"""
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'build.py'}}]
+        metadata += [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for tid, name in sorted(self._thread_names.items())
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'traceEvents': metadata + sorted(self.events, key=lambda e: (e['ts'], e['tid'])),
+            'displayTimeUnit': 'ms',
+        }), encoding='utf-8')
+
+    def summary(self, top: int = 10) -> str:
+        """Tableau des étapes et des cours les plus lents"""
+        stages: Dict[str, List[float]] = {}
+        courses: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            stages.setdefault(event['name'], []).append(event['dur'])
+            course = event.get('args', {}).get('course')
+            if course:
+                per_stage = courses.setdefault(course, {})
+                per_stage[event['name']] = per_stage.get(event['name'], 0) + event['dur']
+
+        lines = [f"  {'Étape':<20} {'Total':>10} {'Appels':>7} {'Max':>10}"]
+        for name, durations in sorted(stages.items(), key=lambda item: -sum(item[1]))[:top]:
+            lines.append(f"  {name:<20} {sum(durations) / 1000:>7.1f} ms {len(durations):>7} "
+                         f"{max(durations) / 1000:>7.1f} ms")
+
+        if courses:
+            lines.append('')
+            lines.append('  Cours les plus lents')
+            ranked = sorted(courses.items(), key=lambda item: -sum(item[1].values()))[:top]
+            for course, per_stage in ranked:
+                detail = ', '.join(
+                    f"{name} {duration / 1000:.1f}"
+                    for name, duration in sorted(per_stage.items(), key=lambda item: -item[1])
+                )
+                lines.append(f"  {sum(per_stage.values()) / 1000:>7.1f} ms  {course}  ({detail})")
+        return '\n'.join(lines)
+
+
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?[bo]?\s*$', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """Taille lisible en octets : '512M', '1.5G', '800Mo', '2048k'"""
+    match = _SIZE_RE.match(text)
+    if not match:
+        raise ValueError(f"Taille invalide : {text!r} (ex. 512M, 2G)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(size: float) -> str:
+    if abs(size) < 1 << 20:
+        return f"{size / (1 << 10):.0f} ko"
+    return f"{size / (1 << 20):.1f} Mo"
+
+
+class MemoryProfiler:
+    """
+    Mémoire Python allouée (tracemalloc) : pic et mémoire conservée après chaque étape
+    et chaque cours, principaux sites d'allocation au point le plus haut
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: List[Tuple[str, int, int]] = []        # (étape, conservée, pic de l'étape)
+        self.courses: Dict[str, Dict[str, int]] = {}        # cours -> {phase: conservée}
+        self.course_peaks: Dict[str, int] = {}
+        self.peak = 0
+        self._stage_peak = 0
+        self._snapshot = None
+        self._snapshot_size = -1
+
+    def enable(self, frames: int = 1):
+        self.enabled = True
+        tracemalloc.start(frames)
+
+    def checkpoint(self, stage: str):
+        """Fin d'une étape : mémoire conservée, pic depuis l'étape précédente, snapshot si record"""
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        peak = max(peak, self._stage_peak)
+        self._stage_peak = 0
+        self.peak = max(self.peak, peak)
+        self.stages.append((stage, current, peak))
+        if current > self._snapshot_size:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._snapshot_size = current
+
+    @contextmanager
+    def _track(self, course: str, phase: str):
+        # Pic propre au cours ; celui de l'étape en cours est reporté
+        before, peak = tracemalloc.get_traced_memory()
+        self._stage_peak = max(self._stage_peak, peak)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            self._stage_peak = max(self._stage_peak, peak)
+            self.peak = max(self.peak, peak)
+            self.courses.setdefault(course, {})[phase] = after - before
+            self.course_peaks[course] = max(self.course_peaks.get(course, 0), peak - before)
+
+    def track(self, course: str, phase: str):
+        """Contexte mesurant la mémoire conservée par un cours pendant une phase (parse, render)"""
+        if not self.enabled:
+            return nullcontext()
+        return self._track(course, phase)
+
+    @staticmethod
+    def max_rss() -> Optional[int]:
+        """Pic de mémoire résidente du processus (octets), si disponible"""
+        if resource is None:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # ko sous Linux
+
+    def summary(self, top: int = 10) -> str:
+        lines = [f"  Pic Python (tracemalloc) : {format_size(self.peak)}"]
+        rss = self.max_rss()
+        if rss:
+            lines.append(f"  Pic résident (RSS)       : {format_size(rss)}")
+
+        lines += ['', f"  {'Étape':<20} {'Conservée':>11} {'Pic':>11}"]
+        for stage, current, peak in self.stages:
+            lines.append(f"  {stage:<20} {format_size(current):>11} {format_size(peak):>11}")
+
+        if self.courses:
+            lines += ['', '  Mémoire conservée par cours']
+            ranked = sorted(self.courses.items(), key=lambda item: -sum(item[1].values()))[:top]
+            for course, phases in ranked:
+                detail = ', '.join(f"{phase} {format_size(size)}" for phase, size in phases.items())
+                lines.append(f"  {format_size(sum(phases.values())):>11}  {course}  "
+                             f"({detail}, pic {format_size(self.course_peaks.get(course, 0))})")
+
+        if self._snapshot is not None:
+            lines += ['', f"  Principaux sites d'allocation ({format_size(self._snapshot_size)} conservés)"]
+            for stat in self._snapshot.statistics('lineno')[:top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {format_size(stat.size):>11}  {frame.filename}:{frame.lineno} ({stat.count} blocs)")
+        return '\n'.join(lines)
+
+
+# Profileurs du processus (activés par build.py --profile / --memory-profile)
+profiler = BuildProfiler()
+memory = MemoryProfiler()
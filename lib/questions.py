@@ -0,0 +1,198 @@
+"""
+Banque de questions du corpus : questions des blocs :::questions et cartes des cours QROC,
+avec cours, slide, section et collections. Index découpé par collection, mis à jour à partir
+de l'empreinte de chaque source : un cours inchangé n'est ni relu ni analysé.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import SLIDE_TYPES
+from .digests import DigestCache, file_digest
+from .models import Presentation
+
+
+QUESTIONS_DIR = 'questions'
+INDEX_FILE = 'index.json'
+
+# Cache des questions par cours, dans le dossier de cache du build
+QUESTION_CACHE = 'questions.json'
+CACHE_VERSION = 2
+
+# Modules dont dépendent les questions extraites : le cache est invalidé quand l'un d'eux change
+EXTRACTOR_MODULES = ('config.py', 'models.py', 'parser.py', 'questions.py', 'site.py')
+
+# Cours dont chaque slide de contenu est une question (titre) et sa réponse (points)
+QROC_THEME = 'qroc'
+
+# Métadonnées de cours reprises dans la banque
+COURSE_FIELDS = ('url', 'title', 'theme', 'status', 'collections')
+
+
+def _item_texts(item) -> List[str]:
+    """Textes d'un point de slide : ligne Markdown, bloc, ou une ligne par rangée de tableau"""
+    if isinstance(item, str):
+        return [item]
+    if item.get('type') == 'table':
+        return [' · '.join(cell for cell in row if cell) for row in item['rows']]
+    return [item.get('text') or item.get('content') or '']
+
+
+def qroc_answer(slide) -> List[str]:
+    """
+    Réponse d'une carte QROC : points du corps de la slide (listes, citations, tableaux),
+    sinon la prose de ses détails (réponse rédigée en paragraphes), sans références ni images
+    """
+    answer = [text for item in slide.content for text in _item_texts(item) if text]
+    if answer:
+        return answer
+    return [
+        text for item in slide.details for text in _item_texts(item)
+        if text and not text.startswith(('[@ref', '[^', '!['))
+    ]
+
+
+def course_questions(presentation: Presentation) -> List[Dict]:
+    """
+    Questions d'un cours, dans l'ordre des slides :
+      slide    : index de la slide (ancre #slide-N de la présentation)
+      section  : titre de la section (# ) englobante
+      title    : titre de la slide
+      question : texte de la question
+      answer   : points de réponse (cours QROC seulement)
+    """
+    qroc = presentation.metadata.get('theme') == QROC_THEME
+    questions = []
+    section = ''
+    for index, slide in enumerate(presentation.slides):
+        if slide.slide_type == SLIDE_TYPES['section']:
+            section = slide.title
+            continue
+        if slide.slide_type == SLIDE_TYPES['title']:
+            continue
+        entry = {'slide': index, 'section': section, 'title': slide.title}
+        if qroc and slide.slide_type == SLIDE_TYPES['content']:
+            questions.append({**entry, 'question': slide.title, 'answer': qroc_answer(slide)})
+        for question in slide.questions:
+            questions.append({**entry, 'question': question})
+    return questions
+
+
+def extractor_version() -> str:
+    """Empreinte du code d'extraction (analyseur Markdown, métadonnées des cours, questions)"""
+    lib_dir = Path(__file__).parent
+    h = hashlib.sha256(str(CACHE_VERSION).encode('utf-8'))
+    for name in EXTRACTOR_MODULES:
+        h.update(file_digest(lib_dir / name).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+class QuestionBank:
+    """
+    Questions de chaque cours ({cours: {digest, course, questions}}), conservées d'un build
+    à l'autre avec l'empreinte de la source et celle du code d'extraction.
+    course vaut None pour un cours ignoré (obsolète).
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = cache_file
+        self.version = extractor_version()
+        self.digests = DigestCache()
+        self.previous: Dict[str, Dict] = {}
+        if cache_file is not None:
+            try:
+                data = json.loads(cache_file.read_text(encoding='utf-8'))
+                if data.get('version') == self.version:
+                    self.digests = DigestCache(data.get('files'))
+                    self.previous = data.get('courses', {})
+            except (OSError, ValueError, AttributeError):
+                pass
+        self.courses: Dict[str, Dict] = {}
+        self._files = set()
+        self.scanned = 0
+        self.reused = 0
+
+    def digest(self, md_file: Path) -> str:
+        """Empreinte de la source (relue seulement si sa taille ou sa date a changé)"""
+        self._files.add(str(md_file))
+        return self.digests.digest(md_file)
+
+    def cached(self, course: str, digest: str) -> bool:
+        """Reprend les questions du build précédent si la source n'a pas changé"""
+        entry = self.previous.get(course)
+        if entry is None or entry['digest'] != digest:
+            return False
+        self.courses[course] = entry
+        self.reused += 1
+        return True
+
+    def add(self, course: str, digest: str, metadata: Optional[Dict], presentation: Optional[Presentation]):
+        """Enregistre les questions d'un cours analysé (metadata None : cours ignoré)"""
+        self.courses[course] = {
+            'digest': digest,
+            'course': {key: metadata[key] for key in COURSE_FIELDS} if metadata is not None else None,
+            'questions': course_questions(presentation) if metadata is not None else [],
+        }
+        self.scanned += 1
+
+    def shards(self, collections_config: Dict, preview: bool = False) -> Dict[str, Dict]:
+        """
+        Un index par collection définie dans collections.toml :
+          courses   : [{url, title, theme, status, collections}]
+          questions : [{course (n° dans courses), slide, section, title, question, answer?}]
+        Les drafts ne sont inclus qu'en prévisualisation.
+        """
+        shards = {}
+        for coll_id in collections_config:
+            courses, questions = [], []
+            for _, entry in sorted(self.courses.items()):
+                course = entry['course']
+                if course is None or coll_id not in course['collections']:
+                    continue
+                if course['status'] == 'draft' and not preview:
+                    continue
+                course_index = len(courses)
+                courses.append(course)
+                questions += [{'course': course_index, **question} for question in entry['questions']]
+            if courses:
+                shards[coll_id] = {'collection': coll_id, 'courses': courses, 'questions': questions}
+        return shards
+
+    def index(self, shards: Dict[str, Dict], collections_config: Dict) -> Dict:
+        """Sommaire de la banque : une entrée par collection, fichiers chargés à la demande"""
+        urls = {course['url'] for shard in shards.values() for course in shard['courses']}
+        return {
+            'collections': [
+                {
+                    'id': coll_id,
+                    'title': collections_config.get(coll_id, {}).get('title', coll_id),
+                    'url': f'{QUESTIONS_DIR}/{coll_id}.json',
+                    'courses': len(shard['courses']),
+                    'questions': len(shard['questions']),
+                }
+                for coll_id, shard in shards.items()
+            ],
+            'total': sum(
+                len(entry['questions']) for entry in self.courses.values()
+                if entry['course'] is not None and entry['course']['url'] in urls
+            ),
+        }
+
+    def save(self):
+        """Enregistre le cache (seulement les cours de ce build : les cours supprimés en sortent)"""
+        if self.cache_file is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_file.write_text(json.dumps(
+            {
+                'version': self.version,
+                'files': {path: entry for path, entry in self.digests.entries.items() if path in self._files},
+                'courses': self.courses,
+            },
+            ensure_ascii=False, separators=(',', ':'),
+        ), encoding='utf-8')
+
+    def __str__(self):
+        return f"{self.scanned} cours analysé(s), {self.reused} inchangé(s)"
@@ -0,0 +1,46 @@
+"""
+Déploiement par releases : releases/<id>/ et un lien symbolique current vers la release active
+"""
+
+import re
+import time
+import hashlib
+from typing import List, Optional
+
+
+RELEASES_DIR = 'releases'
+CURRENT_LINK = 'current'
+DEFAULT_KEEP = 5
+
+# Horodatage UTC puis empreinte du manifeste : l'ordre alphabétique est l'ordre chronologique
+_RELEASE_RE = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+
+def release_id(manifest_text: str, now: Optional[float] = None) -> str:
+    """Identifiant d'une nouvelle release (ex. 20261019-120113-ab12cd34)"""
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(now))
+    return f"{stamp}-{hashlib.sha256(manifest_text.encode('utf-8')).hexdigest()[:8]}"
+
+
+def is_release(name: str) -> bool:
+    """Seuls les dossiers nommés comme une release sont listés (et donc supprimables)"""
+    return bool(_RELEASE_RE.match(name))
+
+
+def releases_to_prune(releases: List[str], keep: int, active: str) -> List[str]:
+    """Releases à supprimer : toutes sauf les `keep` plus récentes et la release active"""
+    ordered = sorted(set(releases))
+    kept = set(ordered[-max(1, keep):]) | {active}
+    return [name for name in ordered if name not in kept]
+
+
+def rollback_target(releases: List[str], current: Optional[str], requested: str = '') -> str:
+    """Release à réactiver : celle demandée, sinon celle qui précède la release active"""
+    if requested:
+        if requested not in releases:
+            raise ValueError(f"Release inconnue : {requested}")
+        return requested
+    older = [name for name in sorted(releases) if current is None or name < current]
+    if not older:
+        raise ValueError("Aucune release antérieure à la release active")
+    return older[-1]
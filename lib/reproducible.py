@@ -0,0 +1,92 @@
+"""
+Dates des sources pour un build reproductible : mêmes sources, mêmes octets en sortie
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+
+def source_date_epoch() -> Optional[int]:
+    """Valeur de SOURCE_DATE_EPOCH (convention reproducible-builds.org), si définie"""
+    value = os.environ.get('SOURCE_DATE_EPOCH', '').strip()
+    return int(value) if value.isdigit() else None
+
+
+def _git(cwd: Path, *args: str) -> Optional[str]:
+    """Sortie brute d'une commande git (None hors dépôt ou sans git)"""
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, encoding='utf-8')
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def git_commit_times(root: Path) -> Dict[Path, int]:
+    """
+    Date du dernier commit de chaque fichier suivi sous root, sauf les fichiers modifiés ou non
+    suivis : une seule passe de `git log` et un seul `git status` pour tout le dossier
+    """
+    top = _git(root, 'rev-parse', '--show-toplevel')
+    if not top:
+        return {}
+    top_dir = Path(top.strip()).resolve()
+    # -z : chemins non échappés (accents), séparés par NUL ; \x01 marque la date d'un commit
+    log = _git(root, 'log', '-z', '--name-only', '--format=%x01%ct', '--', '.')
+    status = _git(root, 'status', '--porcelain', '-z', '--untracked-files=all', '--', '.')
+    if log is None or status is None:
+        return {}
+
+    times: Dict[Path, int] = {}
+    commit_time = 0
+    for token in log.split('\0'):
+        if token.startswith('\x01'):
+            commit_time = int(token[1:])
+            continue
+        name = token[1:] if token.startswith('\n') else token
+        if name:
+            # Du plus récent au plus ancien : le premier commit vu est le dernier
+            times.setdefault(top_dir / name, commit_time)
+
+    tokens = iter(status.split('\0'))
+    for entry in tokens:
+        if len(entry) < 4:
+            continue
+        times.pop(top_dir / entry[3:], None)
+        if entry[0] in 'RC':
+            next(tokens, None)  # Chemin d'origine d'un renommage ou d'une copie
+    return times
+
+
+class SourceDates:
+    """
+    Date d'un fichier source : SOURCE_DATE_EPOCH si défini, sinon date du dernier commit git
+    (fichier suivi et non modifié sous root), sinon mtime. Dates en UTC : la sortie ne dépend
+    pas du fuseau horaire de la machine de build.
+    """
+
+    def __init__(self, root: Path, epoch: Optional[int] = None):
+        self.root = root
+        self.epoch = epoch if epoch is not None else source_date_epoch()
+        self._commits: Optional[Dict[Path, int]] = None
+        self._cache: Dict[Path, int] = {}
+
+    def timestamp(self, path: Path) -> int:
+        if self.epoch is not None:
+            return self.epoch
+        if self._commits is None:
+            self._commits = git_commit_times(self.root)
+        key = path.resolve()
+        if key not in self._cache:
+            self._cache[key] = self._commits.get(key) or int(key.stat().st_mtime)
+        return self._cache[key]
+
+    def date(self, path: Path) -> datetime:
+        return datetime.fromtimestamp(self.timestamp(path), tz=timezone.utc)
+
+    def latest(self, paths: Iterable[Path]) -> datetime:
+        """Date la plus récente d'un ensemble de sources (date du site)"""
+        return datetime.fromtimestamp(max((self.timestamp(p) for p in paths), default=self.epoch or 0),
+                                      tz=timezone.utc)
@@ -0,0 +1,162 @@
+"""
+Index de recherche plein texte : index inversés compacts, découpés par collection
+pour le catalogue, et embarqués dans chaque présentation
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Iterable
+
+from .models import Presentation, Slide
+
+
+SEARCH_DIR = 'search'
+MIN_TOKEN_LENGTH = 2
+
+# Poids par champ : un terme du titre pèse plus qu'un terme des détails
+WEIGHTS = {
+    'course': 8,
+    'title': 4,
+    'content': 2,
+    'details': 1,
+    'questions': 1,
+}
+
+# Mots vides (forme repliée, sans accents) ignorés à l'indexation et à la requête
+STOPWORDS = frozenset('''
+    au aux avec ce ces cette dans de des du elle en est et eux il ils je la le les leur lui
+    ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses
+    son sur ta te tes toi ton tu un une vos votre vous sont ete etre avoir ont plus tres
+'''.split())
+
+_LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss'})
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_REF_DEF_RE = re.compile(r'^\[\^\w+\]:')
+_FOOTNOTE_RE = re.compile(r'\[\^\w+\]')
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents ni ligatures (« Œdème aigu » -> « oedeme aigu »)"""
+    text = unicodedata.normalize('NFD', text.translate(_LIGATURES))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes repliés, sans mots vides ni termes trop courts"""
+    return [
+        token for token in _TOKEN_RE.findall(fold(text))
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS
+    ]
+
+
+def _item_text(item) -> str:
+    """Texte indexable d'un élément de slide (ligne Markdown, tableau, bloc)"""
+    if isinstance(item, dict):
+        if item.get('type') == 'table':
+            cells = list(item.get('headers', []))
+            for row in item.get('rows', []):
+                cells.extend(row)
+            return ' '.join(cells)
+        return item.get('text') or item.get('content') or ''
+    if _REF_DEF_RE.match(item.strip()):
+        return ''  # Définitions de références bibliographiques
+    item = _IMAGE_RE.sub(r'\1', item)
+    return _FOOTNOTE_RE.sub(' ', item)
+
+
+def _add_terms(terms: Dict[str, int], items: Iterable, weight: int):
+    for item in items:
+        for token in tokenize(_item_text(item)):
+            terms[token] = max(terms.get(token, 0), weight)
+
+
+def view_terms(slide: Slide) -> List[Dict[str, int]]:
+    """Termes pondérés de chaque vue d'une slide : [principale, détails, questions]"""
+    main: Dict[str, int] = {}
+    _add_terms(main, [*slide.content, slide.subtitle, slide.image_caption], WEIGHTS['content'])
+    _add_terms(main, [slide.title], WEIGHTS['title'])
+    details: Dict[str, int] = {}
+    _add_terms(details, slide.details, WEIGHTS['details'])
+    questions: Dict[str, int] = {}
+    _add_terms(questions, slide.questions, WEIGHTS['questions'])
+    return [main, details, questions]
+
+
+def slide_terms(slide: Slide) -> Dict[str, int]:
+    """Termes d'une slide avec leur poids (champ le plus fort)"""
+    terms: Dict[str, int] = {}
+    for view in view_terms(slide):
+        for term, weight in view.items():
+            terms[term] = max(terms.get(term, 0), weight)
+    return terms
+
+
+def course_documents(presentation: Presentation) -> List[Dict]:
+    """
+    Documents indexables d'un cours : un par slide, ancre #slide-N (N = index du groupe).
+    La slide de titre porte le titre du cours avec le poids le plus fort.
+    """
+    documents = []
+    for index, slide in enumerate(presentation.slides):
+        terms = slide_terms(slide)
+        if index == 0:
+            _add_terms(terms, [presentation.title], WEIGHTS['course'])
+        if terms:
+            documents.append({
+                'slide': index,
+                'title': slide.title or presentation.title,
+                'terms': terms,
+            })
+    return documents
+
+
+def deck_index(presentation: Presentation) -> Dict:
+    """
+    Index embarqué dans une présentation, une entrée par vue accessible :
+      docs  : [[index slide, vue (0 principale, 1 détails, 2 questions), titre]]
+      terms : {terme: [doc, poids, doc, poids, ...]}
+    """
+    docs, postings = [], {}
+    for index, slide in enumerate(presentation.slides):
+        views = view_terms(slide)
+        if index == 0:
+            _add_terms(views[0], [presentation.title], WEIGHTS['course'])
+        for view, terms in enumerate(views[:slide.max_view + 1]):
+            if not terms:
+                continue
+            doc_index = len(docs)
+            docs.append([index, view, slide.title or presentation.title])
+            for term, weight in terms.items():
+                postings.setdefault(term, []).extend((doc_index, weight))
+    return {'docs': docs, 'terms': dict(sorted(postings.items()))}
+
+
+def build_search_shards(catalog: Dict, documents: Dict[str, List[Dict]], preview: bool = False) -> Dict[str, Dict]:
+    """
+    Construit un index par collection :
+      courses : [[url, titre]]
+      docs    : [[n° cours, index slide, titre slide]]
+      terms   : {terme: [doc, poids, doc, poids, ...]}
+    Les drafts ne sont indexés qu'en prévisualisation.
+    """
+    shards = {}
+    for collection in catalog['collections']:
+        courses, docs, postings = [], [], {}
+        for url in collection['courses']:
+            course = catalog['courses'][url]
+            if course.get('status') == 'draft' and not preview:
+                continue
+            course_index = len(courses)
+            courses.append([url, course['title']])
+            for document in documents.get(url, []):
+                doc_index = len(docs)
+                docs.append([course_index, document['slide'], document['title']])
+                for term, weight in document['terms'].items():
+                    postings.setdefault(term, []).extend((doc_index, weight))
+        shards[collection['id']] = {
+            'courses': courses,
+            'docs': docs,
+            'terms': dict(sorted(postings.items())),
+        }
+    return shards
@@ -0,0 +1,174 @@
+"""
+Destinations des fichiers d'un build : dossier (incrémental), mémoire ou archive zip.
+Les chemins sont relatifs à la racine du site, au format POSIX ('dossier/cours/index.html').
+"""
+
+import io
+import hashlib
+import zipfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from .config import CACHE_DIR, OUTPUT_DIGESTS, GENERATED_FILES
+from .digests import DigestCache
+from .sync import GeneratedFiles, SyncStats, sync_files
+
+
+class OutputSink:
+    """
+    Destination des fichiers : write_bytes() est la seule méthode à fournir.
+    Les écritures peuvent venir de plusieurs threads (appelants de build_site, serveurs).
+    """
+
+    # Dossier des caches persistants entre builds (images, empreintes) ; None : aucun cache
+    cache_dir: Optional[Path] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: Dict[str, str] = {}
+
+    def write_bytes(self, rel_path: str, data: bytes) -> bool:
+        """Écrit un fichier, retourne vrai s'il a changé"""
+        raise NotImplementedError
+
+    def write_text(self, rel_path: str, text: str) -> bool:
+        return self.write_bytes(rel_path, text.encode('utf-8'))
+
+    def sync_files(self, files: Dict[str, Path], rel_dir: str) -> SyncStats:
+        """Publie {chemin relatif: source} sous rel_dir (images, fonts)"""
+        stats = SyncStats()
+        for rel_path, src in sorted(files.items()):
+            if self.write_bytes(f'{rel_dir}/{rel_path}', src.read_bytes()):
+                stats.copied += 1
+            else:
+                stats.unchanged += 1
+        return stats
+
+    def sync_tree(self, src_dir: Path, rel_dir: str) -> SyncStats:
+        files = {p.relative_to(src_dir).as_posix(): p for p in sorted(src_dir.rglob('*')) if p.is_file()}
+        return self.sync_files(files, rel_dir)
+
+    def remove(self, rel_path: str):
+        """Retire un fichier d'un build précédent (sans effet s'il n'existe pas)"""
+
+    def prune(self):
+        """Supprime les sorties d'un build précédent qui n'ont pas été réécrites"""
+
+    def digests(self) -> Dict[str, str]:
+        """Empreinte SHA-256 de chaque fichier publié (manifeste de précache)"""
+        with self._lock:
+            return dict(self._digests)
+
+    def _record(self, rel_path: str, data: bytes):
+        with self._lock:
+            self._digests[rel_path] = hashlib.sha256(data).hexdigest()
+
+    def close(self) -> str:
+        """Termine le build (suppression des sorties périmées, fermeture de l'archive), retourne un bilan"""
+        return f"{len(self._digests)} fichier(s)"
+
+
+class DirectorySink(OutputSink):
+    """
+    Dossier de sortie : seuls les fichiers dont le contenu change sont réécrits (mtime conservé),
+    ceux du build précédent qui ne sont plus produits sont supprimés à la fermeture
+    """
+
+    def __init__(self, root: Path):
+        super().__init__()
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = root / CACHE_DIR
+        self.generated = GeneratedFiles(root, self.cache_dir / GENERATED_FILES)
+
+    def write_bytes(self, rel_path: str, data: bytes) -> bool:
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return self.generated.write(path, data)
+
+    def sync_files(self, files: Dict[str, Path], rel_dir: str) -> SyncStats:
+        # Copies (reflink si possible), dossier élagué des fichiers qui ne sont plus publiés
+        return sync_files(files, self.root / rel_dir)
+
+    def remove(self, rel_path: str):
+        (self.root / rel_path).unlink(missing_ok=True)
+
+    def digests(self) -> Dict[str, str]:
+        # Tout le dossier publié, y compris les fichiers synchronisés, via le cache (taille, mtime),
+        # sauf les sorties du build précédent qui ne sont plus produites (supprimées par prune())
+        cache_file = self.cache_dir / OUTPUT_DIGESTS
+        cache = DigestCache.load(cache_file)
+        stale = self.generated.previous - self.generated.current
+        entries = {}
+        for path in sorted(self.root.rglob('*')):
+            rel = path.relative_to(self.root).as_posix()
+            if path.is_file() and not rel.startswith('.') and rel not in stale:
+                entries[rel] = cache.digest(path)
+        cache.save(cache_file)
+        return entries
+
+    def prune(self):
+        self.generated.prune()
+
+    def close(self) -> str:
+        self.generated.save()
+        return str(self.generated)
+
+    def __str__(self):
+        return str(self.root)
+
+
+class MemorySink(OutputSink):
+    """Fichiers conservés en mémoire ({chemin relatif: octets}) : tests, intégration dans un LMS"""
+
+    def __init__(self):
+        super().__init__()
+        self.files: Dict[str, bytes] = {}
+
+    def write_bytes(self, rel_path: str, data: bytes) -> bool:
+        with self._lock:
+            changed = self.files.get(rel_path) != data
+            self.files[rel_path] = data
+        self._record(rel_path, data)
+        return changed
+
+    def remove(self, rel_path: str):
+        with self._lock:
+            self.files.pop(rel_path, None)
+            self._digests.pop(rel_path, None)
+
+    def text(self, rel_path: str) -> str:
+        return self.files[rel_path].decode('utf-8')
+
+    def __str__(self):
+        return f"<mémoire : {len(self.files)} fichiers>"
+
+
+class ZipSink(OutputSink):
+    """Archive zip écrite au fil du build, dans un fichier ou un flux (réponse HTTP, tampon)"""
+
+    # Date fixe des entrées : même contenu, même archive
+    DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+    def __init__(self, target: Path | BinaryIO | None = None, prefix: str = ''):
+        super().__init__()
+        self.target = target if target is not None else io.BytesIO()
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self._zip = zipfile.ZipFile(self.target, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def write_bytes(self, rel_path: str, data: bytes) -> bool:
+        info = zipfile.ZipInfo(self.prefix + rel_path, date_time=self.DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        with self._lock:
+            self._zip.writestr(info, data)
+        self._record(rel_path, data)
+        return True
+
+    def close(self) -> str:
+        self._zip.close()
+        return super().close()
+
+    def __str__(self):
+        return str(self.target) if isinstance(self.target, Path) else '<archive zip>'
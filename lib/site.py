@@ -0,0 +1,649 @@
+"""
+Build du site : analyse des cours, catalogue, présentations, documents de détails,
+index de recherche, images et service worker, écrits dans une destination (OutputSink)
+
+    from lib import build_site, MemorySink
+    result = build_site(Path('cours'), MemorySink())
+    result.sink.files['index.html'], result.warnings, result.courses['dossier/cours'].render_ms
+"""
+
+import json
+import time
+import tomllib
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .config import THEMES, DEFAULT_THEME, CSS_FONTS, SOURCE_EXCLUDED_DIRS, SOURCE_EXCLUDED_FILES
+from .models import Presentation
+from .parser import parse_presentation, lint_presentation
+from .generator import HTMLGenerator, PageGenerator
+from .images import ImageRegistry
+from .catalog import build_catalog, catalog_json
+from .details import render_details
+from .digests import file_digest
+from .log import get_logger, collect_events
+from .offline import (MANIFEST_FILE, SERVICE_WORKER_FILE, build_precache_manifest, update_question_entries,
+                      write_offline_files)
+from .profiling import profiler, memory, format_size
+from .questions import QUESTIONS_DIR, INDEX_FILE, QUESTION_CACHE, QuestionBank
+from .reproducible import SourceDates, source_date_epoch
+from .search import SEARCH_DIR, course_documents, build_search_shards
+from .sink import OutputSink, DirectorySink, MemorySink
+from .weight import DeckWeight, WeightReport, split_budgets
+
+
+# Racine du projet : assets CSS/JS, fonts et modèle du service worker
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+log = get_logger('build')
+
+
+@dataclass
+class CourseResult:
+    """Résultat du build d'un cours"""
+    course: str                         # dossier/slug
+    metadata: Dict = field(default_factory=dict)
+    parse_ms: float = 0.0
+    render_ms: float = 0.0
+    images: List[str] = field(default_factory=list)
+    weight: Optional[DeckWeight] = None
+    error: str = ''
+
+
+@dataclass
+class BuildResult:
+    """Résultat d'un build : catalogue, cours, événements (avertissements et erreurs) et durées"""
+    sink: OutputSink
+    catalog: Dict = field(default_factory=dict)
+    courses: Dict[str, CourseResult] = field(default_factory=dict)
+    warnings: List[Dict] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)     # étape -> ms
+    weights: Optional[WeightReport] = None
+    images: int = 0
+    indexed_slides: int = 0
+    questions: int = 0
+    duration_ms: float = 0.0
+
+    @property
+    def errors(self) -> List[Dict]:
+        return [event for event in self.warnings if event['level'] in ('error', 'critical')]
+
+    @property
+    def ok(self) -> bool:
+        """Aucune erreur et aucun budget de poids dépassé"""
+        return not self.errors and not (self.weights and self.weights.violations())
+
+    @contextmanager
+    def stage(self, name: str):
+        """Étape chronométrée (et tracée si le profilage est actif)"""
+        start = time.perf_counter()
+        try:
+            with profiler.span(name):
+                yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def load_collections_config(source_dir: Path) -> Dict:
+    """Charge la configuration des collections depuis TOML"""
+    config_file = source_dir / 'collections.toml'
+    if config_file.exists():
+        with open(config_file, 'rb') as f:
+            return tomllib.load(f)
+    return {}
+
+
+def parse_collections_field(value) -> List[str]:
+    """Parse le champ collections (string ou liste)"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    return [c.strip() for c in value.split(',') if c.strip()]
+
+
+def is_course_file(source_dir: Path, md_file: Path) -> bool:
+    """Vrai si md_file est un cours du site : <dossier>/<cours>.md, hors dossiers et fichiers exclus"""
+    return (
+        md_file.parent.parent == source_dir
+        and md_file.parent.name not in SOURCE_EXCLUDED_DIRS
+        and md_file.name not in SOURCE_EXCLUDED_FILES
+        and md_file.suffix == '.md'
+        and not md_file.name.startswith('.')
+        and md_file.is_file()
+    )
+
+
+def find_folders(source_dir: Path) -> Dict[str, List[Path]]:
+    """Trouve tous les dossiers contenant des .md"""
+    folders = {}
+
+    for subdir in sorted(source_dir.iterdir()):
+        if not subdir.is_dir():
+            continue
+        if subdir.name in SOURCE_EXCLUDED_DIRS:
+            continue
+
+        md_files = [f for f in sorted(subdir.glob('*.md')) if is_course_file(source_dir, f)]
+
+        if md_files:
+            folders[subdir.name] = md_files
+
+    return folders
+
+
+def parse_course(md_file: Path, folder_name: str) -> Tuple[Presentation, Dict] | None:
+    """Analyse un cours et retourne (présentation, métadonnées), ou None si le cours est ignoré"""
+    course = f'{folder_name}/{md_file.stem}'
+    log.info("    📄 %s...", md_file.name, extra={'course': course})
+
+    with profiler.span('parse', course=course):
+        content = md_file.read_text(encoding='utf-8')
+        presentation = parse_presentation(content)
+
+    with profiler.span('lint', course=course):
+        warnings = lint_presentation(presentation)
+    for warning in warnings:
+        log.warning("      ⚠️  %s", warning, extra={'course': course, 'event': 'lint'})
+
+    theme = presentation.metadata.get('theme', DEFAULT_THEME)
+    collections = parse_collections_field(presentation.metadata.get('collections'))
+    status = presentation.metadata.get('status', 'published')
+
+    # Cours obsolète : ignoré complètement (ni placeholder, ni entrée dans les index)
+    if status in ('old', 'obsolete'):
+        log.info("      🗄️  Obsolète (ignoré)", extra={'course': course, 'status': status})
+        return None
+
+    return presentation, {
+        'slug': md_file.stem,
+        'folder': folder_name,
+        'title': presentation.metadata.get('title', md_file.stem),
+        'subtitle': presentation.metadata.get('subtitle', ''),
+        'author': presentation.metadata.get('author', ''),
+        'date': presentation.metadata.get('date', ''),
+        'theme': theme,
+        'status': status,
+        'university': presentation.metadata.get('university', ''),
+        'department': presentation.metadata.get('department', ''),
+        'total_slides': presentation.total_slides,
+        'collections': collections,
+        'url': f'{folder_name}/{md_file.stem}/index.html',
+        'details_url': f'{folder_name}/{md_file.stem}/details.html',
+    }
+
+
+def render_course(
+    md_file: Path,
+    presentation: Presentation,
+    metadata: Dict,
+    sink: OutputSink,
+    preview: bool,
+    registry: ImageRegistry,
+    offline: bool = False,
+    metrics_endpoint: str | None = None,
+    generated_at: datetime | None = None,
+    weights: WeightReport | None = None,
+) -> List[str]:
+    """Génère la présentation et le document de détails d'un cours analysé, retourne ses images publiées"""
+    theme = metadata['theme']
+    status = metadata['status']
+    course = f"{metadata['folder']}/{metadata['slug']}"
+    images = {}
+
+    # Générer la présentation (CSS et JS inlinés)
+    if status == "draft" and not preview:
+        with profiler.span('render', course=course):
+            html = generate_draft_page(presentation, theme)
+        log.info("    ⏸️  %s : draft (non publié)", md_file.name, extra={'course': course, 'status': status})
+    else:
+        with profiler.span('images', course=course):
+            images = registry.course_map(presentation.images, md_file.parent)
+        with profiler.span('render', course=course):
+            generator = HTMLGenerator(
+                base_path=BASE_DIR, theme=theme, images=images, offline=offline, metrics_endpoint=metrics_endpoint
+            )
+            html = generator.generate(presentation, is_draft=(status == 'draft'))
+        if status == 'draft':
+            log.info("    👁️  %s : draft (preview)", md_file.name, extra={'course': course, 'status': status})
+
+    if weights is not None and weights.wants(course):
+        with profiler.span('weight', course=course):
+            weights.measure(course, html, [registry.files[image.name] for image in images.values()])
+
+    with profiler.span('write', course=course):
+        sink.write_text(metadata['url'], html)
+
+    # Générer les détails (document imprimable)
+    if status != 'draft' or preview:
+        with profiler.span('details', course=course):
+            details = render_details(md_file.read_text(encoding='utf-8'), images, generated_at)
+            if details is not None:
+                sink.write_text(metadata['details_url'], details)
+
+    return sorted({image.name for image in images.values()})
+
+
+def write_site_pages(page_gen: PageGenerator, catalog: Dict, sink: OutputSink) -> int:
+    """Génère et écrit la page d'accueil, les pages de collections et catalog.json"""
+    with profiler.span('catalog pages'):
+        pages = page_gen.generate_pages(catalog)
+    with profiler.span('catalog write'):
+        for rel_path, html in pages.items():
+            sink.write_text(rel_path, html)
+        sink.write_text('catalog.json', json.dumps(catalog_json(catalog), ensure_ascii=False, indent=1))
+    return len(pages)
+
+
+def write_search_index(sink: OutputSink, catalog: Dict, documents: Dict[str, List[Dict]], preview: bool) -> int:
+    """Écrit un index de recherche par collection (search/<collection>.json), retourne le nombre de slides indexées"""
+    shards = build_search_shards(catalog, documents, preview)
+    for coll_id, shard in shards.items():
+        sink.write_text(f'{SEARCH_DIR}/{coll_id}.json', json.dumps(shard, ensure_ascii=False, separators=(',', ':')))
+    return sum(len(shard['docs']) for shard in shards.values())
+
+
+def write_question_bank(sink: OutputSink, bank: QuestionBank, collections_config: Dict, preview: bool) -> Dict:
+    """Écrit la banque de questions (questions/<collection>.json et questions/index.json), retourne le sommaire"""
+    shards = bank.shards(collections_config, preview)
+    for coll_id, shard in shards.items():
+        sink.write_text(f'{QUESTIONS_DIR}/{coll_id}.json', json.dumps(shard, ensure_ascii=False, separators=(',', ':')))
+    index = bank.index(shards, collections_config)
+    sink.write_text(f'{QUESTIONS_DIR}/{INDEX_FILE}', json.dumps(index, ensure_ascii=False, indent=1))
+    bank.save()
+    return index
+
+
+def build_question_bank(source_dir: Path, output_dir: Path, preview: bool = False) -> Tuple[Dict, QuestionBank]:
+    """
+    Met à jour seulement la banque de questions de output_dir : les cours dont la source n'a pas
+    changé depuis le passage précédent (build complet ou banque seule) ne sont ni relus ni analysés
+    """
+    sink = DirectorySink(output_dir)
+    collections_config, _ = split_budgets(load_collections_config(source_dir))
+    bank = QuestionBank(sink.cache_dir / QUESTION_CACHE)
+
+    for folder_name, md_files in find_folders(source_dir).items():
+        for md_file in md_files:
+            course = f'{folder_name}/{md_file.stem}'
+            digest = bank.digest(md_file)
+            if bank.cached(course, digest):
+                continue
+            try:
+                parsed = parse_course(md_file, folder_name)
+            except Exception as e:
+                log.exception("    ❌ Erreur sur %s: %s", md_file.name, e, extra={'course': course})
+                continue
+            presentation, metadata = parsed if parsed is not None else (None, None)
+            bank.add(course, digest, metadata, presentation)
+
+    index = write_question_bank(sink, bank, collections_config, preview)
+
+    # Collections sans cours depuis le passage précédent (le build complet les retire aussi)
+    published = {INDEX_FILE} | {Path(entry['url']).name for entry in index['collections']}
+    for path in (output_dir / QUESTIONS_DIR).glob('*.json'):
+        if path.name not in published:
+            path.unlink()
+
+    # Site hors-ligne : manifeste de précache et service worker suivent la banque
+    manifest_file = output_dir / MANIFEST_FILE
+    if manifest_file.exists():
+        digests = {
+            path.relative_to(output_dir).as_posix(): file_digest(path)
+            for path in sorted((output_dir / QUESTIONS_DIR).glob('*.json'))
+        }
+        manifest = update_question_entries(json.loads(manifest_file.read_text(encoding='utf-8')), digests)
+        write_offline_files(sink, manifest, BASE_DIR / 'js' / 'service-worker.js')
+    return index, bank
+
+
+def generate_draft_page(presentation, theme: str) -> str:
+    """Génère une page placeholder pour un cours en draft"""
+    colors = THEMES.get(theme, THEMES[DEFAULT_THEME])
+
+    return f'''<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{presentation.title} - En cours d'actualisation</title>
+    <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'><rect width='32' height='32' rx='6' fill='%230a4d68'/><path d='M14 8h4v16h-4zM8 14h16v4H8z' fill='%23ffffff'/></svg>">
+    <style>
+        {CSS_FONTS}
+
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+
+        body {{
+            font-family: 'Work Sans', sans-serif;
+            min-height: 100vh;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
+            color: white;
+            text-align: center;
+            padding: 2rem;
+        }}
+
+        .container {{
+            max-width: 500px;
+        }}
+
+        .icon {{
+            font-size: 5rem;
+            margin-bottom: 1.5rem;
+        }}
+
+        h1 {{
+            font-family: 'Crimson Pro', serif;
+            font-size: 2rem;
+            margin-bottom: 1rem;
+        }}
+
+        p {{
+            font-size: 1.1rem;
+            opacity: 0.9;
+            margin-bottom: 2rem;
+        }}
+
+        .back-link {{
+            display: inline-block;
+            padding: 0.75rem 1.5rem;
+            background: rgba(255, 255, 255, 0.2);
+            color: white;
+            text-decoration: none;
+            border-radius: 0.5rem;
+            transition: background 0.2s;
+        }}
+
+        .back-link:hover {{
+            background: rgba(255, 255, 255, 0.3);
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="icon">🔄</div>
+        <h1>{presentation.title}</h1>
+        <p>Ce cours est en cours d'actualisation.<br>Revenez bientôt !</p>
+        <a href="javascript:history.back()" class="back-link">← Retour</a>
+    </div>
+</body>
+</html>'''
+
+def copy_assets(sink: OutputSink):
+    """Synchronise les fonts (CSS/JS sont inlinés dans les HTML)"""
+    fonts_src = BASE_DIR / 'fonts'
+    if fonts_src.exists():
+        stats = sink.sync_tree(fonts_src, 'fonts')
+        log.info("  📁 Fonts synchronisées (%s)", stats)
+
+
+def publish_images(sink: OutputSink, registry: ImageRegistry) -> int:
+    """Publie dans images/ les seules images référencées (noms hachés)"""
+    for missing in registry.missing:
+        log.warning("  ⚠️  Image introuvable : %s", missing, extra={'event': 'missing_image', 'image': missing})
+    stats = sink.sync_files(registry.files, 'images')
+    registry.save_cache()
+    log.info("  🖼️  Images synchronisées (%s)", stats)
+    return stats.total
+
+
+def write_precache(sink: OutputSink, catalog: Dict, course_images: Dict[str, List[str]]):
+    """Génère le manifeste de précache versionné et le service worker"""
+    manifest = build_precache_manifest(sink.digests(), catalog, course_images)
+    write_offline_files(sink, manifest, BASE_DIR / 'js' / 'service-worker.js')
+    log.info("📴 Service worker : %d fichiers (version %s)", len(manifest['entries']), manifest['version'])
+
+
+def build_site(
+    source_dir: Path,
+    sink: OutputSink | Path | None = None,
+    site_title: str = "Formations Médicales",
+    preview: bool = False,
+    offline: bool = True,
+    metrics_endpoint: str | None = None,
+    reproducible: bool = False,
+    weight_report: bool = False,
+) -> BuildResult:
+    """
+    Build complet : compile tous les cours et génère les pages dans sink
+    (dossier pour un Path, mémoire par défaut), retourne le résultat structuré.
+    weight_report : mesurer le poids de toutes les présentations (sinon seulement celles soumises à un budget)
+    """
+    if sink is None:
+        sink = MemorySink()
+    elif isinstance(sink, Path):
+        sink = DirectorySink(sink)
+
+    result = BuildResult(sink)
+    started = time.perf_counter()
+    with collect_events() as events:
+        try:
+            _build(source_dir, result, site_title, preview, offline, metrics_endpoint, reproducible, weight_report)
+        finally:
+            result.warnings = events
+            result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _build(
+    source_dir: Path,
+    result: BuildResult,
+    site_title: str,
+    preview: bool,
+    offline: bool,
+    metrics_endpoint: str | None,
+    reproducible: bool,
+    weight_report: bool,
+):
+    sink = result.sink
+    started = time.perf_counter()
+
+    # Pas de service worker en prévisualisation : il servirait des pages périmées
+    offline = offline and not preview
+
+    log.info("   Source : %s", source_dir)
+    log.info("   Output : %s", sink)
+
+    # Dates tirées des sources (SOURCE_DATE_EPOCH, git, mtime) plutôt que de l'heure du build
+    dates = SourceDates(source_dir) if reproducible or source_date_epoch() is not None else None
+    if dates:
+        log.info("📌 Build reproductible (%s)", 'SOURCE_DATE_EPOCH' if dates.epoch is not None else 'dates git/mtime des sources')
+
+    # Charger la configuration des collections
+    # Budgets invalides dans collections.toml : refusés avant toute écriture
+    collections_config, default_budgets = split_budgets(load_collections_config(source_dir))
+    weights = WeightReport(collections_config, default_budgets, BASE_DIR / 'fonts', weight_report)
+    log.info("📂 %d collections définies dans collections.toml", len(collections_config))
+
+    # Trouver les dossiers contenant des cours
+    with result.stage('discovery'):
+        folders = find_folders(source_dir)
+    memory.checkpoint('discovery')
+
+    if not folders:
+        log.warning("⚠️  Aucun dossier avec des .md trouvé")
+        return
+
+    log.info("📁 %d dossiers trouvés", len(folders))
+
+    # Synchroniser les fonts
+    log.info("📦 Synchronisation des assets...")
+    with result.stage('fonts'):
+        copy_assets(sink)
+    memory.checkpoint('fonts')
+    result.weights = weights
+
+    # Analyser les cours (métadonnées pour le catalogue)
+    log.info("🔍 Analyse des cours...")
+    parsed_courses = []
+    search_documents = {}
+    bank = QuestionBank(sink.cache_dir / QUESTION_CACHE if sink.cache_dir else None)
+
+    with result.stage('parse courses'):
+        for folder_name, md_files in folders.items():
+            log.info("  📁 %s/", folder_name)
+            for md_file in sorted(md_files):
+                course = f'{folder_name}/{md_file.stem}'
+                try:
+                    parse_start = time.perf_counter()
+                    with memory.track(course, 'parse'):
+                        parsed = parse_course(md_file, folder_name)
+                    parse_ms = (time.perf_counter() - parse_start) * 1000
+                    digest = bank.digest(md_file)
+                    if not bank.cached(course, digest):
+                        presentation, metadata = parsed if parsed is not None else (None, None)
+                        bank.add(course, digest, metadata, presentation)
+                    if parsed is not None:
+                        parsed_courses.append((md_file, *parsed))
+                        presentation, metadata = parsed
+                        # Budgets fixés à l'analyse : une faute de frappe n'interrompt pas le rendu
+                        for problem in weights.set_budgets(course, metadata['collections'], presentation.metadata):
+                            log.warning("      ⚠️  %s", problem, extra={'course': course, 'event': 'lint'})
+                        result.courses[course] = CourseResult(course, metadata, parse_ms=round(parse_ms, 2))
+                        with profiler.span('search terms', course=course):
+                            search_documents[metadata['url']] = course_documents(presentation)
+                except Exception as e:
+                    result.courses[course] = CourseResult(course, error=str(e))
+                    log.exception("    ❌ Erreur sur %s: %s", md_file.name, e, extra={'course': course})
+
+    memory.checkpoint('parse')
+
+    all_courses = [metadata for _, _, metadata in parsed_courses]
+
+    # Organiser les cours par collection (depuis les métadonnées)
+    collections_data = {}
+    for course in all_courses:
+        for coll_id in course.get('collections', []):
+            if coll_id not in collections_data:
+                collections_data[coll_id] = []
+            collections_data[coll_id].append(course)
+
+    # Afficher les collections non définies dans le TOML
+    for coll_id in collections_data:
+        if coll_id not in collections_config:
+            log.warning("  ⚠️  Collection '%s' utilisée mais non définie dans collections.toml", coll_id,
+                        extra={'collection': coll_id})
+
+    cache_file = sink.cache_dir / 'images.json' if sink.cache_dir else None
+    registry = ImageRegistry(source_dir, cache_file=cache_file)
+
+    # QR codes des collections (seulement celles définies dans le TOML et qui ont des cours)
+    qr_codes = {}
+    for coll_id in collections_config:
+        if not collections_data.get(coll_id):
+            log.warning("  ⚠️  Collection '%s' définie mais aucun cours associé", coll_id, extra={'collection': coll_id})
+            continue
+        qr_image = source_dir / 'images' / f'qr_collection_{coll_id}.png'
+        qr_codes[coll_id] = qr_image.exists()
+        if qr_codes[coll_id]:
+            registry.add_static(qr_image.name, qr_image)
+        else:
+            log.warning("  ⚠️  QR code manquant pour '%s' (attendu : images/qr_collection_%s.png)", coll_id, coll_id,
+                        extra={'collection': coll_id})
+
+    site_date = None
+    if dates:
+        sources = [md_file for md_file, _, _ in parsed_courses]
+        if (source_dir / 'collections.toml').exists():
+            sources.append(source_dir / 'collections.toml')
+        site_date = dates.latest(sources)
+    result.catalog = catalog = build_catalog(collections_config, collections_data, site_title, qr_codes, site_date)
+    memory.checkpoint('catalog')
+
+    # Pages du catalogue, générées une fois depuis le catalogue précalculé
+    page_gen = PageGenerator(base_path=BASE_DIR, preview=preview, offline=offline)
+    with result.stage('site pages'):
+        total_pages = write_site_pages(page_gen, catalog, sink)
+
+    course_images = {}
+    with result.stage('render courses'):
+        # Compiler les cours
+        # (dépilés au fur et à mesure pour libérer chaque présentation après rendu)
+        log.info("🏗️  Compilation des cours...")
+        parsed_courses.reverse()
+        while parsed_courses:
+            md_file, presentation, metadata = parsed_courses.pop()
+            course = f"{metadata['folder']}/{metadata['slug']}"
+            course_result = result.courses[course]
+            try:
+                render_start = time.perf_counter()
+                with memory.track(course, 'render'):
+                    course_result.images = course_images[metadata['url']] = render_course(
+                        md_file, presentation, metadata, sink, preview, registry, offline, metrics_endpoint,
+                        dates.date(md_file) if dates else None, weights
+                    )
+                course_result.render_ms = round((time.perf_counter() - render_start) * 1000, 2)
+                course_result.weight = weight = weights.decks.get(course)
+                # Durées et poids par cours : enregistrements JSON, lignes affichées seulement en mode verbeux
+                log.info(
+                    "    ⏱️  %s : %.1f ms", md_file.name, course_result.parse_ms + course_result.render_ms,
+                    extra={
+                        'measure': True, 'event': 'course', 'course': course, 'status': metadata['status'],
+                        'slides': metadata['total_slides'],
+                        'parse_ms': course_result.parse_ms, 'render_ms': course_result.render_ms,
+                    },
+                )
+                if weight is not None:
+                    log.info("    ⚖️  %s : %s (gzip %s), images %s", md_file.name, format_size(weight.html),
+                             format_size(weight.gzip), format_size(weight.images),
+                             extra={'measure': True, 'event': 'weight', **weight.to_dict()})
+            except Exception as e:
+                course_result.error = str(e)
+                log.exception("    ❌ Erreur sur %s: %s", md_file.name, e, extra={'course': course})
+    memory.checkpoint('render')
+
+    # Budgets de poids : le build va jusqu'au bout, l'appelant décide de l'échec
+    for course, metric, size, limit in weights.violations():
+        log.error("  ❌ Budget dépassé : %s, %s %s > %s", course, metric, format_size(size), format_size(limit),
+                  extra={'event': 'budget', 'course': course, 'metric': metric, 'bytes': size, 'budget_bytes': limit})
+
+    log.info("📋 %d pages de catalogue générées (+ catalog.json)", total_pages)
+    for collection in catalog['collections']:
+        log.info("  📄 %s.html (%d cours)", collection['id'], len(collection['courses']))
+
+    # Index de recherche plein texte, un fichier par collection
+    with result.stage('search index'):
+        result.indexed_slides = write_search_index(sink, catalog, search_documents, preview)
+    memory.checkpoint('search index')
+    log.info("🔎 Index de recherche : %d slides indexées", result.indexed_slides)
+
+    # Banque de questions, un fichier par collection (questions des cours inchangés reprises du cache)
+    with result.stage('question bank'):
+        result.questions = write_question_bank(sink, bank, collections_config, preview)['total']
+    log.info("❓ Banque de questions : %d questions (%s)", result.questions, bank)
+
+    # Publier les images référencées
+    with result.stage('image copy'):
+        result.images = publish_images(sink, registry)
+    memory.checkpoint('image copy')
+    log.info("🖼️  %d image(s) publiée(s)", result.images)
+
+    # Manifeste de précache et service worker (consultation hors-ligne)
+    if offline:
+        with result.stage('precache'):
+            write_precache(sink, catalog, course_images)
+    else:
+        for name in (MANIFEST_FILE, SERVICE_WORKER_FILE):
+            sink.remove(name)
+    memory.checkpoint('precache')
+
+    # Retirer les pages d'un build précédent qui ne sont plus produites (cours supprimés),
+    # une fois toutes les sorties enregistrées (service worker et manifeste compris)
+    with result.stage('prune'):
+        sink.prune()
+
+    log.info("📝 Fichiers générés (%s)", sink.close())
+    log.info(
+        "\n✅ Build terminé !\n   %d cours compilés\n   %d collections générées\n   → %s",
+        len(all_courses), len(catalog['collections']), sink,
+        extra={
+            'event': 'build', 'courses': len(all_courses), 'collections': len(catalog['collections']),
+            'images': result.images, 'indexed_slides': result.indexed_slides, 'questions': result.questions,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
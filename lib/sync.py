@@ -0,0 +1,200 @@
+"""
+Synchronisation incrémentale des fichiers statiques (fonts, images) et des fichiers générés
+"""
+
+import os
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict
+from dataclasses import dataclass
+
+
+@dataclass
+class SyncStats:
+    """Compteurs d'une synchronisation"""
+    copied: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.copied + self.unchanged
+
+    def __str__(self):
+        return f"{self.copied} copié(s), {self.unchanged} inchangé(s), {self.removed} supprimé(s)"
+
+
+def is_up_to_date(src: Path, dst: Path) -> bool:
+    """
+    Vrai si dst est une copie à jour de src (même taille et mtime). Une sortie qui partage
+    l'inode de sa source (hardlink d'un ancien build) est à remplacer par une copie.
+    """
+    try:
+        s = src.stat()
+        d = dst.stat()
+    except FileNotFoundError:
+        return False
+    if (s.st_dev, s.st_ino) == (d.st_dev, d.st_ino):
+        return False
+    return s.st_size == d.st_size and int(s.st_mtime) == int(d.st_mtime)
+
+
+def _copy_file(src: Path, dst: Path):
+    """
+    Copie src vers dst via copy_file_range (copie dans le noyau, reflink sur btrfs/xfs),
+    sinon copie classique
+    """
+    copy_range = getattr(os, 'copy_file_range', None)
+    if copy_range is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    sent = copy_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def _temp_path(path: Path) -> Path:
+    """Fichier temporaire à côté de path (même système de fichiers : renommage atomique)"""
+    return path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+def place_file(src: Path, dst: Path):
+    """
+    Place une copie de src en dst, remplacée d'un coup (os.replace) : jamais absente ni à moitié
+    copiée pour un lecteur. Jamais de hardlink : une source modifiée sur place (éditeur d'images)
+    modifierait aussi la sortie publiée, dont le nom haché promet un contenu immuable.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(dst)
+    tmp.unlink(missing_ok=True)
+    try:
+        _copy_file(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def sync_files(files: Dict[str, Path], dst_dir: Path, prune: bool = True) -> SyncStats:
+    """
+    Synchronise {chemin_relatif: source} vers dst_dir.
+    Ne copie que ce qui a changé et supprime les sorties qui n'existent plus.
+    """
+    stats = SyncStats()
+    dst_dir.mkdir(parents=True, exist_ok=True)
+
+    for rel_path, src in sorted(files.items()):
+        dst = dst_dir / rel_path
+        if is_up_to_date(src, dst):
+            stats.unchanged += 1
+            continue
+        place_file(src, dst)
+        stats.copied += 1
+
+    if prune:
+        wanted = {Path(p) for p in files}
+        for item in sorted(dst_dir.rglob('*'), reverse=True):
+            rel = item.relative_to(dst_dir)
+            if item.is_dir() and not item.is_symlink():
+                if not any(item.iterdir()):
+                    item.rmdir()
+            elif rel not in wanted:
+                item.unlink()
+                stats.removed += 1
+
+    return stats
+
+
+def sync_tree(src_dir: Path, dst_dir: Path, prune: bool = True) -> SyncStats:
+    """Synchronise l'arborescence src_dir vers dst_dir"""
+    files = {
+        p.relative_to(src_dir).as_posix(): p
+        for p in sorted(src_dir.rglob('*'))
+        if p.is_file()
+    }
+    return sync_files(files, dst_dir, prune)
+
+
+def write_if_changed(path: Path, content: str | bytes) -> bool:
+    """Écrit content dans path sauf si le contenu est identique (mtime conservé) ; vrai si écrit"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    # Fichier temporaire puis renommage : un serveur qui lit pendant le build voit l'ancien
+    # contenu ou le nouveau, jamais un fichier à moitié écrit
+    tmp = _temp_path(path)
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return True
+
+
+class GeneratedFiles:
+    """
+    Fichiers générés par un build : seuls ceux dont le contenu change sont réécrits,
+    ceux du build précédent qui ne sont plus produits sont supprimés (build sans --clean)
+    """
+
+    def __init__(self, output_dir: Path, record_file: Path):
+        self.output_dir = output_dir
+        self.record_file = record_file
+        try:
+            self.previous = set(json.loads(record_file.read_text(encoding='utf-8')))
+        except (OSError, ValueError, TypeError):
+            self.previous = set()
+        self.current = set()
+        self.stats = SyncStats()
+        self._lock = threading.Lock()
+
+    def add(self, path: Path, changed: bool = True):
+        """Enregistre un fichier produit (écrit ici ou par un autre outil)"""
+        with self._lock:
+            self.current.add(path.relative_to(self.output_dir).as_posix())
+            if changed:
+                self.stats.copied += 1
+            else:
+                self.stats.unchanged += 1
+
+    def write(self, path: Path, content: str | bytes) -> bool:
+        changed = write_if_changed(path, content)
+        self.add(path, changed)
+        return changed
+
+    def prune(self) -> int:
+        """Supprime les fichiers générés au build précédent et absents de celui-ci, enregistre la liste"""
+        for rel in sorted(self.previous - self.current):
+            path = self.output_dir / rel
+            if path.is_file():
+                path.unlink()
+                self.stats.removed += 1
+            # Dossiers vidés (cours supprimé)
+            for parent in path.parents:
+                if parent == self.output_dir or not parent.is_dir() or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+        self.save()
+        return self.stats.removed
+
+    def save(self):
+        """Enregistre la liste des fichiers produits (comparée au build suivant)"""
+        self.record_file.parent.mkdir(parents=True, exist_ok=True)
+        self.record_file.write_text(json.dumps(sorted(self.current)), encoding='utf-8')
+
+    def __str__(self):
+        return (f"{self.stats.copied} écrit(s), {self.stats.unchanged} inchangé(s), "
+                f"{self.stats.removed} supprimé(s)")
@@ -0,0 +1,212 @@
+"""
+Poids des présentations générées : répartition du HTML (CSS, JS, polices, balisage),
+taille compressée, images et polices référencées, et budgets
+"""
+
+import re
+import gzip
+from pathlib import Path
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .profiling import parse_size, format_size
+
+
+# Mesures pouvant recevoir un budget
+METRICS = ('html', 'css', 'js', 'fonts', 'markup', 'gzip', 'images', 'total')
+
+# Budgets : table [budgets] de collections.toml (tous les cours), budget_<mesure> dans une
+# collection (ses cours) ou dans les métadonnées d'un cours (prioritaire)
+BUDGETS_TABLE = 'budgets'
+BUDGET_PREFIX = 'budget_'
+
+# Niveau de compression courant des serveurs web (Apache mod_deflate, gzip -6)
+GZIP_LEVEL = 6
+
+_STYLE_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+_SCRIPT_RE = re.compile(r'<script[^>]*>(.*?)</script>', re.S | re.I)
+_FONT_FACE_RE = re.compile(r'@font-face\s*\{[^}]*\}', re.S)
+_FONT_URL_RE = re.compile(r'''url\(\s*['"]?/?fonts/([^'")]+)['"]?\s*\)''')
+
+
+def _size(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+def parse_budgets(values: Dict, prefix: str = '', problems: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Budgets en octets d'une table de configuration ({prefix}<mesure> = '400k' ou nombre d'octets).
+    Budget inconnu ou taille invalide : ValueError, ou budget ignoré et signalé dans problems.
+    """
+    budgets = {}
+    for key, value in values.items():
+        if not key.startswith(prefix):
+            continue
+        metric = key[len(prefix):]
+        if metric not in METRICS:
+            message = f"Budget inconnu : {key} (mesures : {', '.join(METRICS)})"
+        else:
+            try:
+                budgets[metric] = value if isinstance(value, int) else parse_size(str(value))
+                continue
+            except ValueError as e:
+                message = f"Budget {key} invalide : {e}"
+        if problems is None:
+            raise ValueError(message)
+        problems.append(f"{message}, ignoré")
+    return budgets
+
+
+def split_budgets(collections_config: Dict) -> Tuple[Dict, Dict[str, int]]:
+    """
+    Sépare de collections.toml la table [budgets] (tous les cours) et les collections.
+    Nom réservé : une table [budgets] qui n'est pas faite de mesures (collection nommée 'budgets')
+    est refusée plutôt que d'être prise pour des budgets.
+    """
+    collections = {coll_id: config for coll_id, config in collections_config.items() if coll_id != BUDGETS_TABLE}
+    table = collections_config.get(BUDGETS_TABLE, {})
+    unknown = sorted(key for key in table if key not in METRICS) if isinstance(table, dict) else [str(table)]
+    if unknown:
+        raise ValueError(
+            f"[{BUDGETS_TABLE}] est réservé aux budgets de poids ({', '.join(METRICS)}), clé(s) inconnue(s) : "
+            f"{', '.join(unknown)} ; une collection ne peut pas s'appeler '{BUDGETS_TABLE}'"
+        )
+    return collections, parse_budgets(table)
+
+
+@dataclass
+class DeckWeight:
+    """Poids d'une présentation (octets) ; html = css + js + fonts + markup"""
+    course: str
+    html: int
+    css: int
+    js: int
+    fonts: int          # Déclarations @font-face inlinées
+    markup: int         # Slides et reste du document
+    gzip: int
+    images: int         # Images référencées (publiées)
+    font_files: int     # Fichiers de polices chargés par les @font-face
+    budgets: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        """Poids transféré au premier chargement : HTML compressé, polices et images"""
+        return self.gzip + self.font_files + self.images
+
+    def value(self, metric: str) -> int:
+        return getattr(self, metric)
+
+    def over_budget(self) -> List[Tuple[str, int, int]]:
+        """Dépassements (mesure, poids, budget)"""
+        return [
+            (metric, self.value(metric), limit)
+            for metric, limit in self.budgets.items()
+            if self.value(metric) > limit
+        ]
+
+    def to_dict(self) -> Dict:
+        entry = asdict(self)
+        entry['total'] = self.total
+        if not self.budgets:
+            del entry['budgets']
+        return entry
+
+
+def measure_html(html: str) -> Dict[str, int]:
+    """Répartition du HTML d'une présentation : CSS, JS, polices inlinées et balisage"""
+    styles = ''.join(_STYLE_RE.findall(html))
+    fonts = sum(_size(rule) for rule in _FONT_FACE_RE.findall(styles))
+    css = _size(styles) - fonts
+    js = sum(_size(script) for script in _SCRIPT_RE.findall(html))
+    data = html.encode('utf-8')
+    return {
+        'html': len(data),
+        'css': css,
+        'js': js,
+        'fonts': fonts,
+        'markup': len(data) - css - js - fonts,
+        'gzip': len(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)),
+    }
+
+
+class WeightReport:
+    """
+    Poids des présentations du build et budgets applicables, fixés à l'analyse de chaque cours.
+    Sans rapport demandé (report), seules les présentations soumises à un budget sont mesurées
+    (une compression gzip chacune).
+    """
+
+    def __init__(self, collections_config: Dict, default_budgets: Dict[str, int], fonts_dir: Path,
+                 report: bool = False):
+        self.report = report
+        self.default_budgets = default_budgets
+        self.collection_budgets = {
+            coll_id: parse_budgets(config, BUDGET_PREFIX)
+            for coll_id, config in collections_config.items()
+        }
+        self.fonts_dir = fonts_dir
+        self.budgets: Dict[str, Dict[str, int]] = {}
+        self.decks: Dict[str, DeckWeight] = {}
+        self._font_sizes: Dict[str, int] = {}
+
+    def set_budgets(self, course: str, collections: List[str], metadata: Dict) -> List[str]:
+        """
+        Budgets d'un cours analysé : défaut, puis le plus strict de ses collections, puis ses
+        métadonnées. Retourne les budgets des métadonnées ignorés (inconnus ou invalides).
+        """
+        budgets = dict(self.default_budgets)
+        collection_budgets: Dict[str, int] = {}
+        for coll_id in collections:
+            for metric, limit in self.collection_budgets.get(coll_id, {}).items():
+                collection_budgets[metric] = min(limit, collection_budgets.get(metric, limit))
+        budgets.update(collection_budgets)
+        problems: List[str] = []
+        budgets.update(parse_budgets(metadata, BUDGET_PREFIX, problems))
+        self.budgets[course] = budgets
+        return problems
+
+    def wants(self, course: str) -> bool:
+        """Vrai si la présentation doit être mesurée (rapport demandé ou budget)"""
+        return self.report or bool(self.budgets.get(course))
+
+    def _font_file_size(self, name: str) -> int:
+        if name not in self._font_sizes:
+            path = self.fonts_dir / name
+            self._font_sizes[name] = path.stat().st_size if path.exists() else 0
+        return self._font_sizes[name]
+
+    def measure(self, course: str, html: str, images: Iterable[Path]) -> DeckWeight:
+        """Mesure une présentation générée (images : fichiers sources des images publiées)"""
+        fonts = set(_FONT_URL_RE.findall(html))
+        weight = DeckWeight(
+            course=course,
+            **measure_html(html),
+            images=sum(path.stat().st_size for path in set(images) if path.exists()),
+            font_files=sum(self._font_file_size(name) for name in fonts),
+            budgets=self.budgets.get(course, {}),
+        )
+        self.decks[course] = weight
+        return weight
+
+    def violations(self) -> List[Tuple[str, str, int, int]]:
+        """Dépassements de budget de tout le build (cours, mesure, poids, budget)"""
+        return [
+            (course, metric, size, limit)
+            for course, weight in sorted(self.decks.items())
+            for metric, size, limit in weight.over_budget()
+        ]
+
+    def to_json(self) -> Dict:
+        return {course: weight.to_dict() for course, weight in sorted(self.decks.items())}
+
+    def summary(self, top: int = 0) -> str:
+        """Tableau des présentations, des plus lourdes aux plus légères"""
+        columns = ('HTML', 'CSS', 'JS', 'Polices', 'Balisage', 'gzip', 'Images', 'Total')
+        lines = ['  ' + ' '.join(f'{name:>9}' for name in columns) + '  Cours']
+        ranked = sorted(self.decks.values(), key=lambda w: -w.total)
+        for weight in ranked[:top or None]:
+            sizes = (weight.html, weight.css, weight.js, weight.fonts, weight.markup,
+                     weight.gzip, weight.images, weight.total)
+            flag = '  ⚠️' if weight.over_budget() else ''
+            lines.append('  ' + ' '.join(f'{format_size(size):>9}' for size in sizes) + f'  {weight.course}{flag}')
+        return '\n'.join(lines)
@@ -7,18 +7,159 @@ Usage:
     python preview.py --port 8080
 """
 
+import os
 import sys
+import gzip
+import json
+import socket
 import argparse
+import functools
 import webbrowser
 import http.server
-import socketserver
 import subprocess
 import threading
 import time
+import urllib.parse
 from pathlib import Path
+from email.utils import formatdate
+
+from lib.ondemand import LRUCache, not_modified
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 
+# Réception des mesures de performance envoyées par les présentations (sendBeacon)
+METRICS_PATH = '/__metrics'
+
+# Compression à la volée des réponses textuelles (présentations, index de recherche)
+GZIP_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+GZIP_MIN_SIZE = 1024
+GZIP_CACHE_SIZE = 64
+
+
+def summarize_metrics(spans: list) -> str:
+    """Résumé des spans par nom : nombre, médiane et maximum (ms)"""
+    durations = {}
+    for span in spans:
+        durations.setdefault(span.get('name', '?'), []).append(float(span.get('duration', 0)))
+    parts = []
+    for name, values in sorted(durations.items()):
+        values.sort()
+        median = values[len(values) // 2]
+        parts.append(f"{name} ×{len(values)} (p50 {median:.1f} ms, max {values[-1]:.1f} ms)")
+    return ' · '.join(parts) or 'aucun span'
+
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Sert le dossier de prévisualisation (ETag/304, gzip, sendfile) et journalise les mesures
+    des présentations
+    """
+    
+    metrics_log = None  # Fichier JSONL optionnel (un envoi par ligne)
+    gzip_cache = LRUCache(GZIP_CACHE_SIZE)
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def _serve(self, send_body: bool):
+        url_path = urllib.parse.urlsplit(self.path).path
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not url_path.endswith('/'):
+                self.send_response(301)
+                self.send_header('Location', url_path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            path = os.path.join(path, 'index.html')
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404, "Fichier introuvable")
+            return
+        
+        with f:
+            st = os.fstat(f.fileno())
+            etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+            gzip_etag = etag[:-1] + '-gz"'
+            content_type = self.guess_type(path)
+            compressible = content_type.startswith(GZIP_TYPES) and st.st_size >= GZIP_MIN_SIZE
+            use_gzip = compressible and 'gzip' in self.headers.get('Accept-Encoding', '')
+            
+            if not_modified(self.headers, (etag, gzip_etag), st.st_mtime):
+                self.send_response(304)
+                self._validators(gzip_etag if use_gzip else etag, st.st_mtime, compressible)
+                self.end_headers()
+                return
+            
+            body = None
+            if use_gzip:
+                body = self.gzip_cache.get(
+                    (path, st.st_size, st.st_mtime_ns), lambda: gzip.compress(f.read(), compresslevel=6, mtime=0)
+                )
+            
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self._validators(gzip_etag if use_gzip else etag, st.st_mtime, compressible)
+            if body is not None:
+                self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            else:
+                self.send_header('Content-Length', str(st.st_size))
+                self.end_headers()
+                if send_body:
+                    # Images et fonts : copie noyau (sendfile) sans passer par Python
+                    self.connection.sendfile(f)
+    
+    def _validators(self, etag: str, mtime: float, compressible: bool):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(mtime, usegmt=True))
+        self.send_header('Cache-Control', 'no-cache')  # Revalider à chaque fois : 304 si inchangé
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+    
+    def do_POST(self):
+        if self.path != METRICS_PATH:
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_error(400)
+            return
+        print(f"📈 {payload.get('page', '?')} : {summarize_metrics(payload.get('spans', []))}")
+        if self.metrics_log:
+            with open(self.metrics_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+        self.send_response(204)
+        self.end_headers()
+
+class PreviewServer(http.server.ThreadingHTTPServer):
+    """Une requête par thread : une grosse image ne bloque pas les autres"""
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 64
+
+
+def local_ip() -> str | None:
+    """Adresse de la machine sur le réseau local (test sur téléphone), sans envoyer de paquet"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(('10.255.255.255', 1))
+            ip = s.getsockname()[0]
+    except OSError:
+        return None
+    return None if ip.startswith('127.') else ip
+
+
 class WatcherThread(threading.Thread):
     """Thread qui surveille les fichiers et rebuild si nécessaire"""
     
@@ -52,6 +193,8 @@ class WatcherThread(threading.Thread):
             if current_mtime > self.last_mtime:
                 print("\n🔄 Changement détecté, rebuild en cours...")
                 result = subprocess.run(self.build_cmd, capture_output=True, text=True)
+                if result.stdout.strip():
+                    print(result.stdout.rstrip())  # Avertissements et erreurs (build --quiet)
                 
                 if result.returncode == 0:
                     print("✅ Rebuild terminé — Rafraîchissez le navigateur (F5)")
@@ -70,6 +213,7 @@ def main():
     parser.add_argument('-s', '--source', type=Path, default=Path('./cours'), help='Dossier source')
     parser.add_argument('-n', '--no-browser', action='store_true',help="N'ouvre pas de nouvel onglet dans le navigateur")
     parser.add_argument('--no-watch', action='store_true', help="Désactiver le hot reload")
+    parser.add_argument('--metrics-log', type=Path, help="Enregistrer les mesures de performance reçues (JSONL)")
     args = parser.parse_args()
     
     # Build dans un dossier temporaire
@@ -81,7 +225,8 @@ def main():
         '-s', str(source_dir),
         '-o', str(preview_dir),
         '--clean',
-        '--preview'
+        '--preview',
+        '--metrics-endpoint', METRICS_PATH,
     ]
 
     result = subprocess.run(build_cmd)
@@ -94,7 +239,9 @@ def main():
         sys.executable, str(SCRIPT_DIR / 'build.py'),
         '-s', str(source_dir),
         '-o', str(preview_dir),
-        '--preview'
+        '--preview',
+        '--metrics-endpoint', METRICS_PATH,
+        '--quiet',
     ]
 
     watcher = None
@@ -102,14 +249,16 @@ def main():
         watcher = WatcherThread(source_dir, rebuild_cmd)
         watcher.start()
         print("** Hot reload activé **")
-    import os
-    os.chdir(preview_dir)
+    if args.metrics_log:
+        PreviewHandler.metrics_log = args.metrics_log.resolve()
     
-    handler = http.server.SimpleHTTPRequestHandler
-    socketserver.TCPServer.allow_reuse_address = True 
-    with socketserver.TCPServer(("", args.port), handler) as httpd:
+    handler = functools.partial(PreviewHandler, directory=str(preview_dir))
+    with PreviewServer(("", args.port), handler) as httpd:
         url = f"http://localhost:{args.port}"
         print(f"\n🌐 Serveur démarré : {url}")
+        lan_ip = local_ip()
+        if lan_ip:
+            print(f"📱 Réseau local : http://{lan_ip}:{args.port}")
         print("   Ctrl+C pour arrêter\n")
         if not args.no_browser:
             webbrowser.open(url)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Serveur des cours rendus à la demande depuis les sources Markdown (sans build statique)
+
+Usage:
+    python serve.py -s cours/                        # http://localhost:8000
+    python serve.py --port 8080 --cache-size 256     # Cache LRU de 256 pages rendues
+    python serve.py --bench 2000 --concurrency 16    # Test de charge local, puis arrêt
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import http.server
+from pathlib import Path
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from lib.log import get_logger, add_logging_arguments, setup_logging
+from lib.ondemand import SiteRenderer, Resource, not_modified
+
+
+log = get_logger('serve')
+
+STATS_PATH = '/__stats'
+
+
+class ServeHandler(http.server.BaseHTTPRequestHandler):
+    """Rend les pages à la demande ; ETag et Last-Modified permettent les réponses 304"""
+
+    site: SiteRenderer = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool):
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        if path == STATS_PATH:
+            self._send(200, 'application/json', json.dumps(self.site.stats()).encode('utf-8'), send_body)
+            return
+        theme = urllib.parse.parse_qs(url.query).get('theme', [''])[0]
+        try:
+            resource = self.site.resolve(path, theme)
+            if resource is None:
+                self._send(404, 'text/plain; charset=utf-8', 'Page introuvable'.encode('utf-8'), send_body)
+                return
+            if not_modified(self.headers, (resource.etag,), resource.last_modified):
+                self.send_response(304)
+                self._validators(resource)
+                self.end_headers()
+                return
+            body = resource.load()
+        except Exception as e:
+            log.exception("❌ Erreur sur %s : %s", path, e, extra={'path': path})
+            self._send(500, 'text/plain; charset=utf-8', f'Erreur de rendu : {e}'.encode('utf-8'), send_body)
+            return
+        self._send(200, resource.content_type, body, send_body, resource)
+
+    def _validators(self, resource: Resource):
+        self.send_header('ETag', resource.etag)
+        self.send_header('Last-Modified', formatdate(resource.last_modified, usegmt=True))
+        self.send_header('Cache-Control', resource.cache_control)
+
+    def _send(self, status: int, content_type: str, body: bytes, send_body: bool, resource: Resource | None = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if resource is not None:
+            self._validators(resource)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("  %s - %s", self.address_string(), format % args)
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128  # Connexions en attente (5 par défaut : SYN réémis après 1 s sous charge)
+
+
+def make_server(site: SiteRenderer, host: str = '', port: int = 8000) -> http.server.ThreadingHTTPServer:
+    handler = type('Handler', (ServeHandler,), {'site': site})
+    return _Server((host, port), handler)
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * ratio))] if values else 0.0
+
+
+def run_bench(base_url: str, total: int, concurrency: int, revalidate: bool = False) -> dict:
+    """Test de charge : accueil, pages de collections et tous les cours (présentations et détails)"""
+    with urllib.request.urlopen(f'{base_url}/catalog.json') as response:
+        catalog = json.load(response)
+    paths = ['/'] + [f"/{c['url']}" for c in catalog['collections']]
+    for course in catalog['courses']:
+        paths += [f"/{course['url']}", f"/{course['details_url']}"]
+
+    etags = {}
+    latencies: List[float] = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def fetch(i: int):
+        path = paths[i % len(paths)]
+        request = urllib.request.Request(base_url + path)
+        if revalidate and path in etags:
+            request.add_header('If-None-Match', etags[path])
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            status, etag = e.code, None
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            if etag:
+                etags[path] = etag
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(total)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'pages': len(paths),
+        'concurrency': concurrency,
+        'rps': round(total / duration, 1),
+        'p50_ms': round(_percentile(latencies, 0.50), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'p99_ms': round(_percentile(latencies, 0.99), 2),
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sert les cours rendus à la demande depuis les sources Markdown')
+    parser.add_argument('-s', '--source', type=Path, default=Path('./cours'),
+                        help='Dossier contenant les cours (défaut: ./cours)')
+    parser.add_argument('--host', default='', help='Adresse d\'écoute (défaut : toutes)')
+    parser.add_argument('--port', type=int, default=8000, help='Port du serveur (défaut: 8000)')
+    parser.add_argument('--title', type=str, default='Formations Médicales', help='Titre du site')
+    parser.add_argument('--preview', action='store_true', help='Servir les drafts comme des cours normaux')
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help='Nombre de pages rendues conservées en mémoire (défaut: 128)')
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help='Test de charge local : N requêtes sur toutes les pages, puis arrêt')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requêtes simultanées du test de charge (défaut: 8)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Test de charge avec If-None-Match (réponses 304 après le premier passage)')
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging(args.log_format, args.quiet, args.verbose)
+    if not args.verbose:
+        # Une ligne par cours analysé : seulement avertissements et erreurs
+        get_logger('build').setLevel(logging.WARNING)
+
+    if not args.source.is_dir():
+        log.error("❌ Dossier source introuvable : %s", args.source)
+        return 1
+
+    site = SiteRenderer(args.source.resolve(), args.title, args.preview, args.cache_size)
+    server = make_server(site, args.host, 0 if args.bench else args.port)
+    port = server.server_address[1]
+
+    if args.bench:
+        if not args.verbose:
+            log.setLevel(logging.WARNING)  # Un rendu par page : seul le bilan est affiché
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = run_bench(f'http://127.0.0.1:{port}', args.bench, args.concurrency, args.revalidate)
+        finally:
+            server.shutdown()
+        result.update(site.stats())
+        log.setLevel(logging.NOTSET)
+        log.info("📊 %d requêtes (%d pages, %d simultanées) : %.1f req/s, p50 %.1f ms, p95 %.1f ms, p99 %.1f ms",
+                 result['requests'], result['pages'], result['concurrency'], result['rps'],
+                 result['p50_ms'], result['p95_ms'], result['p99_ms'], extra={'event': 'bench', **result})
+        log.info("   Cache : %d succès, %d rendus, %d page(s) en mémoire ; réponses %s",
+                 result['cache']['hits'], result['cache']['misses'], result['cache']['entries'],
+                 ', '.join(f'{status} ×{count}' for status, count in result['statuses'].items()))
+        return 0
+
+    log.info("🌐 Serveur démarré : http://localhost:%d (rendu à la demande depuis %s)", port, args.source)
+    log.info("   Ctrl+C pour arrêter")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("\n👋 Arrêt du serveur")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
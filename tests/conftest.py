@@ -0,0 +1,8 @@
+"""
+Les scripts (deploy.py, build.py...) et le paquet lib/ sont à la racine du dépôt
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,48 @@
+"""
+Sorties de build factices et configuration de déploiement vers un dossier local
+"""
+
+from lib.manifest import EXCLUDED
+
+import deploy
+
+
+# Sortie de build : quelques fichiers de tailles variées, dont des dossiers imbriqués
+BUILD_FILES = {
+    'index.html': 4_000,
+    'sw.js': 800,
+    'css/style.css': 12_000,
+    'folder1/noyade/index.html': 30_000,
+    'folder1/noyade/images/schema.png': 250_000,
+    'folder1/long/index.html': 90_000,
+    'folder2/choc/index.html': 20_000,
+    'folder2/choc/images/ecg.png': 120_000,
+}
+
+
+def write_build(output, files):
+    """Écrit {chemin relatif: taille} dans output (contenu dérivé du chemin)"""
+    for rel, size in files.items():
+        path = output / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rel.encode() * (size // len(rel) + 1))
+
+
+def tree(root):
+    """{chemin relatif: contenu} des fichiers déployables d'un dossier (hors cache et manifeste)"""
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in sorted(root.rglob('*'))
+        if path.is_file() and path.relative_to(root).parts[0] not in EXCLUDED
+    }
+
+
+def local_config(tmp_path):
+    """(config, dossier de sortie du build, dossier cible) pour deploy_local"""
+    output = tmp_path / 'dist'
+    target = tmp_path / 'www'
+    write_build(output, BUILD_FILES)
+    config = deploy.load_config(tmp_path / 'absent.toml')
+    config['build']['output'] = str(output)
+    config['server']['remote_path'] = str(target)
+    return config, output, target
@@ -0,0 +1,247 @@
+"""
+Modes de transfert du déploiement, vérifiés contre un dossier local (DirectoryTarget) :
+lots parallèles équilibrés par taille (--streams) et archive tar en flux (--tar) ;
+commandes ssh, scp et sftp sur une connexion SSH partagée (ControlMaster)
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import deploy
+from lib.manifest import FILE_OVERHEAD, MANIFEST_FILE, balance_by_size
+
+from helpers import BUILD_FILES, local_config, tree, write_build
+
+
+@pytest.fixture
+def site(tmp_path):
+    return local_config(tmp_path)
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Lots reçus par DirectoryTarget.upload (copie fichier par fichier)"""
+    batches = []
+    upload = deploy.DirectoryTarget.upload
+
+    def recording(self, source, files, dry_run):
+        batches.append(list(files))
+        return upload(self, source, files, dry_run)
+
+    monkeypatch.setattr(deploy.DirectoryTarget, 'upload', recording)
+    return batches
+
+
+def test_balance_by_size_keeps_every_file_once():
+    sizes = {f'f{i}': (i * 7919) % 50_000 for i in range(40)}
+    batches = balance_by_size(list(sizes), sizes, 4)
+    assert len(batches) == 4
+    assert sorted(path for batch in batches for path in batch) == sorted(sizes)
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_balance_by_size_evens_out_loads():
+    sizes = {'big': 1_000_000, 'medium': 600_000, 'small1': 300_000, 'small2': 300_000}
+    batches = balance_by_size(list(sizes), sizes, 2)
+    assert sorted(batches) == [['big'], ['medium', 'small1', 'small2']]
+
+    loads = [sum(sizes[path] + FILE_OVERHEAD for path in batch) for batch in batches]
+    assert max(loads) - min(loads) <= max(sizes.values())
+
+
+def test_balance_by_size_never_returns_empty_batches():
+    sizes = {'a': 10, 'b': 20}
+    assert sorted(balance_by_size(list(sizes), sizes, 8)) == [['a'], ['b']]
+    assert balance_by_size(list(sizes), sizes, 0) == [['a', 'b']]
+
+
+def test_streams_upload_copies_everything(site, uploads):
+    config, output, target = site
+    config['transfer']['streams'] = 3
+
+    assert deploy.deploy_local(config)
+
+    assert len(uploads) == 3
+    assert sorted(path for batch in uploads for path in batch) == sorted(BUILD_FILES)
+    assert tree(target) == tree(output)
+    assert (target / MANIFEST_FILE).exists()
+
+
+def test_streams_option_on_command_line(tmp_path, monkeypatch, uploads):
+    output = tmp_path / 'dist'
+    target = tmp_path / 'www'
+    write_build(output, BUILD_FILES)
+    (tmp_path / 'deploy.toml').write_text(f'[build]\noutput = "{output}"\n', encoding='utf-8')
+    monkeypatch.setattr(deploy, 'WORK_DIR', tmp_path)
+    monkeypatch.setattr('sys.argv', [
+        'deploy.py', '--method', 'local', '--skip-build', '--remote-path', str(target), '--streams', '2',
+    ])
+
+    assert deploy.main() == 0
+
+    assert len(uploads) == 2
+    assert tree(target) == tree(output)
+
+
+def test_tar_stream_extracts_into_target(site, uploads):
+    config, output, target = site
+    config['transfer']['tar'] = True
+
+    assert deploy.deploy_local(config)
+
+    assert uploads == []
+    assert tree(target) == tree(output)
+    assert (target / MANIFEST_FILE).exists()
+
+
+def test_tar_stream_overwrites_changed_files(site):
+    config, output, target = site
+    config['transfer']['tar'] = True
+    assert deploy.deploy_local(config)
+
+    (output / 'css/style.css').write_text('body {}', encoding='utf-8')
+    assert deploy.deploy_local(config)
+
+    assert (target / 'css/style.css').read_text(encoding='utf-8') == 'body {}'
+    assert tree(target) == tree(output)
+
+
+@pytest.mark.parametrize('transfer', [{'streams': 3}, {'tar': True}])
+def test_removes_files_and_emptied_dirs_in_parallel_and_tar_modes(site, transfer):
+    config, output, target = site
+    config['transfer'].update(transfer)
+    assert deploy.deploy_local(config)
+
+    (output / 'sw.js').unlink()
+    for rel in ('folder2/choc/images/ecg.png', 'folder2/choc/index.html'):
+        (output / rel).unlink()
+    (output / 'folder2/choc/images').rmdir()
+    (output / 'folder2/choc').rmdir()
+    (output / 'folder2').rmdir()
+    assert deploy.deploy_local(config)
+
+    assert tree(target) == tree(output)
+    assert not (target / 'sw.js').exists()
+    assert not (target / 'folder2').exists()
+    assert (target / 'folder1/noyade/images').is_dir()
+
+
+# Serveur SSH : commandes construites, subprocess.run remplacé (aucune connexion)
+
+SERVER = {'host': 'srv.example', 'user': 'prof', 'port': 2222, 'remote_path': '/srv/www/cours'}
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Commandes passées à subprocess.run (avec le contenu des batchs sftp, supprimés ensuite)"""
+    calls = []
+
+    def run(cmd, **kwargs):
+        batch = cmd[cmd.index('-b') + 1] if cmd[0] == 'sftp' else None
+        lines = Path(batch).read_text(encoding='utf-8').splitlines() if batch else []
+        calls.append((list(cmd), lines))
+        # `cat` du manifeste distant : absent
+        return subprocess.CompletedProcess(cmd, 1 if cmd[-1].startswith('cat ') else 0, '', '')
+
+    monkeypatch.setattr(deploy.subprocess, 'run', run)
+    return calls
+
+
+def option(cmd, name):
+    """Valeur d'une option -o name=valeur d'une commande ssh/scp/sftp"""
+    values = [arg.split('=', 1)[1] for arg in cmd if arg.startswith(f'{name}=')]
+    return values[0] if values else None
+
+
+def test_ssh_connection_shares_one_control_master(commands):
+    with deploy.SshConnection(SERVER) as conn:
+        control_dir = Path(conn._control_dir)
+        assert control_dir.is_dir()
+        ssh, scp, sftp = conn.ssh('ls'), conn.scp([Path('a.html')], '/srv/'), conn.sftp('batch.sftp')
+
+    assert ssh[:3] == ['ssh', '-p', '2222'] and ssh[-2:] == ['prof@srv.example', 'ls']
+    assert scp[:3] == ['scp', '-P', '2222'] and scp[-2:] == ['a.html', 'prof@srv.example:/srv/']
+    assert sftp[:3] == ['sftp', '-P', '2222'] and sftp[-3:] == ['-b', 'batch.sftp', 'prof@srv.example']
+    for cmd in (ssh, scp, sftp):
+        assert option(cmd, 'ControlMaster') == 'auto'
+        assert option(cmd, 'ControlPath') == f'{control_dir}/%C'
+        assert option(cmd, 'ControlPersist') == '60'
+
+    # Sortie du contexte : connexion maîtresse fermée, dossier de contrôle supprimé
+    (exit_cmd, _), = commands
+    assert exit_cmd[:3] == ['ssh', '-p', '2222'] and exit_cmd[-3:] == ['-O', 'exit', 'prof@srv.example']
+    assert option(exit_cmd, 'ControlPath') == f'{control_dir}/%C'
+    assert not control_dir.exists()
+
+
+def test_ssh_connection_without_multiplexing(commands):
+    with deploy.SshConnection(SERVER, multiplex=False) as conn:
+        assert conn.options == []
+        assert conn.ssh('ls') == ['ssh', '-p', '2222', 'prof@srv.example', 'ls']
+
+    assert commands == []
+
+
+def test_scp_streams_split_files_across_parallel_commands(site, commands):
+    _, output, _ = site
+    files = sorted(BUILD_FILES)
+    with deploy.SshConnection(SERVER) as conn:
+        target = deploy.ScpTarget(conn, SERVER['remote_path'], streams=2)
+        assert target.upload_all(output, files, dry_run=False)
+        control_path = f'{conn._control_dir}/%C'
+
+    batches = deploy.balance_by_size(files, {rel: (output / rel).stat().st_size for rel in files}, 2)
+    assert len(batches) == 2
+    scps = [cmd for cmd, _ in commands if cmd[0] == 'scp']
+    sent = []
+    for cmd in scps:
+        assert option(cmd, 'ControlPath') == control_path
+        rels = [Path(local).relative_to(output).as_posix() for local in cmd[cmd.index('ControlPersist=60') + 1:-1]]
+        # Un scp par dossier de destination, dans un seul des deux lots
+        parent = Path(rels[0]).parent
+        remote_dir = SERVER['remote_path'] if parent == Path('.') else f"{SERVER['remote_path']}/{parent.as_posix()}"
+        assert cmd[-1] == f'prof@srv.example:{remote_dir}/'
+        assert all(Path(rel).parent == parent for rel in rels)
+        assert any(set(rels) <= set(batch) for batch in batches)
+        sent += rels
+    assert sorted(sent) == files
+
+
+def test_sftp_streams_run_one_batch_per_stream(site, commands):
+    _, output, _ = site
+    files = sorted(BUILD_FILES)
+    with deploy.SshConnection(SERVER) as conn:
+        target = deploy.SftpTarget(conn, SERVER['remote_path'], streams=3)
+        assert target.upload_all(output, files, dry_run=False)
+
+    batches = [(cmd, lines) for cmd, lines in commands if cmd[0] == 'sftp']
+    assert len(batches) == 3
+    puts = []
+    for cmd, lines in batches:
+        assert cmd[:3] == ['sftp', '-P', '2222'] and cmd[-1] == 'prof@srv.example'
+        assert option(cmd, 'ControlMaster') == 'auto'
+        assert lines and all(line.startswith('put ') for line in lines)
+        puts += lines
+    assert sorted(puts) == sorted(
+        f'put {deploy.sftp_quote(output / rel)} {deploy.sftp_quote(SERVER["remote_path"] + "/" + rel)}'
+        for rel in files
+    )
+
+
+def test_scp_deploy_reuses_the_connection_for_every_command(site, commands):
+    config, _, _ = site
+    config['server'].update(SERVER)
+    config['transfer']['streams'] = 2
+
+    assert deploy.deploy_scp(config)
+
+    control_paths = {option(cmd, 'ControlPath') for cmd, _ in commands}
+    assert len(control_paths) == 1 and None not in control_paths
+    kinds = [cmd[0] for cmd, _ in commands]
+    assert kinds[0] == 'ssh' and commands[0][0][-1].startswith('cat ')   # Manifeste distant
+    assert 'scp' in kinds
+    assert commands[-1][0][-3:] == ['-O', 'exit', 'prof@srv.example']  # Connexion maîtresse fermée à la fin
+    # Manifeste envoyé après les fichiers
+    assert commands[-2][0][0] == 'scp' and commands[-2][0][-1].endswith(f'/{MANIFEST_FILE}')
@@ -0,0 +1,58 @@
+"""
+Données JSON insérées dans les <script> en ligne des présentations (navigation, recherche)
+"""
+
+import json
+import re
+
+from lib.generator import HTMLGenerator, PageGenerator, script_json
+from lib.parser import parse_presentation
+
+
+HOSTILE = 'Choc </script><b>x</b> <!-- \u2028 \u2029 & fin'
+
+DECK = f'''---
+title: {HOSTILE}
+---
+
+# Section
+
+## {HOSTILE}
+- Point un
+- Point deux
+
+## Image: {HOSTILE}
+> schéma<b>x<!--.png
+Caption: Schéma
+'''
+
+
+def inline_scripts(html):
+    return re.findall(r'<script>(.*?)</script>', html, re.S)
+
+
+def test_script_json_escapes_markup_and_line_separators():
+    text = script_json({'title': HOSTILE})
+    assert '<' not in text and '>' not in text and '&' not in text
+    assert ' ' not in text and ' ' not in text
+    assert json.loads(text) == {'title': HOSTILE}
+
+
+def test_hostile_title_does_not_close_the_init_script():
+    html = HTMLGenerator().generate(parse_presentation(DECK), is_draft=False)
+
+    init = [script for script in inline_scripts(html) if 'PresentationNav.init(' in script]
+    assert len(init) == 1
+    options = json.loads(re.search(r'PresentationNav\.init\(\d+, (.*)\);', init[0], re.S).group(1))
+    assert HOSTILE in json.dumps(options, ensure_ascii=False)
+    assert options['nav']['images']['3']['main'] == ['../../images/schéma<b>x<!--.png']
+    assert '<b>x</b>' not in html.split('PresentationNav.init(', 1)[1]
+
+
+def test_hostile_title_in_collection_search_box():
+    html = PageGenerator()._search_box('../', [f'search/{HOSTILE}.json'])
+
+    init = [script for script in inline_scripts(html) if 'PyprezSearch.init(' in script]
+    assert len(init) == 1
+    options = json.loads(re.search(r'PyprezSearch\.init\((.*)\);', init[0], re.S).group(1))
+    assert options['shards'] == [f'search/{HOSTILE}.json']
@@ -0,0 +1,143 @@
+"""
+Manifeste de déploiement et envoi par différence, vérifiés contre un dossier local (DirectoryTarget)
+"""
+
+import json
+
+import pytest
+
+import deploy
+from lib.manifest import MANIFEST_FILE, diff_manifests, emptied_dirs, parent_dirs, parse_manifest
+
+from helpers import BUILD_FILES, local_config, tree, write_build
+
+
+def entry(size, digest):
+    return {'size': size, 'sha256': digest}
+
+
+@pytest.fixture
+def site(tmp_path):
+    return local_config(tmp_path)
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Fichiers reçus par DirectoryTarget.upload"""
+    sent = []
+    upload = deploy.DirectoryTarget.upload
+
+    def recording(self, source, files, dry_run):
+        sent.extend(files)
+        return upload(self, source, files, dry_run)
+
+    monkeypatch.setattr(deploy.DirectoryTarget, 'upload', recording)
+    return sent
+
+
+def test_diff_compares_size_and_digest():
+    local = {'a.html': entry(10, 'aa'), 'b.html': entry(20, 'bb'), 'c.html': entry(30, 'cc'), 'new.html': entry(1, 'nn')}
+    remote = {'a.html': entry(10, 'aa'), 'b.html': entry(20, 'xx'), 'c.html': entry(31, 'cc'), 'old.html': entry(5, 'oo')}
+
+    diff = diff_manifests(local, remote)
+
+    assert diff.upload == ['b.html', 'c.html', 'new.html']
+    assert diff.remove == ['old.html']
+    assert diff.unchanged == 1
+    assert diff.upload_bytes == 51
+
+
+def test_parent_and_emptied_dirs():
+    assert parent_dirs(['a/b/c.html', 'a/d.html', 'e.html']) == ['a', 'a/b']
+
+    local = {'a/x.html': entry(1, '1')}
+    remote = {'a/x.html': entry(1, '1'), 'a/b/c/y.html': entry(1, '2'), 'd/z.html': entry(1, '3')}
+    assert emptied_dirs(local, remote) == ['a/b/c', 'a/b', 'd']
+
+
+def test_unreadable_manifest_means_empty_target():
+    assert parse_manifest('') == {}
+    assert parse_manifest('{"version": 999, "files": {"a": {}}}') == {}
+    assert parse_manifest('[1, 2]') == {}
+
+
+def test_first_deploy_uploads_everything(site, uploads):
+    config, output, target = site
+
+    assert deploy.deploy_local(config)
+
+    assert sorted(uploads) == sorted(BUILD_FILES)
+    assert tree(target) == tree(output)
+    manifest = json.loads((target / MANIFEST_FILE).read_text(encoding='utf-8'))
+    assert sorted(manifest['files']) == sorted(BUILD_FILES)
+
+
+def test_only_changed_files_are_sent(site, uploads):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    uploads.clear()
+
+    (output / 'folder1/long/index.html').write_text('modifié', encoding='utf-8')
+    write_build(output, {'folder3/nouveau/index.html': 5_000})
+    assert deploy.deploy_local(config)
+
+    assert sorted(uploads) == ['folder1/long/index.html', 'folder3/nouveau/index.html']
+    assert tree(target) == tree(output)
+
+
+def test_unchanged_build_sends_nothing(site, uploads):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    manifest = (target / MANIFEST_FILE).stat().st_mtime_ns
+    uploads.clear()
+
+    assert deploy.deploy_local(config)
+
+    assert uploads == []
+    assert (target / MANIFEST_FILE).stat().st_mtime_ns == manifest
+
+
+def test_removes_files_and_emptied_dirs(site):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+
+    (output / 'sw.js').unlink()
+    for rel in ('folder2/choc/images/ecg.png', 'folder2/choc/index.html'):
+        (output / rel).unlink()
+    (output / 'folder2/choc/images').rmdir()
+    (output / 'folder2/choc').rmdir()
+    (output / 'folder2').rmdir()
+    assert deploy.deploy_local(config)
+
+    assert tree(target) == tree(output)
+    assert not (target / 'sw.js').exists()
+    assert not (target / 'folder2').exists()
+    assert (target / 'folder1/noyade/images').is_dir()
+
+
+def test_keeps_dirs_holding_files_outside_manifest(site):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+
+    (target / 'folder2/choc/.htaccess').write_text('Deny from all', encoding='utf-8')
+    (output / 'folder2/choc/images/ecg.png').unlink()
+    (output / 'folder2/choc/index.html').unlink()
+    assert deploy.deploy_local(config)
+
+    assert not (target / 'folder2/choc/images').exists()
+    assert (target / 'folder2/choc/.htaccess').exists()
+    assert not (target / 'folder2/choc/index.html').exists()
+
+
+def test_dry_run_leaves_target_untouched(site):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    (output / 'index.html').write_text('nouveau', encoding='utf-8')
+    (output / 'sw.js').unlink()
+
+    before = tree(target)
+    manifest = (target / MANIFEST_FILE).read_bytes()
+    assert deploy.deploy_local(config, dry_run=True)
+
+    assert tree(target) == before
+    assert (target / MANIFEST_FILE).read_bytes() == manifest
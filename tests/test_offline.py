@@ -0,0 +1,59 @@
+"""
+Manifeste de précache : cache "shell" commun, un cache par collection
+"""
+
+from lib.offline import build_precache_manifest
+
+
+CATALOG = {
+    'collections': [
+        {'id': 'iade', 'url': 'collections/iade.html', 'courses': ['folder1/noyade/index.html']},
+        {'id': 'urg', 'url': 'collections/urg.html', 'courses': ['folder2/choc/index.html']},
+    ],
+    'courses': {
+        'folder1/noyade/index.html': {'url': 'folder1/noyade/index.html', 'details_url': 'folder1/noyade/details.html'},
+        'folder2/choc/index.html': {'url': 'folder2/choc/index.html', 'details_url': 'folder2/choc/details.html'},
+    },
+}
+
+OUTPUTS = [
+    'index.html', 'catalog.json', 'collections/iade.html', 'collections/urg.html',
+    'fonts/work-sans-v24-latin-regular.woff2', 'images/qr_collection_iade.png',
+    'folder1/noyade/index.html', 'folder1/noyade/details.html', 'images/schema.0123456789ab.png',
+    'folder2/choc/index.html', 'folder2/choc/details.html',
+    'folder3/orphelin/index.html', 'folder3/orphelin/details.html',
+    'search/iade.json', 'search/urg.json', 'questions/iade.json', 'questions/urg.json', 'questions/index.json',
+    'sw.js', 'precache-manifest.json',
+]
+
+
+def manifest():
+    digests = {rel: f'{i:064x}' for i, rel in enumerate(OUTPUTS)}
+    course_images = {'folder1/noyade/index.html': ['schema.0123456789ab.png']}
+    return build_precache_manifest(digests, CATALOG, course_images)
+
+
+def test_shell_holds_only_site_pages_fonts_and_qr_codes():
+    assert sorted(manifest()['shell']) == [
+        'catalog.json', 'collections/iade.html', 'collections/urg.html',
+        'fonts/work-sans-v24-latin-regular.woff2', 'images/qr_collection_iade.png', 'index.html',
+    ]
+
+
+def test_search_and_question_shards_belong_to_their_collection():
+    collections = manifest()['collections']
+    assert collections['iade'] == [
+        'folder1/noyade/index.html', 'folder1/noyade/details.html', 'images/schema.0123456789ab.png',
+        'search/iade.json', 'questions/iade.json',
+    ]
+    assert collections['urg'] == [
+        'folder2/choc/index.html', 'folder2/choc/details.html', 'search/urg.json', 'questions/urg.json',
+    ]
+
+
+def test_courses_outside_collections_are_not_precached():
+    data = manifest()
+    cached = set(data['shell']).union(*data['collections'].values())
+    assert 'folder3/orphelin/index.html' not in cached
+    assert 'questions/index.json' not in cached
+    assert 'sw.js' not in data['entries']
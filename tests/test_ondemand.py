@@ -0,0 +1,53 @@
+"""
+Serveur de rendu à la demande : mêmes cours que le build statique
+"""
+
+import pytest
+
+from lib.ondemand import SiteRenderer
+from lib.site import build_site
+from lib.sink import MemorySink
+
+
+COURSE = '''---
+title: {title}
+collections: iade
+---
+
+# Section
+
+## Slide
+- Point un
+- Point deux
+'''
+
+
+@pytest.fixture
+def source(tmp_path):
+    (tmp_path / 'collections.toml').write_text('[iade]\ntitle = "IADE"\n', encoding='utf-8')
+    files = {
+        'folder1/noyade.md': 'Noyade',
+        'folder1/README.md': 'Lisez-moi',
+        'folder1/.brouillon.md': 'Caché',
+        'images/schema.md': 'Notes sur les images',
+        'css/notes.md': 'Notes CSS',
+    }
+    for rel, title in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(COURSE.format(title=title), encoding='utf-8')
+    return tmp_path
+
+
+def test_serves_only_courses_published_by_the_build(source):
+    renderer = SiteRenderer(source)
+    published = build_site(source, MemorySink(), offline=False).sink.files
+
+    for url in ('folder1/noyade/index.html', 'folder1/noyade/details.html'):
+        assert url in published
+        assert renderer.resolve(url) is not None
+
+    for url in ('folder1/README/index.html', 'folder1/README/details.html', 'folder1/.brouillon/index.html',
+                'images/schema/index.html', 'css/notes/index.html'):
+        assert url not in published
+        assert renderer.resolve(url) is None
@@ -0,0 +1,133 @@
+"""
+Banque de questions : réponses des cartes QROC, cache par cours, mise à jour seule (--questions-only)
+"""
+
+import json
+
+from lib import questions
+from lib.offline import MANIFEST_FILE, SERVICE_WORKER_FILE
+from lib.parser import parse_presentation
+from lib.questions import QUESTION_CACHE, QuestionBank, course_questions
+from lib.sink import DirectorySink
+from lib.site import build_question_bank, build_site
+
+
+QROC = '''---
+title: Pharmacologie
+theme: qroc
+---
+
+## Dose d'adrénaline dans l'arrêt cardiaque ?
+- 1 mg IV toutes les 4 minutes
+
+## Délai d'action de la succinylcholine ?
+
+:::details
+
+**Réponse:**
+
+Environ 60 secondes après l'injection IV.
+
+[@ref auteurs="Nom A" titre="Titre" revue="Revue" date="2024"]
+
+## Posologie de la kétamine ?
+| Voie | Dose |
+|------|------|
+| IV | 1-2 mg/kg |
+| IM | 4-5 mg/kg |
+'''
+
+COURSE = '''---
+title: {title}
+collections: {collections}
+---
+
+# Section
+
+## Slide
+- Point
+
+:::questions
+- {question}
+'''
+
+
+def answers(markdown):
+    return {q['question']: q['answer'] for q in course_questions(parse_presentation(markdown))}
+
+
+def test_qroc_answers_from_points_details_and_tables():
+    assert answers(QROC) == {
+        "Dose d'adrénaline dans l'arrêt cardiaque ?": ['1 mg IV toutes les 4 minutes'],
+        "Délai d'action de la succinylcholine ?": ['**Réponse:**', "Environ 60 secondes après l'injection IV."],
+        'Posologie de la kétamine ?': ['IV · 1-2 mg/kg', 'IM · 4-5 mg/kg'],
+    }
+
+
+def test_cache_is_invalidated_when_the_extractor_changes(tmp_path, monkeypatch):
+    course = tmp_path / 'folder1/pharmaco.md'
+    course.parent.mkdir()
+    course.write_text(QROC, encoding='utf-8')
+    cache_file = tmp_path / QUESTION_CACHE
+
+    metadata = {'url': 'folder1/pharmaco/index.html', 'title': 'Pharmacologie', 'theme': 'qroc',
+                'status': 'published', 'collections': []}
+    bank = QuestionBank(cache_file)
+    bank.add('folder1/pharmaco', bank.digest(course), metadata, parse_presentation(QROC))
+    bank.save()
+    bank = QuestionBank(cache_file)
+    assert bank.cached('folder1/pharmaco', bank.digest(course))
+
+    monkeypatch.setattr(questions, 'extractor_version', lambda: 'autre-analyseur')
+    bank = QuestionBank(cache_file)
+    assert not bank.cached('folder1/pharmaco', bank.digest(course))
+
+
+def corpus(source):
+    (source / 'folder1').mkdir(parents=True)
+    (source / 'collections.toml').write_text('[iade]\ntitle = "IADE"\n[ibode]\ntitle = "IBODE"\n',
+                                              encoding='utf-8')
+    write_course(source, 'noyade', 'iade', 'Quelle est la définition de la noyade ?')
+    write_course(source, 'bloc', 'ibode', 'Qui compte les compresses ?')
+
+
+def write_course(source, slug, collections, question):
+    (source / f'folder1/{slug}.md').write_text(
+        COURSE.format(title=slug, collections=collections, question=question), encoding='utf-8')
+
+
+def test_questions_only_updates_the_precache_manifest(tmp_path):
+    source, output = tmp_path / 'cours', tmp_path / 'output'
+    corpus(source)
+    sink = DirectorySink(output)
+    build_site(source, sink, offline=True)
+    sink.close()
+    before = json.loads((output / MANIFEST_FILE).read_text(encoding='utf-8'))
+    assert 'questions/ibode.json' in before['collections']['ibode']
+
+    write_course(source, 'noyade', 'iade', 'Quels sont les stades de la noyade ?')
+    (source / 'folder1/bloc.md').unlink()
+    build_question_bank(source, output)
+
+    manifest = json.loads((output / MANIFEST_FILE).read_text(encoding='utf-8'))
+    assert manifest['version'] != before['version']
+    assert manifest['entries']['questions/iade.json'] != before['entries']['questions/iade.json']
+    assert manifest['collections']['iade'] == before['collections']['iade']
+    # Banque supprimée : retirée des entrées et de la liste de sa collection
+    assert not (output / 'questions/ibode.json').exists()
+    assert 'questions/ibode.json' not in manifest['entries']
+    assert manifest['collections']['ibode'] == [p for p in before['collections']['ibode']
+                                                if p != 'questions/ibode.json']
+    assert (output / SERVICE_WORKER_FILE).read_text(encoding='utf-8').startswith(
+        f"const PRECACHE_VERSION = '{manifest['version']}';")
+
+
+def test_questions_only_without_offline_site_writes_no_manifest(tmp_path):
+    source, output = tmp_path / 'cours', tmp_path / 'output'
+    corpus(source)
+
+    build_question_bank(source, output)
+
+    assert (output / 'questions/iade.json').exists()
+    assert not (output / MANIFEST_FILE).exists()
+    assert not (output / SERVICE_WORKER_FILE).exists()
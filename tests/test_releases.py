@@ -0,0 +1,155 @@
+"""
+Déploiement par releases vers un dossier local (DirectoryTarget) : releases/<id>/ amorcée par
+liens physiques sur la précédente, bascule atomique du lien current, retour arrière, élagage
+"""
+
+import itertools
+import os
+
+import pytest
+
+import deploy
+from lib.manifest import MANIFEST_FILE
+from lib.releases import CURRENT_LINK, RELEASES_DIR, release_id, releases_to_prune, rollback_target
+
+from helpers import local_config, tree
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """Releases activées ; une seconde d'écart entre deux releases (ordre chronologique des noms)"""
+    config, output, target = local_config(tmp_path)
+    config['release']['enabled'] = True
+    ticks = itertools.count(1_790_000_000)
+    monkeypatch.setattr(deploy, 'release_id', lambda text: release_id(text, next(ticks)))
+    return config, output, target
+
+
+def releases(target):
+    return sorted(p.name for p in (target / RELEASES_DIR).iterdir())
+
+
+def current(target):
+    return os.readlink(target / CURRENT_LINK)
+
+
+def test_releases_to_prune_keeps_latest_and_active():
+    names = ['20260101-000000-aaaaaaaa', '20260102-000000-bbbbbbbb', '20260103-000000-cccccccc',
+             '20260104-000000-dddddddd']
+    assert releases_to_prune(names, 2, names[-1]) == names[:2]
+    # Release active plus ancienne (après un retour arrière) : jamais supprimée
+    assert releases_to_prune(names, 2, names[0]) == [names[1]]
+    assert releases_to_prune(names, 0, names[-1]) == names[:3]
+
+
+def test_rollback_target():
+    names = ['20260101-000000-aaaaaaaa', '20260102-000000-bbbbbbbb', '20260103-000000-cccccccc']
+    assert rollback_target(names, names[2]) == names[1]
+    assert rollback_target(names, names[2], names[0]) == names[0]
+    with pytest.raises(ValueError):
+        rollback_target(names, names[0])
+    with pytest.raises(ValueError):
+        rollback_target(names, names[2], '20250101-000000-eeeeeeee')
+
+
+def test_first_release(site):
+    config, output, target = site
+
+    assert deploy.deploy_local(config)
+
+    name, = releases(target)
+    assert current(target) == f'{RELEASES_DIR}/{name}'
+    assert tree(target / CURRENT_LINK) == tree(output)
+    assert (target / RELEASES_DIR / name / MANIFEST_FILE).exists()
+
+
+def test_incremental_release_leaves_previous_untouched(site):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    first, = releases(target)
+    previous = target / RELEASES_DIR / first
+    before = tree(previous)
+    old_manifest = (previous / MANIFEST_FILE).read_bytes()
+    old_inode = (previous / 'css/style.css').stat().st_ino
+
+    (output / 'css/style.css').write_text('body {}', encoding='utf-8')
+    (output / 'sw.js').unlink()
+    assert deploy.deploy_local(config)
+
+    second = releases(target)[-1]
+    latest = target / RELEASES_DIR / second
+    assert second != first
+    assert current(target) == f'{RELEASES_DIR}/{second}'
+    assert tree(latest) == tree(output)
+
+    # Release précédente intacte : fichier remplacé délié, pas réécrit en place
+    assert tree(previous) == before
+    assert (previous / MANIFEST_FILE).read_bytes() == old_manifest
+    assert (previous / 'css/style.css').stat().st_ino == old_inode
+    assert (latest / 'css/style.css').stat().st_ino != old_inode
+    assert (previous / 'sw.js').exists()
+
+    # Fichiers inchangés partagés par liens physiques (cp -al)
+    shared = previous / 'folder1/noyade/images/schema.png'
+    assert (latest / 'folder1/noyade/images/schema.png').stat().st_ino == shared.stat().st_ino
+    assert shared.stat().st_nlink == 2
+
+
+def test_unchanged_build_creates_no_release(site):
+    config, _, target = site
+    assert deploy.deploy_local(config)
+
+    assert deploy.deploy_local(config)
+
+    assert len(releases(target)) == 1
+
+
+def test_incomplete_release_keeps_current(site, monkeypatch):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    first, = releases(target)
+    before = tree(target / RELEASES_DIR / first)
+
+    (output / 'index.html').write_text('nouvelle version', encoding='utf-8')
+    monkeypatch.setattr(deploy.DirectoryTarget, 'upload', lambda self, source, files, dry_run: False)
+    assert not deploy.deploy_local(config)
+
+    assert current(target) == f'{RELEASES_DIR}/{first}'
+    assert (target / CURRENT_LINK / 'index.html').read_text(encoding='utf-8') != 'nouvelle version'
+    assert tree(target / RELEASES_DIR / first) == before
+
+
+def test_rollback(site):
+    config, output, target = site
+    assert deploy.deploy_local(config)
+    (output / 'index.html').write_text('v2', encoding='utf-8')
+    assert deploy.deploy_local(config)
+    (output / 'index.html').write_text('v3', encoding='utf-8')
+    assert deploy.deploy_local(config)
+    first, second, third = releases(target)
+
+    assert deploy.deploy_local(config, rollback_to='')
+    assert current(target) == f'{RELEASES_DIR}/{second}'
+    assert (target / CURRENT_LINK / 'index.html').read_text(encoding='utf-8') == 'v2'
+
+    assert deploy.deploy_local(config, rollback_to=third)
+    assert current(target) == f'{RELEASES_DIR}/{third}'
+
+    assert not deploy.deploy_local(config, rollback_to='20250101-000000-eeeeeeee')
+    assert current(target) == f'{RELEASES_DIR}/{third}'
+    assert releases(target) == [first, second, third]
+
+
+def test_old_releases_are_pruned(site):
+    config, output, target = site
+    config['release']['keep'] = 2
+    names = []
+    for version in range(4):
+        (output / 'index.html').write_text(f'v{version}', encoding='utf-8')
+        assert deploy.deploy_local(config)
+        names.append(current(target).split('/')[-1])
+
+    assert releases(target) == names[-2:]
+    assert (target / CURRENT_LINK / 'index.html').read_text(encoding='utf-8') == 'v3'
+    # Releases gardées intactes malgré les liens physiques vers les supprimées
+    assert (target / RELEASES_DIR / names[-2] / 'index.html').read_text(encoding='utf-8') == 'v2'
@@ -0,0 +1,82 @@
+"""
+Dates des sources d'un build reproductible : SOURCE_DATE_EPOCH, git (une passe), mtime ; en UTC
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from datetime import timezone
+
+import pytest
+
+from lib import reproducible
+from lib.reproducible import SourceDates, git_commit_times
+
+
+def git(cwd, *args, date=None):
+    env = {**os.environ, 'GIT_AUTHOR_DATE': date or '', 'GIT_COMMITTER_DATE': date or ''}
+    subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args], cwd=cwd, env=env,
+                   check=True, capture_output=True)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    if shutil.which('git') is None:
+        pytest.skip('git absent')
+    source = tmp_path / 'cours'
+    (source / 'réa').mkdir(parents=True)
+    (source / 'réa/noyade.md').write_text('# v1', encoding='utf-8')
+    (source / 'réa/choc.md').write_text('# v1', encoding='utf-8')
+    (tmp_path / 'README.md').write_text('hors corpus', encoding='utf-8')
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-qm', 'v1', date='2022-03-04T05:06:07Z')
+    (source / 'réa/choc.md').write_text('# v2', encoding='utf-8')
+    git(tmp_path, 'commit', '-qam', 'v2', date='2023-01-02T03:04:05Z')
+    return source
+
+
+def test_git_commit_times_in_one_pass(corpus, monkeypatch):
+    calls = []
+    run = subprocess.run
+    monkeypatch.setattr(reproducible.subprocess, 'run', lambda cmd, **kw: calls.append(cmd) or run(cmd, **kw))
+
+    times = git_commit_times(corpus)
+
+    assert times == {
+        (corpus / 'réa/noyade.md').resolve(): 1646370367,
+        (corpus / 'réa/choc.md').resolve(): 1672628645,
+    }
+    assert [cmd[1] for cmd in calls] == ['rev-parse', 'log', 'status']
+
+
+def test_modified_and_untracked_files_use_mtime(corpus, monkeypatch):
+    monkeypatch.delenv('SOURCE_DATE_EPOCH', raising=False)
+    (corpus / 'réa/choc.md').write_text('# brouillon', encoding='utf-8')
+    (corpus / 'réa/nouveau.md').write_text('# nouveau', encoding='utf-8')
+    for name in ('choc.md', 'nouveau.md'):
+        os.utime(corpus / 'réa' / name, (1700000000, 1700000000))
+
+    dates = SourceDates(corpus)
+
+    assert dates.timestamp(corpus / 'réa/noyade.md') == 1646370367
+    assert dates.timestamp(corpus / 'réa/choc.md') == 1700000000
+    assert dates.timestamp(corpus / 'réa/nouveau.md') == 1700000000
+
+
+def test_dates_are_utc_whatever_the_timezone(tmp_path, monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip('tzset indisponible')
+    source = tmp_path / 'a.md'
+    source.write_text('# a', encoding='utf-8')
+    rendered = set()
+    for tz in ('UTC', 'Asia/Tokyo', 'America/Los_Angeles'):
+        monkeypatch.setenv('TZ', tz)
+        time.tzset()
+        dates = SourceDates(tmp_path, epoch=1700000000)
+        assert dates.date(source).tzinfo == timezone.utc
+        rendered.add((dates.date(source).strftime('%d/%m/%Y %H:%M'), dates.latest([source]).isoformat()))
+    monkeypatch.delenv('TZ')
+    time.tzset()
+    assert rendered == {('14/11/2023 22:13', '2023-11-14T22:13:20+00:00')}
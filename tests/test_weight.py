@@ -0,0 +1,76 @@
+"""
+Budgets de poids : collections.toml et métadonnées des cours
+"""
+
+import pytest
+
+from lib.site import build_site
+from lib.sink import MemorySink
+from lib.weight import parse_budgets, split_budgets
+
+
+COURSE = '''---
+title: Noyade
+collections: iade
+{budget}
+---
+
+# Physiopathologie
+
+## Hypoxie
+- Point un
+- Point deux
+'''
+
+
+def corpus(tmp_path, budget='', config='[iade]\ntitle = "IADE"\n'):
+    (tmp_path / 'folder1').mkdir()
+    (tmp_path / 'folder1/noyade.md').write_text(COURSE.format(budget=budget), encoding='utf-8')
+    (tmp_path / 'collections.toml').write_text(config, encoding='utf-8')
+    return tmp_path
+
+
+def test_parse_budgets_reports_or_raises():
+    problems = []
+    assert parse_budgets({'budget_html': '40k', 'budget_htlm': '40k', 'budget_gzip': 'beaucoup', 'title': 'x'},
+                         'budget_', problems) == {'html': 40 * 1024}
+    assert len(problems) == 2
+    assert 'budget_htlm' in problems[0] and 'budget_gzip' in problems[1]
+
+    with pytest.raises(ValueError, match='budget_htlm'):
+        parse_budgets({'budget_htlm': '40k'}, 'budget_')
+
+
+def test_budgets_table_is_reserved():
+    collections, budgets = split_budgets({'budgets': {'html': '400k'}, 'iade': {'title': 'IADE'}})
+    assert collections == {'iade': {'title': 'IADE'}}
+    assert budgets == {'html': 400 * 1024}
+
+    with pytest.raises(ValueError, match="collection ne peut pas s'appeler 'budgets'"):
+        split_budgets({'budgets': {'title': 'Budgets hospitaliers'}})
+
+
+def test_front_matter_typo_is_a_warning_and_the_deck_is_written(tmp_path):
+    result = build_site(corpus(tmp_path, 'budget_htlm: 40k'), MemorySink(), offline=False)
+
+    assert 'folder1/noyade/index.html' in result.sink.files
+    assert 'folder1/noyade/details.html' in result.sink.files
+    assert not result.courses['folder1/noyade'].error
+    assert result.ok
+    lint = [event for event in result.warnings if event.get('event') == 'lint']
+    assert any('budget_htlm' in event['msg'] for event in lint)
+
+
+def test_front_matter_budget_is_enforced(tmp_path):
+    result = build_site(corpus(tmp_path, 'budget_html: 1k'), MemorySink(), offline=False)
+
+    assert 'folder1/noyade/index.html' in result.sink.files
+    assert [(course, metric) for course, metric, *_ in result.weights.violations()] == [('folder1/noyade', 'html')]
+    assert not result.ok
+
+
+def test_invalid_collection_budget_fails_before_writing(tmp_path):
+    sink = MemorySink()
+    with pytest.raises(ValueError, match='budget_htlm'):
+        build_site(corpus(tmp_path, config='[iade]\ntitle = "IADE"\nbudget_htlm = "40k"\n'), sink, offline=False)
+    assert sink.files == {}